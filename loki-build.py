@@ -124,9 +124,22 @@ if __name__ == "__main__":
 	parser.add_argument('-f', '--finalize', action='store_true',
 			help="finalize the knowledge database file"
 	)
+	parser.add_argument('--position-flank', type=int, metavar='bases', action='store', default=0,
+			help="when finalizing, also record SNPs within this distance of each biopolymer region (default: 0)"
+	)
 	parser.add_argument('--no-optimize', action='store_true',
 			help="do not optimize the knowledge database file after updating"
 	)
+	parser.add_argument('-x', '--export', type=str, metavar='table', nargs='*', action='append', default=None,
+			help="export the specified knowledge tables into memory-mappable column files, "
+			+"or if none or '+' are specified, the snp_locus, biopolymer_region, group_biopolymer and biopolymer_name tables"
+	)
+	parser.add_argument('--export-directory', type=str, metavar='dir', action='store', default=None,
+			help="the directory to export tables into (default: the knowledge database file name plus '.export')"
+	)
+	parser.add_argument('--export-processes', type=int, metavar='num', action='store', default=1,
+			help="the number of tables to export at once in parallel (default: 1)"
+	)
 	parser.add_argument('-v', '--verbose', action='store_true',
 			help="print warnings and log messages (default)"
 	)
@@ -298,7 +311,7 @@ if __name__ == "__main__":
 				print ("WARNING: errors encountered during knowledge database update; skipping finalization step")
 			else:
 				db.testDatabaseWriteable()
-				db.finalizeDatabase()
+				db.finalizeDatabase(args.position_flank)
 	
 		# optimize?
 		if (not args.no_optimize) and (not db.getDatabaseSetting('optimized',int)):
@@ -307,6 +320,19 @@ if __name__ == "__main__":
 			else:
 				db.testDatabaseWriteable()
 				db.optimizeDatabase()
+		
+		# export?
+		if args.export != None:
+			tblSet = set()
+			for tblList in args.export:
+				tblSet |= set(tblList)
+			tblSet.discard('+')
+			# re-open the file read-only, so the export workers can share it
+			db.detachDatabaseFile(quiet=True)
+			db = loki_db.Database(readonly=True)
+			db.setVerbose(args.verbose or (not args.quiet))
+			db.attachDatabaseFile(args.knowledge, quiet=True)
+			db.exportTables(sorted(tblSet), args.export_directory, args.export_processes)
 	#if knowledge
 #__main__
 
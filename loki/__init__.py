@@ -1 +1 @@
-__all__ = ["loki_db","loki_source","loki_updater","loaders","util"]
+__all__ = ["loki_async","loki_cache","loki_db","loki_filter","loki_pool","loki_sidecar","loki_source","loki_updater","loaders","util"]
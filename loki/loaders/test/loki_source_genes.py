@@ -12,12 +12,12 @@ class Source_genes(loki_source.Source):
 	#getVersionString()
 	
 	
-	def download(self, options):
-		pass
+	def download(self, options, path):
+		return []
 	#download()
 	
 	
-	def update(self, options):
+	def update(self, options, path):
 		# clear out all old data from this source
 		self.log("deleting old records from the database ...")
 		self.deleteAll()
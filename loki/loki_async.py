@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+
+import asyncio
+import concurrent.futures
+import functools
+import itertools
+
+import loki.loki_pool as loki_pool
+
+
+class AsyncDatabase(object):
+	"""
+	An asyncio front-end for querying a knowledge database file without blocking the event loop.
+
+	Queries run on a bounded thread pool, each on its own pooled connection, so many
+	concurrent lookups overlap instead of queueing behind one another.  Generator results
+	are fetched from the worker threads in chunks and streamed back as async iterators.
+
+	Each query holds a connection from the moment it starts until its results are exhausted,
+	or it is cancelled or closed; queries beyond the pool size wait in the event loop, never
+	in a worker thread.
+	"""
+	
+	
+	##################################################
+	# constructor
+	
+	
+	def __init__(self, dbFile, size=None, tempMem=False, chunkSize=1000):
+		"""
+		Initializes the front-end for the given knowledge database file.
+
+		Args:
+			dbFile (str): The knowledge database file.
+			size (int, optional): The number of worker threads and connections. Defaults to the number of CPUs.
+			tempMem (bool, optional): If True, each connection keeps its temporary storage in memory. Defaults to False.
+			chunkSize (int, optional): The default number of rows fetched per trip to a worker thread. Defaults to 1000.
+		"""
+		self._pool = loki_pool.DatabasePool(dbFile, size, tempMem)
+		self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self._pool.getSize(), thread_name_prefix='loki')
+		self._chunkSize = chunkSize
+		self._slots = None # asyncio.Semaphore counting idle connections, created in the running loop
+	#__init__()
+	
+	
+	##################################################
+	# context manager
+	
+	
+	async def __aenter__(self):
+		return self
+	#__aenter__()
+	
+	
+	async def __aexit__(self, excType, excVal, traceback):
+		await self.close()
+		return False
+	#__aexit__()
+	
+	
+	##################################################
+	# connection management
+	
+	
+	def getPool(self):
+		"""
+		Returns:
+			DatabasePool: The underlying connection pool.
+		"""
+		return self._pool
+	#getPool()
+	
+	
+	async def _acquire(self):
+		"""
+		Waits for a free connection and takes it out of the pool.
+
+		Returns:
+			Database: The connection, which must be returned with _release().
+		"""
+		loop = asyncio.get_running_loop()
+		if self._slots == None:
+			self._slots = asyncio.Semaphore(self._pool.getSize())
+		await self._slots.acquire()
+		future = loop.run_in_executor(self._executor, self._pool.acquire)
+		try:
+			return await asyncio.shield(future)
+		except BaseException:
+			# if we're cancelled while the connection is opening, give it back once it arrives
+			future.add_done_callback(lambda f: self._release(None if (f.cancelled() or f.exception()) else f.result()))
+			raise
+	#_acquire()
+	
+	
+	def _release(self, db, results=None):
+		"""
+		Returns a connection to the pool, first closing any query results still open on it.
+
+		Args:
+			db (Database or None): The connection, or None if it could not be opened.
+			results (iterator, optional): The query results to close. Defaults to None.
+
+		This must be called from the event loop thread, once no worker thread is using the connection.
+		"""
+		loop = asyncio.get_running_loop()
+		def _cleanup():
+			try:
+				if hasattr(results, 'close'):
+					results.close()
+			finally:
+				if db != None:
+					self._pool.release(db)
+				loop.call_soon_threadsafe(self._slots.release)
+		#_cleanup()
+		if results == None:
+			if db != None:
+				self._pool.release(db)
+			self._slots.release()
+		else:
+			# closing the results may run SQL (such as dropping batch tables), so keep it off the event loop
+			try:
+				self._executor.submit(_cleanup)
+			except RuntimeError:
+				_cleanup()
+	#_release()
+	
+	
+	async def close(self):
+		"""
+		Shuts down the worker threads and closes the connection pool.
+		"""
+		loop = asyncio.get_running_loop()
+		await loop.run_in_executor(None, functools.partial(self._executor.shutdown, wait=True))
+		self._pool.close()
+	#close()
+	
+	
+	##################################################
+	# asynchronous queries
+	
+	
+	async def call(self, method, *args, **kwargs):
+		"""
+		Calls a Database method on a worker thread.
+
+		Args:
+			method (str): The name of the Database method, such as 'getTypeID'.
+			*args, **kwargs: The method's arguments.
+
+		Returns:
+			The method's result.
+
+		Use generate() for methods which return generators or cursors.
+		"""
+		loop = asyncio.get_running_loop()
+		db = await self._acquire()
+		future = loop.run_in_executor(self._executor, functools.partial(getattr(db, method), *args, **kwargs))
+		try:
+			return await asyncio.shield(future)
+		finally:
+			future.add_done_callback(lambda f: self._release(db))
+	#call()
+	
+	
+	async def generate(self, method, *args, chunkSize=None, **kwargs):
+		"""
+		Runs a Database generator method on worker threads and streams back its results.
+
+		Args:
+			method (str): The name of the Database method, such as 'generateSNPLociByRSes'.
+			*args, **kwargs: The method's arguments.
+			chunkSize (int, optional): The number of rows fetched per trip to a worker thread. Defaults to the front-end's chunk size.
+
+		Yields:
+			The method's results.
+
+		Cancelling the consuming task, or closing the async iterator early, stops the query
+		and returns its connection to the pool as soon as the current chunk has been fetched.
+		"""
+		loop = asyncio.get_running_loop()
+		chunkSize = chunkSize or self._chunkSize
+		db = await self._acquire()
+		results = None
+		future = loop.run_in_executor(self._executor, lambda: iter(getattr(db, method)(*args, **kwargs)))
+		try:
+			results = await asyncio.shield(future)
+			while True:
+				future = loop.run_in_executor(self._executor, lambda: list(itertools.islice(results, chunkSize)))
+				rows = await asyncio.shield(future)
+				if not rows:
+					break
+				for row in rows:
+					yield row
+			#while rows
+		finally:
+			if results == None:
+				# the query was still starting; close whatever it returns once it has
+				future.add_done_callback(lambda f: self._release(db, None if (f.cancelled() or f.exception()) else f.result()))
+			else:
+				future.add_done_callback(lambda f: self._release(db, results))
+	#generate()
+
+
+#AsyncDatabase
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+
+import apsw
+import pickle
+import time
+import zlib
+
+
+class QueryCache(object):
+	"""
+	A persistent cache of query results, stored in a small SQLite file beside a knowledge database file.
+
+	Each entry holds the complete results of one lookup, keyed by a digest of the query method
+	and its normalized arguments together with the fingerprint of the knowledge database the
+	results came from.  Entries for any other fingerprint are never returned, so updating the
+	knowledge database invalidates the cache without any explicit step, while several versions
+	of a database can share one cache file.
+
+	The total size of the stored results is bounded; once it is exceeded, the least recently
+	used entries are evicted first, which soon includes any entries for an outdated fingerprint.
+	"""
+	
+	
+	##################################################
+	# constructor
+	
+	
+	def __init__(self, path, maxSize=256*1024*1024):
+		"""
+		Opens (or creates) the cache file.
+
+		Args:
+			path (str): The cache file.
+			maxSize (int, optional): The maximum total size in bytes of the stored (compressed) results. Defaults to 256MiB.
+		"""
+		self._path = path
+		self._maxSize = maxSize
+		self._db = apsw.Connection(path)
+		self._db.setbusytimeout(10000)
+		cursor = self._db.cursor()
+		cursor.execute("PRAGMA journal_mode = WAL")
+		cursor.execute("PRAGMA synchronous = OFF")
+		# files from before entries were keyed by fingerprint are simply started over
+		if 'fingerprint' in (row[1] for row in cursor.execute("PRAGMA table_info(`entry`)") if not row[5]):
+			cursor.execute("DROP TABLE `entry`")
+		cursor.execute("""
+CREATE TABLE IF NOT EXISTS `entry` (
+  key BLOB NOT NULL,
+  fingerprint VARCHAR(32) NOT NULL,
+  used DOUBLE NOT NULL,
+  size INTEGER NOT NULL,
+  value BLOB NOT NULL,
+  PRIMARY KEY (key, fingerprint)
+)
+""")
+		cursor.execute("CREATE INDEX IF NOT EXISTS `entry__used` ON `entry` (used)")
+	#__init__()
+	
+	
+	##################################################
+	# cache management
+	
+	
+	def getPath(self):
+		"""
+		Returns:
+			str: The cache file.
+		"""
+		return self._path
+	#getPath()
+	
+	
+	def getSize(self):
+		"""
+		Returns:
+			int: The total size in bytes of the stored results.
+		"""
+		return max(row[0] for row in self._db.cursor().execute("SELECT COALESCE(SUM(size),0) FROM `entry`"))
+	#getSize()
+	
+	
+	def clear(self):
+		"""
+		Discards all entries.
+		"""
+		self._db.cursor().execute("DELETE FROM `entry`")
+	#clear()
+	
+	
+	def close(self):
+		"""
+		Closes the cache file.
+		"""
+		self._db.close()
+	#close()
+	
+	
+	##################################################
+	# cache entries
+	
+	
+	def get(self, key, fingerprint):
+		"""
+		Retrieves an entry and marks it as recently used.
+
+		Args:
+			key (bytes): The entry key.
+			fingerprint (str): The fingerprint of the current knowledge database.
+
+		Returns:
+			The stored value, or None if there is no entry for this key and fingerprint.
+		"""
+		cursor = self._db.cursor()
+		data = None
+		for row in cursor.execute("SELECT value FROM `entry` WHERE key = ? AND fingerprint = ?", (key, fingerprint)):
+			data = row[0]
+		if data == None:
+			return None
+		cursor.execute("UPDATE `entry` SET used = ? WHERE key = ? AND fingerprint = ?", (time.time(), key, fingerprint))
+		return pickle.loads(zlib.decompress(data))
+	#get()
+	
+	
+	def put(self, key, fingerprint, value):
+		"""
+		Stores an entry, evicting the least recently used entries to make room.
+
+		Args:
+			key (bytes): The entry key.
+			fingerprint (str): The fingerprint of the current knowledge database.
+			value: The value to store, which must be picklable.
+
+		Returns:
+			bool: True if the value was stored, or False if it alone would exceed the maximum size.
+		"""
+		data = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+		if len(data) > self._maxSize:
+			return False
+		cursor = self._db.cursor()
+		with self._db:
+			cursor.execute("DELETE FROM `entry` WHERE key = ? AND fingerprint = ?", (key, fingerprint))
+			excess = self.getSize() + len(data) - self._maxSize
+			if excess > 0:
+				evict = list()
+				for row in cursor.execute("SELECT key, fingerprint, size FROM `entry` ORDER BY used"):
+					evict.append( (row[0], row[1]) )
+					excess -= row[2]
+					if excess <= 0:
+						break
+				cursor.executemany("DELETE FROM `entry` WHERE key = ? AND fingerprint = ?", evict)
+			cursor.execute("INSERT INTO `entry` (key, fingerprint, used, size, value) VALUES (?,?,?,?,?)", (key, fingerprint, time.time(), len(data), data))
+		return True
+	#put()
+
+
+#QueryCache
@@ -3,8 +3,19 @@
 import datetime
 import apsw
 import bisect
+import collections
+import contextlib
+import functools
+import hashlib
 import itertools
+import os
+import pickle
 import sys
+import urllib.parse
+
+import loki.loki_cache as loki_cache
+import loki.loki_filter as loki_filter
+import loki.loki_sidecar as loki_sidecar
 
 ##################################################
 # Note on included docstring
@@ -13,6 +24,27 @@ import sys
 # Docstring has not been inspected line by line
 ##################################################
 
+
+def _cachedQuery(method):
+	"""
+	Routes a Database generator method through the query cache, when one is enabled.
+
+	Args:
+		method (function): The generator method, taking its input tuples as a positional argument.
+
+	Returns:
+		function: The wrapped method.
+	"""
+	@functools.wraps(method)
+	def wrapper(self, *args, **kwargs):
+		if self._queryCache == None:
+			return method(self, *args, **kwargs)
+		return self._generateCachedRows(method, args, kwargs)
+	#wrapper()
+	return wrapper
+#_cachedQuery()
+
+
 class Database(object):
 	"""
 	A class to interact with a SQLite database using APSW.
@@ -375,6 +407,24 @@ class Database(object):
 			}, #.db.snp_biopolymer_role
 			
 			
+			'snp_biopolymer_position': {
+				# materialized by finalizeDatabase(); distance is 0 for SNPs inside a region,
+				# otherwise the distance to the nearest region edge within the flank
+				'table': """
+(
+  rs INTEGER NOT NULL,
+  ldprofile_id INTEGER NOT NULL,
+  biopolymer_id INTEGER NOT NULL,
+  distance INTEGER NOT NULL,
+  PRIMARY KEY (rs,ldprofile_id,biopolymer_id)
+)
+""",
+				'index': {
+					'snp_biopolymer_position__biopolymer_ldprofile_distance_rs': '(biopolymer_id,ldprofile_id,distance,rs)',
+				}
+			}, #.db.snp_biopolymer_position
+			
+			
 			##################################################
 			# biopolymer tables
 			
@@ -429,6 +479,22 @@ class Database(object):
 			}, #.db.biopolymer_name_name
 			
 			
+			'biopolymer_name_stats': {
+				# materialized by finalizeDatabase(); type_id 0 summarizes names across all types
+				'table': """
+(
+  namespace_id INTEGER NOT NULL,
+  type_id TINYINT NOT NULL,
+  names INTEGER NOT NULL,
+  `unique` INTEGER NOT NULL,
+  ambiguous INTEGER NOT NULL,
+  PRIMARY KEY (type_id,namespace_id)
+)
+""",
+				'index': {}
+			}, #.db.biopolymer_name_stats
+			
+			
 			'biopolymer_region': { # all coordinates in LOKI are 1-based closed intervals
 				'table': """
 (
@@ -503,6 +569,22 @@ class Database(object):
 			}, #.db.group_name
 			
 			
+			'group_name_stats': {
+				# materialized by finalizeDatabase(); type_id 0 summarizes names across all types
+				'table': """
+(
+  namespace_id INTEGER NOT NULL,
+  type_id TINYINT NOT NULL,
+  names INTEGER NOT NULL,
+  `unique` INTEGER NOT NULL,
+  ambiguous INTEGER NOT NULL,
+  PRIMARY KEY (type_id,namespace_id)
+)
+""",
+				'index': {}
+			}, #.db.group_name_stats
+			
+			
 			'group_group': {
 				'table': """
 (
@@ -521,6 +603,23 @@ class Database(object):
 			}, #.db.group_group
 			
 			
+			'group_closure': {
+				# relationship_id is shared by every edge on the path, or 0 if the path mixes relationships
+				'table': """
+(
+  group_id INTEGER NOT NULL,
+  descendant_id INTEGER NOT NULL,
+  relationship_id SMALLINT NOT NULL,
+  depth TINYINT NOT NULL,
+  PRIMARY KEY (group_id,descendant_id,relationship_id)
+)
+""",
+				'index': {
+					'group_closure__descendant': '(descendant_id,group_id)',
+				}
+			}, #.db.group_closure
+			
+			
 			'group_biopolymer': {
 				'table': """
 (
@@ -630,11 +729,57 @@ class Database(object):
 	} #_schema{}
 	
 	
+	# derived tables added to the schema after release; read-only connections accept files without them
+	_optionalTables = ('snp_biopolymer_position', 'biopolymer_name_stats', 'group_name_stats', 'group_closure')
+	
+	
+	# result fields of the generators supported by generateColumnar(), as (name,dtype);
+	# 'str' fields are text and 'object' fields are passed through from the inputs
+	_columnarFields = {
+		'generateSNPLociByRSes': (('rs','<i8'), ('extra','object'), ('chr','<i1'), ('pos','<i8')),
+		'generateSNPsByRegions': (('label','str'), ('extra','object'), ('rs','<i8'), ('chr','<i1'), ('pos','<i8')),
+		'generateRSesByLoci': (('chr','object'), ('pos','<i8'), ('extra','object'), ('rs','<i8')),
+		'generateBiopolymerIDsByIdentifiers': (('namespace','str'), ('name','str'), ('extra','object'), ('id','<i8')),
+		'generateTypedBiopolymerIDsByIdentifiers': (('namespace','str'), ('name','str'), ('extra','object'), ('id','<i8')),
+		'generateBiopolymersByRegions': (('label','str'), ('extra','object'), ('biopolymer_id','<i8')),
+		'generateBiopolymersByPositions': (('label','str'), ('extra','object'), ('biopolymer_id','<i8'), ('distance','<i8')),
+		'generateBiopolymersByRSes': (('rs','<i8'), ('extra','object'), ('biopolymer_id','<i8'), ('distance','<i8')),
+		'generateRSesByBiopolymerIDs': (('biopolymer_id','<i8'), ('extra','object'), ('rs','<i8'), ('distance','<i8')),
+		'generateGroupIDsByIdentifiers': (('namespace','str'), ('name','str'), ('extra','object'), ('id','<i8')),
+		'generateTypedGroupIDsByIdentifiers': (('namespace','str'), ('name','str'), ('extra','object'), ('id','<i8')),
+		'generateLiftOverRegions': (('label','str'), ('chr','<i1'), ('posMin','<i8'), ('posMax','<i8'), ('extra','object')),
+		'generateLiftOverLoci': (('label','str'), ('chr','<i1'), ('pos','<i8'), ('extra','object')),
+	} #_columnarFields{}
+	
+	
+	# the columnar implementations of lookups for generateColumnar(), as (method, leading arguments)
+	_columnarMethods = {
+		'generateSNPLociByRSes': ('_generateSNPLocusColumns', ()),
+		'generateSNPsByRegions': ('_generateSNPRegionColumns', ()),
+		'generateBiopolymersByRegions': ('_generateBiopolymerRegionColumns', ()),
+		'generateBiopolymerIDsByIdentifiers': ('_generateIdentifierColumns', ('biopolymer', None)),
+		'generateTypedBiopolymerIDsByIdentifiers': ('_generateIdentifierColumns', ('biopolymer',)),
+		'generateGroupIDsByIdentifiers': ('_generateIdentifierColumns', ('group', None)),
+		'generateTypedGroupIDsByIdentifiers': ('_generateIdentifierColumns', ('group',)),
+		'generateLiftOverRegions': ('_generateLiftOverColumns', (False,)),
+		'generateLiftOverLoci': ('_generateLiftOverColumns', (True,)),
+	} #_columnarMethods{}
+	
+	
+	# the input field holding the chromosome, for methods which can be sharded by chromosome
+	_shardChrFields = {
+		'generateSNPsByRegions': 1,
+		'generateRSesByLoci': 0,
+		'generateBiopolymersByRegions': 1,
+		'generateBiopolymersByPositions': 1,
+	} #_shardChrFields{}
+	
+	
 	##################################################
 	# constructor
 	
 	
-	def __init__(self, dbFile=None, testing=False, updating=False, tempMem=False):
+	def __init__(self, dbFile=None, testing=False, updating=False, tempMem=False, readonly=False, immutable=False):
 		"""
 		Initializes a Database instance.
 
@@ -643,20 +788,36 @@ class Database(object):
 			testing (bool, optional): If True, runs in testing mode.
 			updating (bool, optional): If True, runs in updating mode.
 			tempMem (bool, optional): If True, uses memory for temporary storage.
+			readonly (bool, optional): If True, opens database files read-only and memory-mapped, and skips
+				the schema audit when the file matches its stored schema fingerprint.
+			immutable (bool, optional): If True, also promises SQLite that database files will not change
+				while open, so it can skip all file locking; implies readonly.
 		"""
 		# initialize instance properties
 		self._is_test = testing
 		self._updating = updating
+		self._readonly = readonly or immutable
+		self._immutable = immutable
 		self._verbose = True
 		self._logger = None
 		self._logFile = sys.stderr
 		self._logIndent = 0
 		self._logHanging = False
-		self._db = apsw.Connection('')
+		self._db = apsw.Connection('', flags=(apsw.SQLITE_OPEN_READWRITE | apsw.SQLITE_OPEN_CREATE | apsw.SQLITE_OPEN_URI))
 		self._dbFile = None
 		self._dbNew = None
 		self._updater = None
 		self._liftOverCache = dict() # { (from,to) : [] }
+		self._batchSize = 100000
+		self._batchCount = 0
+		self._inputIndices = None # while running one shard of a larger input sequence
+		self._writeDepth = 0
+		self._sidecars = dict() # { name : Sidecar or None }
+		self._snapshotCount = 0
+		self._catalog = None # { table : { key : id } }
+		self._fingerprint = None
+		self._queryCache = None
+		self._queryCacheRows = None
 		
 		self.configureDatabase(tempMem=tempMem)
 		self.attachDatabaseFile(dbFile)
@@ -736,6 +897,28 @@ class Database(object):
 	#setVerbose()
 	
 	
+	def getBatchSize(self):
+		"""
+		Gets the number of inputs loaded per batch by the batched lookup APIs.
+
+		Returns:
+			int: The batch size.
+		"""
+		return self._batchSize
+	#getBatchSize()
+	
+	
+	def setBatchSize(self, size=100000):
+		"""
+		Sets the number of inputs loaded per batch by the batched lookup APIs.
+
+		Args:
+			size (int, optional): The batch size. Defaults to 100000.
+		"""
+		self._batchSize = max(1, int(size))
+	#setBatchSize()
+	
+	
 	def setLogger(self, logger=None):
 		"""
 		Sets the logger object.
@@ -914,6 +1097,12 @@ class Database(object):
 		# until ready and we want the performance gain; for normal read usage,
 		# NORMAL is better so multiple users can share a database file
 		cursor.execute("PRAGMA %slocking_mode = %s" % (db,("EXCLUSIVE" if self._updating else "NORMAL")))
+		
+		# read-only files are never modified, so they can be read through a memory
+		# map instead of copying pages into the cache; sqlite caps this at its
+		# compile-time maximum
+		if self._readonly and db:
+			cursor.execute("PRAGMA %smmap_size = %d" % (db,1 << 40))
 	#configureDatabase()
 	
 		
@@ -968,12 +1157,26 @@ class Database(object):
 		# reset db info
 		self._dbFile = None
 		self._dbNew = None
+		self._sidecars = dict()
+		self._catalog = None
+		self._fingerprint = None
 		
 		# attach the new db file, if any
 		if dbFile:
 			if not quiet:
 				self.logPush("loading knowledge database file '%s' ..." % dbFile)
-			cursor.execute("ATTACH DATABASE ? AS `db`", (dbFile,))
+			if self._readonly and not os.path.exists(dbFile):
+				if not quiet:
+					self.logPop("... ERROR (Cannot create a read-only database)\n")
+				return
+			if self._readonly:
+				uri = "file:%s?mode=ro%s" % (urllib.parse.quote(os.path.abspath(dbFile)), ("&immutable=1" if self._immutable else ""))
+				cursor.execute("ATTACH DATABASE ? AS `db`", (uri,))
+				# also refuse writes on the connection itself, so nothing can be changed through
+				# a read-only handle even if the file could be opened for writing
+				cursor.execute("PRAGMA `db`.query_only = ON")
+			else:
+				cursor.execute("ATTACH DATABASE ? AS `db`", (dbFile,))
 			self._dbFile = dbFile
 			self._dbNew = (0 == max(row[0] for row in cursor.execute("SELECT COUNT(1) FROM `db`.`sqlite_master`")))
 			self.configureDatabase('db')
@@ -981,14 +1184,30 @@ class Database(object):
 			# establish or audit database schema
 			err_msg = ""
 			with self._db:
-				if self._dbNew:
+				if self._dbNew and self._readonly:
+					ok = False
+					err_msg = "Cannot create a read-only database"
+				elif self._dbNew:
 					self.createDatabaseObjects(None, 'db')
 					ok = True
+				elif self._readonly:
+					# a matching fingerprint means the file passed a full audit against this schema
+					try:
+						fingerprint = self.getDatabaseSetting('schema_fingerprint')
+					except apsw.SQLError:
+						fingerprint = None
+					# files from before the optional tables were added are audited without them
+					tblList = [tbl for tbl in self._schema['db'] if tbl not in self._optionalTables or self._hasDatabaseTable(tbl)]
+					ok = (fingerprint == self.getSchemaFingerprint()) or self.auditDatabaseObjects(None, 'db', tblList, doRepair=False)
+					if not ok:
+						err_msg = "Audit of database failed"
 				else:
 					self.updateDatabaseSchema()
 					ok = self.auditDatabaseObjects(None, 'db')
 					if not ok:
 						err_msg = "Audit of database failed"
+					else:
+						self.updateSchemaFingerprint()
 				
 				if ok and self._updating:
 					ok = self._checkTesting()
@@ -996,6 +1215,7 @@ class Database(object):
 						err_msg = "Testing settings do not match loaded database"
 			
 			if ok:
+				self.loadMetadataCatalog()
 				if not quiet:
 					self.logPop("loading knowledge database file completed\n")
 			else:
@@ -1022,6 +1242,35 @@ class Database(object):
 	#detachDatabaseFile()
 	
 	
+	def close(self):
+		"""
+		Detaches the current database file and closes the underlying SQLite connection.
+
+		The instance cannot be used again after it is closed.
+		"""
+		if self._dbFile:
+			self.detachDatabaseFile(quiet=True)
+		self._db.close()
+	#close()
+	
+	
+	def _hasDatabaseTable(self, table):
+		"""
+		Checks whether a table exists in the current database file.
+
+		Args:
+			table (str): The name of the table.
+
+		Returns:
+			bool: True if a database file is loaded and contains the table.
+		"""
+		if not self._dbFile:
+			return False
+		sql = "SELECT 1 FROM `db`.`sqlite_master` WHERE type = 'table' AND name = ?"
+		return any(self._db.cursor().execute(sql, (table,)))
+	#_hasDatabaseTable()
+	
+	
 	def testDatabaseWriteable(self):
 		"""
 		Tests if the current database file is writeable.
@@ -1339,11 +1588,57 @@ class Database(object):
 	#auditDatabaseObjects()
 	
 	
-	def finalizeDatabase(self):
+	def getSchemaFingerprint(self):
+		"""
+		Computes a fingerprint of the knowledge database schema.
+
+		Returns:
+			str: A hex digest over both the expected schema and the definitions of the matching tables
+			and indices in the attached file, or None if no database file is loaded.
+
+		Objects in the file which are not part of the expected schema, such as search tables or
+		optimizer statistics, do not affect the fingerprint.
+		"""
+		if not self._dbFile:
+			return None
+		md5 = hashlib.md5()
+		for tblName in sorted(self._schema['db']):
+			tbl = self._schema['db'][tblName]
+			md5.update(repr((tblName, " ".join(tbl['table'].split()), sorted(tbl['index'].items()))).encode())
+		tblNames = set(self._schema['db'])
+		for row in self._db.cursor().execute("SELECT type, name, tbl_name, sql FROM `db`.`sqlite_master` WHERE type IN ('table','index') ORDER BY type, name"):
+			if row[2] in tblNames:
+				md5.update(repr(row).encode())
+		return md5.hexdigest()
+	#getSchemaFingerprint()
+	
+	
+	def updateSchemaFingerprint(self):
+		"""
+		Stores the current schema fingerprint in the database settings, after a successful audit.
+
+		Read-only openings of the database skip the schema audit as long as the stored fingerprint
+		still matches.  Nothing is stored if the database file is not writeable.
+		"""
+		fingerprint = self.getSchemaFingerprint()
+		if fingerprint and (self.getDatabaseSetting('schema_fingerprint') != fingerprint):
+			try:
+				self.setDatabaseSetting('schema_fingerprint', fingerprint)
+			except apsw.ReadOnlyError:
+				pass
+	#updateSchemaFingerprint()
+	
+	
+	def finalizeDatabase(self, positionFlank=0):
 		"""
 		Finalizes the database by discarding intermediate data and setting finalization flags.
 
+		Args:
+			positionFlank (int, optional): The distance around each biopolymer region within which SNPs are
+				recorded in snp_biopolymer_position. Defaults to 0, for SNPs inside regions only.
+
 		The function drops intermediate tables, recreates them, and sets the database settings to indicate that the database is finalized and not optimized.
+		It then materializes the group hierarchy closure and region tree (if they are missing), the name statistics and SNP positions, builds the full-text search tables and, if numpy is available, the sidecar indexes and existence filters stored beside the database file.
 
 		Returns:
 			None
@@ -1354,9 +1649,93 @@ class Database(object):
 		self.log(" OK\n")
 		self.setDatabaseSetting('finalized', 1)
 		self.setDatabaseSetting('optimized', 0)
+		if not self._hasGroupClosure():
+			self.buildGroupClosure()
+		if not self._hasRegionTree():
+			self.buildRegionTree()
+		self.buildNameStats()
+		self.buildSNPBiopolymerPositions(positionFlank)
+		self.buildSearchIndexes()
+		
+		try:
+			import numpy
+		except ImportError:
+			self.log("WARNING: numpy is not available; skipping sidecar indexes and filters\n")
+		else:
+			self.buildSNPLocusIndex()
+			self.buildSNPMergeIndex()
+			self.buildBiopolymerNameIndex()
+			self.buildGroupNameIndex()
+			self.buildPrefixIndexes()
+			self.buildExistenceFilters()
 	#finalizeDatabase()
 	
 	
+	def buildSNPBiopolymerPositions(self, flank=0):
+		"""
+		(Re)computes the positions of SNPs relative to nearby biopolymer regions, for every LD profile.
+
+		Args:
+			flank (int, optional): The distance around each region within which SNPs are recorded. Defaults to 0.
+
+		Raises:
+			Exception: If no database file is loaded.
+
+		Each chromosome's SNP loci are swept once in position order against its regions (see
+		generateBiopolymersByPositions).  A SNP with several loci near the same biopolymer keeps
+		the smallest distance.  The flank is stored in the 'position_flank' setting.
+		"""
+		if not self._dbFile:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		self.log("calculating SNP positions relative to biopolymers ...")
+		cursor = self._db.cursor()
+		with self._db:
+			cursor.execute("DELETE FROM `db`.`snp_biopolymer_position`")
+			self.dropDatabaseIndices(None, 'db', ('snp_biopolymer_position',))
+			sql = """
+INSERT INTO `db`.`snp_biopolymer_position` (rs, ldprofile_id, biopolymer_id, distance) VALUES (?,?,?,?)
+ON CONFLICT (rs, ldprofile_id, biopolymer_id) DO UPDATE SET distance = MIN(distance, excluded.distance)
+"""
+			for ldprofileID,ldprofile in list(cursor.execute("SELECT ldprofile_id, ldprofile FROM `db`.`ldprofile`")):
+				loci = self._db.cursor().execute("SELECT rs, chr, pos, NULL FROM `db`.`snp_locus` ORDER BY chr, pos")
+				cursor.executemany(sql, ((row[0], ldprofileID, row[2], row[3]) for row in self.generateBiopolymersByPositions(loci, ldprofile, padding=flank)))
+			self.createDatabaseIndices(None, 'db', ('snp_biopolymer_position',))
+			self.setDatabaseSetting('position_flank', int(flank))
+			for row in cursor.execute("SELECT COUNT(), COUNT(DISTINCT rs) FROM `db`.`snp_biopolymer_position`"):
+				numTotal = row[0]
+				numSNPs = row[1]
+		self.log(" OK: %d records (%d SNPs)\n" % (numTotal,numSNPs))
+	#buildSNPBiopolymerPositions()
+	
+	
+	def buildGroupClosure(self):
+		"""
+		(Re)computes the group hierarchy closure from the group containment relationships.
+
+		Raises:
+			Exception: If no database file is loaded.
+
+		Every group is recorded with each group it contains at any depth, once per relationship
+		shared by a whole path between them (or 0 for paths which mix relationships), with the
+		length of the shortest such path.
+		"""
+		if not self._dbFile:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		self.log("calculating group hierarchy closure ...")
+		cursor = self._db.cursor()
+		with self._db:
+			cursor.execute("DELETE FROM `db`.`group_closure`")
+			cursor.executemany(
+				"INSERT OR IGNORE INTO `db`.`group_closure` (group_id,descendant_id,relationship_id,depth) VALUES (?,?,?,?)",
+				self._generateGroupClosure(self._getGroupContainmentEdges())
+			)
+			for row in cursor.execute("SELECT COUNT(), COUNT(DISTINCT group_id) FROM `db`.`group_closure`"):
+				numTotal = row[0]
+				numGroups = row[1]
+		self.log(" OK: %d records (%d groups)\n" % (numTotal,numGroups))
+	#buildGroupClosure()
+	
+	
 	def optimizeDatabase(self):
 		"""
 		Optimizes the database by updating optimizer statistics and compacting the database file.
@@ -1428,6 +1807,7 @@ class Database(object):
 			None
 		"""
 		self._db.cursor().execute("INSERT OR REPLACE INTO `db`.`setting` (setting, value) VALUES (?, ?)", (setting,value))
+		self._fingerprint = None
 	#setDatabaseSetting()
 	
 	
@@ -1508,7 +1888,11 @@ class Database(object):
 		if not self._updater:
 			import loki.loki_updater as loki_updater
 			self._updater = loki_updater.Updater(self, self._is_test)
-		return self._updater.updateDatabase(sources, sourceOptions, cacheOnly, forceUpdate)
+		self._sidecars = dict()
+		try:
+			return self._updater.updateDatabase(sources, sourceOptions, cacheOnly, forceUpdate)
+		finally:
+			self._fingerprint = None
 	#updateDatabase()
 	
 	
@@ -1552,138 +1936,2629 @@ class Database(object):
 	
 	
 	##################################################
-	# metadata retrieval
+	# in-memory snapshot
 	
 	
-	def generateGRChByUCSChg(self, ucschg):
+	def loadDatabaseSnapshot(self, tables=None, sharedPath=None, pagesPerStep=4096):
 		"""
-		Generates GRCh values based on a given UCSC chain identifier.
+		Copies the attached knowledge database file into memory, so that all further queries run without disk I/O.
 
 		Args:
-			ucschg (str): The UCSC chain identifier.
+			tables (list, optional): The data tables to copy. Defaults to None, to copy the whole file.
+			sharedPath (str, optional): A file on a memory-backed filesystem such as /dev/shm to hold the
+				copy, instead of this process's private memory. Defaults to None.
+			pagesPerStep (int, optional): The number of pages copied between progress reports. Defaults to 4096.
 
-		Returns:
-			generator: A generator yielding GRCh values corresponding to the given UCSC chain identifier.
-		"""
-		return (row[0] for row in self._db.cursor().execute("SELECT grch FROM grch_ucschg WHERE ucschg = ?", (ucschg,)))
-	#generateGRChByUCSChg()
-	
-	
-	def getUCSChgByGRCh(self, grch):
-		"""
-		Retrieves the UCSC chain identifier for a given GRCh value.
+		Raises:
+			Exception: If no database file is loaded.
 
-		Args:
-			grch (str): The GRCh value.
+		The whole file is copied page by page with SQLite's online backup API, including the search
+		indexes and region tree.  If specific tables are given, the configuration and metadata tables
+		are copied along with them, and every other table is left empty.
 
-		Returns:
-			str: The UCSC chain identifier corresponding to the given GRCh value, or None if not found.
+		A shared copy is written once and then memory-mapped read-only, so every process which loads
+		a snapshot at the same path, such as forked workers, reads the same pages rather than keeping
+		a private copy.  An existing shared copy is reused as long as it was taken from the same
+		database (by its fingerprint), so each selection of tables needs its own path.
+
+		The original file name is kept, so sidecar indexes are still found beside it; changes to the
+		snapshot are never written back, and attaching a database file again ends the snapshot.
 		"""
-		ucschg = None
-		for row in self._db.cursor().execute("SELECT ucschg FROM grch_ucschg WHERE grch = ?", (grch,)):
-			ucschg = row[0]
-		return ucschg
-	#getUCSChgByGRCh()
+		if not self._dbFile:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		dbFile = self._dbFile
+		fingerprint = self.getDatabaseFingerprint()
+		source = "file:%s?mode=ro%s" % (urllib.parse.quote(os.path.abspath(dbFile)), ("&immutable=1" if self._immutable else ""))
+		cursor = self._db.cursor()
+		
+		# reuse an existing shared copy of the same database
+		if sharedPath:
+			sharedPath = os.path.abspath(sharedPath)
+			image = "file:%s?mode=ro&immutable=1" % (urllib.parse.quote(sharedPath),)
+			if os.path.exists(sharedPath):
+				cursor.execute("DETACH DATABASE `db`")
+				cursor.execute("ATTACH DATABASE ? AS `db`", (image,))
+				self._fingerprint = None
+				if self.getDatabaseFingerprint() == fingerprint:
+					self.log("loading knowledge database snapshot '%s' ... OK\n" % (sharedPath,))
+					cursor.execute("PRAGMA `db`.mmap_size = %d" % (1 << 40,))
+					return
+				cursor.execute("DETACH DATABASE `db`")
+				cursor.execute("ATTACH DATABASE ? AS `db`", (source,))
+				self._fingerprint = fingerprint
+		#if sharedPath
+		
+		# copy into a new shared file, or into an in-memory database which only lives as long as it is attached
+		pageSize = max(row[0] for row in cursor.execute("PRAGMA `db`.page_size"))
+		if sharedPath:
+			target = tmpPath = "%s.%d.tmp" % (sharedPath, os.getpid())
+			if os.path.exists(tmpPath):
+				os.remove(tmpPath)
+		else:
+			tmpPath = None
+			self._snapshotCount += 1
+			target = "file:/loki_snapshot_%d_%d?vfs=memdb" % (id(self), self._snapshotCount)
+		location = "shared memory" if sharedPath else "memory"
+		
+		cursor.execute("DETACH DATABASE `db`")
+		try:
+			if not tables:
+				# the backup needs its own destination connection, since it can't proceed while
+				# any other statement is open on the destination
+				self.logPush("copying knowledge database file into %s ...\n" % (location,))
+				srcDB = apsw.Connection(source, flags=(apsw.SQLITE_OPEN_READONLY | apsw.SQLITE_OPEN_URI))
+				dstDB = apsw.Connection(target, flags=(apsw.SQLITE_OPEN_READWRITE | apsw.SQLITE_OPEN_CREATE | apsw.SQLITE_OPEN_URI))
+				try:
+					dstDB.cursor().execute("PRAGMA page_size = %d" % (pageSize,))
+					backup = dstDB.backup('main', srcDB, 'main')
+					try:
+						progress = 0
+						while not backup.done:
+							backup.step(pagesPerStep)
+							if backup.pagecount and ((backup.pagecount - backup.remaining) * 10 // backup.pagecount > progress):
+								progress = (backup.pagecount - backup.remaining) * 10 // backup.pagecount
+								self.log("%d%% (%d of %d pages)\n" % (progress * 10, backup.pagecount - backup.remaining, backup.pagecount))
+					finally:
+						backup.finish()
+					if not sharedPath:
+						cursor.execute("ATTACH DATABASE ? AS `db`", (target,))
+				finally:
+					dstDB.close()
+					srcDB.close()
+				self.logPop("... OK\n")
+			else:
+				self.logPush("copying knowledge database tables into %s ...\n" % (location,))
+				copyTables = set(tables)
+				copyTables.update(('setting','grch_ucschg','ldprofile','namespace','relationship','role','source','source_option','source_file','type','subtype','warning'))
+				cursor.execute("ATTACH DATABASE ? AS `db`", (target,))
+				cursor.execute("PRAGMA `db`.page_size = %d" % (pageSize,))
+				cursor.execute("ATTACH DATABASE ? AS `snapshot_source`", (source,))
+				try:
+					with self._temporaryWrites(), self._db:
+						self.createDatabaseObjects(None, 'db', doIndecies=False)
+						for tblName in self._schema['db']:
+							cursor.execute("DELETE FROM `db`.`%s`" % (tblName,))
+							if tblName in copyTables:
+								self.log("%s ..." % (tblName,))
+								cursor.execute("INSERT INTO `db`.`%s` SELECT * FROM `snapshot_source`.`%s`" % (tblName,tblName))
+								self.log(" OK: %d rows\n" % (self._db.changes(),))
+						#foreach table
+						self.log("indexing ...")
+						self.createDatabaseObjects(None, 'db', doTables=False)
+						self.log(" OK\n")
+				finally:
+					cursor.execute("DETACH DATABASE `snapshot_source`")
+				if sharedPath:
+					cursor.execute("DETACH DATABASE `db`")
+				self.logPop("... OK\n")
+			#if tables
+			
+			if sharedPath:
+				os.replace(tmpPath, sharedPath)
+				cursor.execute("ATTACH DATABASE ? AS `db`", (image,))
+				cursor.execute("PRAGMA `db`.mmap_size = %d" % (1 << 40,))
+			else:
+				self.configureDatabase('db')
+		except:
+			# fall back to the original file
+			try:
+				cursor.execute("DETACH DATABASE `db`")
+			except apsw.SQLError:
+				pass
+			if tmpPath and os.path.exists(tmpPath):
+				os.remove(tmpPath)
+			cursor.execute("ATTACH DATABASE ? AS `db`", ((source if self._readonly else dbFile),))
+			self.configureDatabase('db')
+			raise
+	#loadDatabaseSnapshot()
 	
 	
-	def getLDProfileID(self, ldprofile):
+	##################################################
+	# batched input
+	
+	
+	def _getInputIndex(self, idx):
 		"""
-		Retrieves the identifier for a given LD profile.
+		Maps an input's position among a method's inputs to its position for error messages.
 
 		Args:
-			ldprofile (str): The LD profile name.
+			idx (int): The 1-based position of the input among the inputs given to the method.
 
 		Returns:
-			int: The identifier of the LD profile, or None if not found.
+			int: The position to report, which refers to the whole input sequence when the method
+			is running on one shard of it (see generateSharded).
 		"""
-		return self.getLDProfileIDs([ldprofile])[ldprofile]
-	#getLDProfileID()
+		if self._inputIndices == None:
+			return idx
+		if isinstance(self._inputIndices, int):
+			return self._inputIndices + idx
+		return self._inputIndices[idx - 1]
+	#_getInputIndex()
 	
 	
-	def getLDProfileIDs(self, ldprofiles):
+	@contextlib.contextmanager
+	def _temporaryWrites(self):
 		"""
-		Retrieves the identifiers for a list of LD profiles.
-
-		Args:
-			ldprofiles (list): A list of LD profile names.
+		Allows writes to temporary tables for the duration of a with-block.
 
-		Returns:
-			dict: A dictionary mapping LD profile names to their identifiers.
+		A read-only connection is query_only, which also refuses writes to its temporary
+		tables; this lifts that while the block runs, and restores it afterward.  Blocks
+		may be nested, but should not span a yield, so the connection is never left
+		writable while a caller holds a generator.
 		"""
-		if not self._dbFile:
-			return { l:None for l in ldprofiles }
-		sql = "SELECT i.ldprofile, l.ldprofile_id FROM (SELECT ? AS ldprofile) AS i LEFT JOIN `db`.`ldprofile` AS l ON LOWER(TRIM(l.ldprofile)) = LOWER(TRIM(i.ldprofile))"
-		with self._db:
-			ret = { row[0]:row[1] for row in self._db.cursor().executemany(sql, zip(ldprofiles)) }
-		return ret
-	#getLDProfileIDs()
+		if not self._readonly:
+			yield
+			return
+		cursor = self._db.cursor()
+		if self._writeDepth == 0:
+			cursor.execute("PRAGMA query_only = OFF")
+		self._writeDepth += 1
+		try:
+			yield
+		finally:
+			self._writeDepth -= 1
+			if self._writeDepth == 0:
+				cursor.execute("PRAGMA query_only = ON")
+	#_temporaryWrites()
 	
 	
-	def getLDProfiles(self, ldprofiles=None):
+	def _generateInputBatches(self, columns, inputs, index=None):
 		"""
-		Retrieves detailed information about LD profiles.
+		Loads input tuples into a temporary table one batch at a time.
 
 		Args:
-			ldprofiles (list, optional): A list of LD profile names. Defaults to None, which retrieves information for all profiles.
+			columns (tuple): The column names for the fields of each input tuple.
+			inputs (iterable): The input tuples.
+			index (tuple, optional): Column names to index the table by, so queries can read each batch
+				in that order rather than in input order. Defaults to None.
 
-		Returns:
-			dict: A dictionary mapping LD profile names to a tuple containing their identifier, description, metric, and value.
-		"""
-		if not self._dbFile:
-			return { l:None for l in (ldprofiles or list()) }
-		with self._db:
-			if ldprofiles:
-				sql = "SELECT i.ldprofile, l.ldprofile_id, l.description, l.metric, l.value FROM (SELECT ? AS ldprofile) AS i LEFT JOIN `db`.`ldprofile` AS l ON LOWER(TRIM(l.ldprofile)) = LOWER(TRIM(i.ldprofile))"
-				ret = { row[0]:row[1:] for row in self._db.cursor().executemany(sql, zip(ldprofiles)) }
-			else:
-				sql = "SELECT l.ldprofile, l.ldprofile_id, l.description, l.metric, l.value FROM `db`.`ldprofile` AS l"
-				ret = { row[0]:row[1:] for row in self._db.cursor().execute(sql) }
-		return ret
-	#getLDProfiles()
-	
-	
-	def getNamespaceID(self, namespace):
-		"""
-		Retrieves the identifier for a given namespace.
+		Yields:
+			str: The qualified name of the temporary table holding the current batch.
+
+		Besides the given columns, the table has an 'idx' column holding each input's
+		1-based position in the full input sequence, so queries can preserve input order.
+		The batch is discarded when the generator is resumed, so each batch should be
+		fully queried before requesting the next one.
+		"""
+		# columns=( name, ... )
+		# inputs=[ (value, ...), ... ]
+		# yields:"`temp`.`_batch_input_N`" once per batch
+		self._batchCount += 1
+		tblName = "_batch_input_%d" % self._batchCount
+		cursor = self._db.cursor()
+		# input columns are untyped so values are returned with the same types as they were
+		# given; they are compared like bound parameters except against text columns, which
+		# need a '+' on the input column to convert non-text values to text first
+		with self._temporaryWrites():
+			cursor.execute("CREATE TEMP TABLE `temp`.`%s` (idx INTEGER PRIMARY KEY NOT NULL, %s)" % (tblName, ", ".join(columns)))
+			if index:
+				cursor.execute("CREATE INDEX `temp`.`%s__index` ON `%s` (%s)" % (tblName, tblName, ", ".join(index)))
+		sql = "INSERT INTO `temp`.`%s` VALUES (?%s)" % (tblName, ",?"*len(columns))
+		try:
+			inputs = iter(inputs)
+			n = 0
+			while True:
+				batch = [ ((n+i),)+tuple(row) for i,row in enumerate(itertools.islice(inputs, self._batchSize), 1) ]
+				if not batch:
+					break
+				with self._temporaryWrites():
+					cursor.executemany(sql, batch)
+				n += len(batch)
+				yield "`temp`.`%s`" % tblName
+				with self._temporaryWrites():
+					cursor.execute("DELETE FROM `temp`.`%s`" % tblName)
+			#while inputs
+		finally:
+			with self._temporaryWrites():
+				cursor.execute("DROP TABLE IF EXISTS `temp`.`%s`" % tblName)
+	#_generateInputBatches()
+	
+	
+	def _generateBatchQueryRows(self, sql, columns, inputs):
+		"""
+		Runs a query once per batch of inputs and generates all result rows.
 
 		Args:
-			namespace (str): The namespace name.
+			sql (str): The query to run, with '{batch}' in place of the batch table name.
+			columns (tuple): The column names for the fields of each input tuple.
+			inputs (iterable): The input tuples.
 
-		Returns:
-			int: The identifier of the namespace, or None if not found.
+		Yields:
+			tuple: Each result row of the query, for each batch in turn.
 		"""
-		return self.getNamespaceIDs([namespace])[namespace]
-	#getNamespaceID()
+		cursor = self._db.cursor()
+		batches = self._generateInputBatches(columns, inputs)
+		try:
+			for batch in batches:
+				for row in cursor.execute(sql.format(batch=batch)):
+					yield row
+		finally:
+			# the query cursor must let go of the batch table before it can be dropped
+			cursor.close()
+			batches.close()
+	#_generateBatchQueryRows()
 	
 	
-	def getNamespaceIDs(self, namespaces):
+	def _generateIdentifierQueryRows(self, table, typeID, identifiers):
 		"""
-		Retrieves the identifiers for a list of namespaces.
+		Matches identifiers against the names, labels or IDs of biopolymers or groups in the database.
 
 		Args:
-			namespaces (list): A list of namespace names.
+			table (str): The object table, either 'biopolymer' or 'group'.
+			typeID (int or Falseish): Type ID of the matched objects, or Falseish for any type.
+			identifiers (list): A list of tuples, where each tuple contains (namespace, name, extra).
 
-		Returns:
-			dict: A dictionary mapping namespace names to their identifiers.
+		Yields:
+			tuple: A tuple containing (idx, namespace, name, extra, id) for each match, and one with id
+			None for every identifier, ordered by the 1-based input position idx.
+
+		Each identifier's namespace is resolved up front into the kind of match it needs, and every
+		kind is matched by its own branch of the query through the index that suits it, instead of
+		one statement which tries every kind of match for every identifier.
+
+		Names and labels are compared to '+' expressions, which have no affinity, so that non-text
+		identifiers such as integers are converted to text first, just as bound parameters are.
 		"""
-		if not self._dbFile:
-			return { n:None for n in namespaces }
-		sql = "SELECT i.namespace, n.namespace_id FROM (SELECT ? AS namespace) AS i LEFT JOIN `db`.`namespace` AS n ON n.namespace = LOWER(i.namespace)"
-		with self._db:
-			ret = { row[0]:row[1] for row in self._db.cursor().executemany(sql, zip(namespaces)) }
-		return ret
-	#getNamespaceIDs()
+		# identifiers=[ (namespace,name,extra), ... ]
+		#   namespace='' or '*' for any, '-' for labels, '=' for id
+		# yields (idx,namespace,name,extra,id)
+		typeFilter = ("  AND t.type_id = %d\n" % int(typeID)) if typeID else ""
+		sql = """
+SELECT i.idx, i.namespace, i.identifier, i.extra, t.{0}_id
+FROM {{batch}} AS i
+JOIN `db`.`{0}` AS t
+  ON t.{0}_id = 1*i.identifier
+{1}WHERE i.kind = '='
+UNION ALL
+SELECT i.idx, i.namespace, i.identifier, i.extra, t.{0}_id
+FROM {{batch}} AS i
+JOIN `db`.`{0}` AS t
+  ON t.label = +i.identifier
+{1}WHERE i.kind = '-'
+UNION ALL
+SELECT i.idx, i.namespace, i.identifier, i.extra, t.{0}_id
+FROM {{batch}} AS i
+JOIN `db`.`{0}_name` AS tn
+  ON tn.name = +i.probe
+  AND tn.namespace_id = i.namespace_id
+JOIN `db`.`{0}` AS t
+  ON t.{0}_id = tn.{0}_id
+{1}WHERE i.kind = 'namespace'
+UNION ALL
+SELECT i.idx, i.namespace, i.identifier, i.extra, t.{0}_id
+FROM {{batch}} AS i
+JOIN `db`.`{0}_name` AS tn
+  ON tn.name = +i.probe
+JOIN `db`.`{0}` AS t
+  ON t.{0}_id = tn.{0}_id
+{1}WHERE i.kind = '*'
+UNION ALL
+SELECT i.idx, i.namespace, i.identifier, i.extra, NULL
+FROM {{batch}} AS i
+ORDER BY 1
+""".format(table, typeFilter)
+		
+		# kinds={ namespace : (kind,namespace_id) } with kind None if nothing can match
+		kinds = { '=':('=',None), '-':('-',None) }
+		def _inputs():
+			for namespace,name,extra in identifiers:
+				if namespace not in kinds:
+					ns = namespace.strip(' ').lower() if (namespace != None) else None
+					if ns == None:
+						kinds[namespace] = (None,None)
+					elif ns in ('','*'):
+						kinds[namespace] = ('*',None)
+					else:
+						nsID = self.getNamespaceID(ns)
+						kinds[namespace] = (('namespace' if nsID else None),nsID)
+				yield (namespace, name, extra) + kinds[namespace]
+		#_inputs()
+		
+		# only names can be ruled out by the filter, and SQL only matches them as text
+		def _getKey(row):
+			return self._getNameHash(row[1]) if (row[3] in ('namespace','*') and isinstance(row[1], str)) else None
+		#_getKey()
+		
+		inputs = self._generateProbedInputs(table + '_name', _inputs(), 1, _getKey)
+		return self._generateBatchQueryRows(sql, ('namespace','identifier','extra','kind','namespace_id','probe'), inputs)
+	#_generateIdentifierQueryRows()
 	
 	
-	def getRelationshipID(self, relationship):
+	##################################################
+	# sharded execution
+	
+	
+	def generateSharded(self, method, inputs, processes=None, chunkSize=None, tally=None, errorCallback=None, partition='chunk', **kwargs):
 		"""
-		Retrieves the identifier for a given relationship.
+		Runs a lookup over a very large input sequence on a pool of worker processes.
 
 		Args:
-			relationship (str): The relationship name.
+			method (str): The name of a Database generator method taking the inputs as its first
+				argument, such as 'generateSNPLociByRSes'.
+			inputs (iterable): The input tuples, as expected by the method.
+			processes (int, optional): The number of worker processes. Defaults to the number of CPUs.
+			chunkSize (int, optional): The number of inputs sent to a worker at a time. Defaults to the batch size.
+			tally (dict, optional): If given, receives the method's tally counts summed over all chunks. Defaults to None.
+			errorCallback (callable, optional): If given, receives the method's errors in input order. Defaults to None.
+			partition (str, optional): How inputs are grouped into chunks: 'chunk' for consecutive runs of inputs,
+				'chr' for inputs on the same chromosome, or 'hash' for inputs with equal values. Defaults to 'chunk'.
+			**kwargs: Additional keyword arguments for the method.
 
-		Returns:
-			int: The identifier of the relationship, or None if not found.
+		Yields:
+			tuple: The method's results, in input order.
+
+		Raises:
+			Exception: If no database file is loaded, the partition is not supported, or the method
+				has no chromosome input for the 'chr' partition.
+
+		The inputs are split into chunks which are fanned out to the workers; each worker opens
+		the knowledge database file itself.  Only a few chunks per worker are in flight at once,
+		so the inputs may be an arbitrarily long iterator.  Input positions in error messages
+		("at index N") refer to the whole input sequence.
+
+		With the 'chr' or 'hash' partition, each worker sees a related subset of the inputs, such
+		as all positions on one chromosome for generateBiopolymersByPositions(), and the results
+		are merged back into input order as the chunks holding earlier inputs complete.  Inputs
+		are grouped by all their fields but the last, which must be the 'extra' value that the
+		method passes through to its results.
+		"""
+		import heapq
+		import multiprocessing
+		import loki.loki_pool as loki_pool
+		
+		if not self._dbFile:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		if partition not in ('chunk','chr','hash'):
+			raise Exception("ERROR: unknown partition '%s'" % (partition,))
+		chrField = None
+		if partition == 'chr':
+			chrField = self._shardChrFields.get(method)
+			if chrField == None:
+				raise Exception("ERROR: method '%s' has no chromosome input to partition by" % (method,))
+		processes = processes or os.cpu_count() or 4
+		chunkSize = chunkSize or self._batchSize
+		if tally != None:
+			kwargs['tally'] = True
+		if errorCallback:
+			kwargs['errorCallback'] = True
+		
+		pool = multiprocessing.Pool(processes, loki_pool._initShardWorker, (self._dbFile,))
+		try:
+			pending = collections.deque() # (first input position, result) in the order sent
+			inputs = iter(inputs)
+			n = 0
+			
+			# consecutive chunks complete in input order, so their results pass straight through
+			if partition == 'chunk':
+				while True:
+					while len(pending) < 2 * processes:
+						chunk = list(itertools.islice(inputs, chunkSize))
+						if not chunk:
+							break
+						pending.append((n + 1, pool.apply_async(loki_pool._runShard, (method, chunk, kwargs, n))))
+						n += len(chunk)
+					if not pending:
+						break
+					rows,counts,errors = pending.popleft()[1].get()
+					if tally != None:
+						for key,count in counts.items():
+							tally[key] = tally.get(key, 0) + count
+					if errorCallback:
+						for line,err in errors:
+							errorCallback(line, err)
+					for row in rows:
+						yield row
+				#while chunks
+				return
+			#if chunk
+			
+			# other partitions fill one bucket of inputs per key, each sent off once it holds a
+			# full chunk; results wait in heaps until every earlier input has been looked up
+			buckets = dict() # { key : ([position, ...], [input, ...]) }
+			results = list() # heap of (position, sequence, row)
+			failures = list() # heap of (position, sequence, line, error)
+			sequence = itertools.count()
+			more = True
+			def _send(key):
+				indices,chunk = buckets.pop(key)
+				pending.append((indices[0], pool.apply_async(loki_pool._runShard, (method, chunk, kwargs, indices))))
+			#_send()
+			while True:
+				while more and len(pending) < 2 * processes:
+					row = next(inputs, None)
+					if row == None:
+						more = False
+						for key in list(buckets):
+							_send(key)
+						break
+					n += 1
+					if partition == 'chr':
+						key = self._getChrNum(row[chrField])
+					else:
+						key = hash(tuple(row[:-1])) % processes
+					if key not in buckets:
+						buckets[key] = (list(), list())
+					buckets[key][0].append(n)
+					buckets[key][1].append(row)
+					if len(buckets[key][1]) >= chunkSize:
+						_send(key)
+						# don't let a rarely seen key hold back the results of everything after it
+						for key in [key for key,bucket in buckets.items() if bucket[0][0] <= n - 2 * processes * chunkSize]:
+							_send(key)
+				#while reading
+				if not pending:
+					break
+				rows,counts,errors = pending.popleft()[1].get()
+				if tally != None:
+					for key,count in counts.items():
+						tally[key] = tally.get(key, 0) + count
+				for idx,row in rows:
+					heapq.heappush(results, (idx, next(sequence), row))
+				for idx,line,err in errors:
+					heapq.heappush(failures, (idx, next(sequence), line, err))
+				
+				# release everything before the earliest input which is still waiting or in flight
+				waiting = [chunk[0] for chunk in pending] + [bucket[0][0] for bucket in buckets.values()]
+				if more:
+					waiting.append(n + 1)
+				earliest = min(waiting) if waiting else n + 1
+				while failures and failures[0][0] < earliest:
+					idx,_,line,err = heapq.heappop(failures)
+					if errorCallback:
+						errorCallback(line, err)
+				while results and results[0][0] < earliest:
+					yield heapq.heappop(results)[2]
+			#while chunks
+		finally:
+			pool.terminate()
+			pool.join()
+	#generateSharded()
+	
+	
+	##################################################
+	# columnar output
+	
+	
+	def generateColumnar(self, method, *args, fields=None, batchSize=None, strings='object', **kwargs):
+		"""
+		Runs a lookup and produces its results as columnar batches of NumPy arrays.
+
+		Args:
+			method (str): The name of the Database generator method, such as 'generateSNPLociByRSes'.
+			*args, **kwargs: The method's arguments.
+			fields (list, optional): A list of (name, dtype) tuples, one per field of the method's results.
+				Defaults to the known fields of the method; required for any other method.
+			batchSize (int, optional): The number of results per batch. Defaults to the batch size.
+			strings (str, optional): How to store 'str' fields: 'object' for arrays of Python strings, or
+				'pool' for a (pool, offsets) tuple laid out like a sidecar string column. Defaults to 'object'.
+
+		Yields:
+			dict: A batch of up to batchSize results, as { name : array } in the method's field order.
+
+		Raises:
+			Exception: If the fields of the method are not known, the string storage is not supported,
+				or a result value does not fit its numeric field.
+
+		None in an integer field is stored as -1; in a pooled string field it is stored as ''.
+
+		SNP locus, region, identifier and liftOver lookups have columnar implementations (see
+		_columnarMethods), which match each batch of inputs with whole-array operations on the
+		sidecar indexes, or read each batch's matches from the database in one fetch, and never
+		build a result tuple.  They produce the same results as the methods themselves, except
+		that matches for one identifier come in biopolymer or group ID order.  Any other method
+		still produces its results row by row, and those are transposed into columns.
+		"""
+		import numpy
+		
+		# fields=[ (name,dtype), ... ]
+		fields = fields or self._columnarFields.get(method)
+		if not fields:
+			raise Exception("ERROR: result fields of '%s' are not known" % (method,))
+		if strings not in ('object','pool'):
+			raise Exception("ERROR: unsupported string storage '%s'" % (strings,))
+		batchSize = batchSize or self._batchSize
+		
+		# parts=[ [array, ...], ... ] with one array per field, of any length
+		if method in self._columnarMethods:
+			helper,leading = self._columnarMethods[method]
+			parts = getattr(self, helper)(*(leading + args), **kwargs)
+		else:
+			parts = self._generateRowColumns(getattr(self, method)(*args, **kwargs), batchSize)
+		
+		# re-cut the parts into batches of exactly batchSize results, except the last
+		pending = list()
+		size = 0
+		for part in itertools.chain(parts, [None]):
+			if part != None:
+				if len(part[0]):
+					pending.append(part)
+					size += len(part[0])
+				if size < batchSize:
+					continue
+			if not size:
+				break
+			columns = [ numpy.concatenate(arrays) for arrays in zip(*pending) ] if (len(pending) > 1) else pending[0]
+			start = 0
+			while (size - start >= batchSize) or (part == None and start < size):
+				yield dict( (name, self._getColumnarArray(method, name, dtype, column[start:start+batchSize], strings)) for (name,dtype),column in zip(fields, columns) )
+				start += batchSize
+			pending = [ [ column[start:] for column in columns ] ] if (start < size) else list()
+			size -= start
+		#foreach part
+	#generateColumnar()
+	
+	
+	def _getColumnarArray(self, method, name, dtype, values, strings):
+		"""
+		Converts the values of one result field into their columnar form.
+
+		Args:
+			method (str): The name of the method, for error messages.
+			name (str): The name of the field, for error messages.
+			dtype (str): The type of the field: a NumPy dtype, 'object' or 'str'.
+			values (numpy.ndarray): The values of the field.
+			strings (str): How to store 'str' fields (see generateColumnar).
+
+		Returns:
+			numpy.ndarray or tuple: The field's array, or a (pool, offsets) tuple for a pooled string field.
+
+		Raises:
+			Exception: If a value does not fit a numeric field.
+		"""
+		import numpy
+		
+		if dtype == 'object' or (dtype == 'str' and strings == 'object'):
+			return values.astype(object, copy=False)
+		if dtype == 'str':
+			data = [ (v.encode('utf-8') if v != None else b'') for v in values.tolist() ]
+			offsets = numpy.zeros(len(data) + 1, dtype='<i8')
+			numpy.cumsum([ len(d) for d in data ], out=offsets[1:])
+			return (numpy.frombuffer(b''.join(data), dtype='u1'), offsets)
+		if values.dtype != object:
+			# integers read straight from the database only need to fit
+			if values.dtype.kind in 'iu' and numpy.dtype(dtype).kind in 'iu' and len(values):
+				info = numpy.iinfo(dtype)
+				if values.min() < info.min or values.max() > info.max:
+					raise Exception("ERROR: result field '%s' of '%s' is not of type %s" % (name, method, dtype))
+			return values.astype(dtype)
+		values = values.tolist()
+		try:
+			return numpy.array(values, dtype=dtype)
+		except (TypeError, ValueError, OverflowError):
+			try:
+				return numpy.array([ (-1 if v == None else v) for v in values ], dtype=dtype)
+			except (TypeError, ValueError, OverflowError):
+				raise Exception("ERROR: result field '%s' of '%s' is not of type %s" % (name, method, dtype))
+	#_getColumnarArray()
+	
+	
+	def _getObjectArray(self, values):
+		"""
+		Args:
+			values (list): Any values.
+
+		Returns:
+			numpy.ndarray: An array of the values as Python objects, without unpacking any sequences among them.
+		"""
+		import numpy
+		
+		return numpy.fromiter(values, dtype=object, count=len(values))
+	#_getObjectArray()
+	
+	
+	def _generateRowColumns(self, rows, batchSize):
+		"""
+		Transposes result rows into columns, for methods without a columnar implementation.
+
+		Args:
+			rows (iterable): The result rows.
+			batchSize (int): The number of rows to transpose at a time.
+
+		Yields:
+			list: An array of Python objects per field, for each batch of rows.
+		"""
+		rows = iter(rows)
+		while True:
+			chunk = list(itertools.islice(rows, batchSize))
+			if not chunk:
+				break
+			yield [ self._getObjectArray(values) for values in zip(*chunk) ]
+		#while rows
+	#_generateRowColumns()
+	
+	
+	def _getBatchQueryArray(self, sql, columns, inputs, width):
+		"""
+		Runs a query over one batch of inputs and reads all of its results at once.
+
+		Args:
+			sql (str): The query to run, with '{batch}' in place of the batch table name; every
+				result column must be a non-NULL integer, starting with the 1-based input position.
+			columns (tuple): The column names for the fields of each input tuple.
+			inputs (list): The input tuples, no more than the batch size.
+			width (int): The number of result columns.
+
+		Returns:
+			numpy.ndarray: The results, as a (rows, width) array of 64-bit integers.
+		"""
+		import numpy
+		
+		rows = list()
+		cursor = self._db.cursor()
+		batches = self._generateInputBatches(columns, inputs)
+		try:
+			for batch in batches:
+				rows.extend(cursor.execute(sql.format(batch=batch)).fetchall())
+		finally:
+			cursor.close()
+			batches.close()
+		return numpy.array(rows, dtype=numpy.int64).reshape(-1, width)
+	#_getBatchQueryArray()
+	
+	
+	def _selectColumnarMatches(self, numInputs, inputs, minMatch, maxMatch, counts, errorCallback, offset, describe):
+		"""
+		Applies the match limits of a lookup to one batch of columnar matches.
+
+		Args:
+			numInputs (int): The number of inputs in the batch.
+			inputs (numpy.ndarray): The 0-based position in the batch of each match's input, in order.
+			minMatch (int): Minimum number of matches required.
+			maxMatch (int or None): Maximum number of matches allowed, or None for no limit.
+			counts (dict): The running 'zero', 'one' and 'many' tally counts, which are updated.
+			errorCallback (callable or None): A callable function for error handling.
+			offset (int): The number of inputs before the batch.
+			describe (callable): Gives the input text reported to errorCallback, by position in the batch.
+
+		Returns:
+			tuple: Arrays of the positions of the matches to keep, and of the positions in the batch
+			of the inputs to keep without any match.
+		"""
+		import numpy
+		
+		found = numpy.bincount(inputs, minlength=numInputs)
+		counts['zero'] += int(numpy.count_nonzero(found == 0))
+		counts['one'] += int(numpy.count_nonzero(found == 1))
+		counts['many'] += int(numpy.count_nonzero(found > 1))
+		ok = (found >= minMatch)
+		if maxMatch != None:
+			ok &= (found <= maxMatch)
+		if errorCallback:
+			for i in numpy.flatnonzero(~ok).tolist():
+				num = int(found[i])
+				errorCallback(describe(i), "%s match%s at index %d" % ((num or "no"),("" if num == 1 else "es"),self._getInputIndex(offset + i + 1)))
+		return (numpy.flatnonzero(ok[inputs]), numpy.flatnonzero(ok & (found == 0)))
+	#_selectColumnarMatches()
+	
+	
+	def _generateSNPLocusColumns(self, rses, minMatch=1, maxMatch=1, validated=None, tally=None, errorCallback=None, currentRS=False):
+		"""
+		Looks up SNP loci by RS IDs in columns; the columnar implementation of generateSNPLociByRSes().
+
+		Args:
+			rses, minMatch, maxMatch, validated, tally, errorCallback, currentRS: As for generateSNPLociByRSes().
+
+		Yields:
+			list: Arrays of rs, extra, chr and pos for each batch of inputs, with -1 for no match.
+
+		Each batch is searched in the sidecar index as a whole, or else its matches are read from
+		the database in one fetch.  Merged RS IDs (currentRS) are still folded row by row.
+		"""
+		import numpy
+		
+		if currentRS:
+			for part in self._generateRowColumns(self.generateSNPLociByRSes(rses, minMatch, maxMatch, validated, tally, errorCallback, currentRS), self._batchSize):
+				yield part
+			return
+		
+		sql = """
+SELECT i.idx, sl.chr, sl.pos
+FROM {batch} AS i
+JOIN `db`.`snp_locus` AS sl
+  ON sl.rs = i.rs
+"""
+		if validated != None:
+			sql += "  AND sl.validated = %d\n" % (1 if validated else 0)
+		sql += "ORDER BY i.idx, sl.chr, sl.pos\n"
+		
+		minMatch = int(minMatch) if (minMatch != None) else 0
+		maxMatch = int(maxMatch) if (maxMatch != None) else None
+		counts = { 'zero':0, 'one':0, 'many':0 }
+		index = self.getSNPLocusIndex()
+		rses = iter(rses)
+		n = 0
+		while True:
+			batch = list(itertools.islice(rses, self._batchSize))
+			if not batch:
+				break
+			keys = numpy.array([ self._getRSIndexKey(rs) for rs,extra in batch ], dtype=numpy.int64)
+			if index:
+				lo,hi = self._searchFilteredColumn('snp_locus', index.getColumn('rs'), keys)
+				num = hi - lo
+				inputs = numpy.repeat(numpy.arange(len(batch)), num)
+				rows = numpy.arange(num.sum()) - numpy.repeat((numpy.cumsum(num) - num) - lo, num)
+				if validated != None:
+					keep = (index.getColumn('validated')[rows] != 0) == bool(validated)
+					inputs = inputs[keep]
+					rows = rows[keep]
+				chms = numpy.asarray(index.getColumn('chr')[rows], dtype=numpy.int64)
+				poss = numpy.asarray(index.getColumn('pos')[rows], dtype=numpy.int64)
+			else:
+				with self._db:
+					data = self._getBatchQueryArray(sql, ('rs',), [ (key,) for key in keys.tolist() ], 3)
+				inputs = data[:,0] - 1
+				chms = data[:,1]
+				poss = data[:,2]
+			keep,empty = self._selectColumnarMatches(len(batch), inputs, minMatch, maxMatch, counts, errorCallback, n, lambda i: "\t".join(str(t or "") for t in batch[i]))
+			
+			# put the inputs kept without a match back among the matches, in input order
+			inputs = numpy.concatenate([inputs[keep], empty])
+			order = numpy.argsort(inputs, kind='stable')
+			inputs = inputs[order]
+			yield [
+				self._getObjectArray([ rs for rs,extra in batch ])[inputs],
+				self._getObjectArray([ extra for rs,extra in batch ])[inputs],
+				numpy.concatenate([chms[keep], numpy.full(len(empty), -1, dtype=numpy.int64)])[order],
+				numpy.concatenate([poss[keep], numpy.full(len(empty), -1, dtype=numpy.int64)])[order],
+			]
+			n += len(batch)
+		#while rses
+		if tally != None:
+			tally.update(counts)
+	#_generateSNPLocusColumns()
+	
+	
+	def _generateIdentifierColumns(self, table, typeID, identifiers, minMatch=1, maxMatch=1, tally=None, errorCallback=None):
+		"""
+		Looks up biopolymer or group IDs by identifiers in columns; the columnar implementation of
+		generate[Typed]BiopolymerIDsByIdentifiers() and generate[Typed]GroupIDsByIdentifiers().
+
+		Args:
+			table (str): The object table, either 'biopolymer' or 'group'.
+			typeID (int or Falseish): Type ID of the matched objects, or Falseish for any type.
+			identifiers, minMatch, maxMatch, tally, errorCallback: As for generateBiopolymerIDsByIdentifiers().
+
+		Yields:
+			list: Arrays of namespace, name, extra and id for each batch of inputs, with -1 for no match.
+
+		The matches of each batch are collected from the name index or the database at once, and
+		are then deduplicated and limited as whole arrays.
+		"""
+		import numpy
+		
+		minMatch = int(minMatch) if (minMatch != None) else 0
+		maxMatch = int(maxMatch) if (maxMatch != None) else None
+		counts = { 'zero':0, 'one':0, 'many':0 }
+		index = self.getBiopolymerNameIndex() if (table == 'biopolymer') else self.getGroupNameIndex()
+		identifiers = iter(identifiers)
+		n = 0
+		while True:
+			batch = list(itertools.islice(identifiers, self._batchSize))
+			if not batch:
+				break
+			with self._db:
+				if index:
+					rows = [ (row[0], row[4]) for row in self._generateNameIndexRows(table, index, typeID, batch) if row[4] ]
+				else:
+					rows = [ (row[0], row[4]) for row in self._generateIdentifierQueryRows(table, typeID, batch) if row[4] ]
+			data = numpy.array(rows, dtype=numpy.int64).reshape(-1, 2)
+			
+			# an object matched more than one way still counts once
+			data = data[numpy.lexsort((data[:,1], data[:,0]))]
+			if len(data):
+				first = numpy.ones(len(data), dtype=bool)
+				first[1:] = (data[1:] != data[:-1]).any(axis=1)
+				data = data[first]
+			inputs = data[:,0] - 1
+			ids = data[:,1]
+			keep,empty = self._selectColumnarMatches(len(batch), inputs, minMatch, maxMatch, counts, errorCallback, n, lambda i: "\t".join((t or "") for t in batch[i]))
+			
+			inputs = numpy.concatenate([inputs[keep], empty])
+			order = numpy.argsort(inputs, kind='stable')
+			inputs = inputs[order]
+			yield [
+				self._getObjectArray([ row[0] for row in batch ])[inputs],
+				self._getObjectArray([ row[1] for row in batch ])[inputs],
+				self._getObjectArray([ row[2] for row in batch ])[inputs],
+				numpy.concatenate([ids[keep], numpy.full(len(empty), -1, dtype=numpy.int64)])[order],
+			]
+			n += len(batch)
+		#while identifiers
+		if tally != None:
+			tally.update(counts)
+	#_generateIdentifierColumns()
+	
+	
+	def _generateRegionColumns(self, query, width):
+		"""
+		Matches regions in columns, reading each batch's matches from the database in one fetch.
+
+		Args:
+			query (tuple or None): The query, batch columns and inputs from _prepareSNPRegionQuery()
+				or _prepareBiopolymerRegionQuery(), with the input position as the first result column.
+			width (int): The number of result columns.
+
+		Yields:
+			list: Arrays of label and extra, then of each result column after the first, for each batch of inputs.
+		"""
+		if not query:
+			return
+		sql,columns,regions = query
+		while True:
+			batch = list(itertools.islice(regions, self._batchSize))
+			if not batch:
+				break
+			with self._db:
+				data = self._getBatchQueryArray(sql, columns, batch, width)
+			inputs = data[:,0] - 1
+			yield [ self._getObjectArray([ row[0] for row in batch ])[inputs], self._getObjectArray([ row[4] for row in batch ])[inputs] ] + [ data[:,c] for c in range(1, width) ]
+		#while inputs
+	#_generateRegionColumns()
+	
+	
+	def _generateSNPRegionColumns(self, regions, validated=None, padding=0):
+		"""
+		Finds the SNP loci within regions in columns; the columnar implementation of generateSNPsByRegions().
+
+		Args:
+			regions, validated, padding: As for generateSNPsByRegions().
+
+		Returns:
+			generator: Arrays of label, extra, rs, chr and pos for each batch of inputs.
+		"""
+		return self._generateRegionColumns(self._prepareSNPRegionQuery("i.idx, sl.rs, sl.chr, sl.pos", regions, validated, padding), 4)
+	#_generateSNPRegionColumns()
+	
+	
+	def _generateBiopolymerRegionColumns(self, regions, ldprofile=None, typeID=None, padding=0):
+		"""
+		Finds the biopolymers overlapping regions in columns; the columnar implementation of generateBiopolymersByRegions().
+
+		Args:
+			regions, ldprofile, typeID, padding: As for generateBiopolymersByRegions().
+
+		Returns:
+			generator: Arrays of label, extra and biopolymer_id for each batch of inputs.
+		"""
+		return self._generateRegionColumns(self._prepareBiopolymerRegionQuery("i.idx, br.biopolymer_id", regions, ldprofile, typeID, padding), 2)
+	#_generateBiopolymerRegionColumns()
+	
+	
+	def _getLiftOverChainArrays(self, oldHG, newHG):
+		"""
+		Lays out the liftOver chains between two genome assemblies as arrays, once per pair of assemblies.
+
+		Args:
+			oldHG (int): Old genome assembly identifier.
+			newHG (int): New genome assembly identifier.
+
+		Returns:
+			dict: { chr : [ (old_start, old_end, new_chr, is_fwd, old_starts, old_ends, new_starts, sizes), ... ] },
+			with each chromosome's chains in the order they are tried, where the last four are arrays over
+			the chain's segments and sizes holds the running total of their lengths, starting from 0.
+		"""
+		import numpy
+		
+		chains = self._getLiftOverChains(oldHG, newHG)
+		if 'arrays' not in chains:
+			arrays = dict()
+			for chrom,keys in chains['keys'].items():
+				arrays[chrom] = list()
+				for c in keys:
+					data = numpy.array(chains['data'][chrom][c], dtype=numpy.int64).reshape(-1, 3)
+					sizes = numpy.zeros(len(data) + 1, dtype=numpy.int64)
+					numpy.cumsum(data[:,1] - data[:,0] + 1, out=sizes[1:])
+					arrays[chrom].append( (c[1], c[2], c[5], c[4], data[:,0].copy(), data[:,1].copy(), data[:,2].copy(), sizes) )
+			chains['arrays'] = arrays
+		return chains['arrays']
+	#_getLiftOverChainArrays()
+	
+	
+	def _generateLiftOverColumns(self, points, oldHG, newHG, regions, tally=None, errorCallback=None):
+		"""
+		Lifts regions or loci over in columns; the columnar implementation of generateLiftOverRegions()
+		and generateLiftOverLoci().
+
+		Args:
+			points (bool): If True, the inputs are loci (label, chr, pos, extra) rather than regions.
+			oldHG, newHG, regions, tally, errorCallback: As for generateLiftOverRegions().
+
+		Yields:
+			list: Arrays of label, chr, posMin, posMax and extra (or label, chr, pos and extra for loci)
+			for the inputs in each batch which could be lifted.
+
+		Each batch is grouped by chromosome, and each chromosome's chains are tried in the same order
+		as in generateLiftOverRegions(), each against all of the inputs it spans at once.
+		"""
+		import numpy
+		
+		oldHG = int(oldHG)
+		newHG = int(newHG)
+		chains = self._getLiftOverChainArrays(oldHG, newHG)
+		numNull = numLift = 0
+		regions = iter(regions)
+		while True:
+			batch = list(itertools.islice(regions, self._batchSize))
+			if not batch:
+				break
+			if points:
+				batch = [ (l[0],l[1],l[2],l[2],l[3]) for l in batch ]
+			starts = numpy.array([ min(r[2],r[3]) for r in batch ], dtype=numpy.int64)
+			ends = numpy.array([ max(r[2],r[3]) for r in batch ], dtype=numpy.int64)
+			lifted = numpy.zeros(len(batch), dtype=bool)
+			newChr = numpy.zeros(len(batch), dtype=numpy.int64)
+			newMin = numpy.zeros(len(batch), dtype=numpy.int64)
+			newMax = numpy.zeros(len(batch), dtype=numpy.int64)
+			
+			members = dict()
+			for i,region in enumerate(batch):
+				members.setdefault(region[1], list()).append(i)
+			for chrom,inputs in members.items():
+				if chrom not in chains:
+					continue
+				inputs = numpy.array(inputs, dtype=numpy.int64)
+				inputs = inputs[numpy.argsort(starts[inputs], kind='stable')]
+				inputStarts = starts[inputs]
+				span = int((ends[inputs] - inputStarts).max())
+				for chainMin,chainMax,chainChr,isFwd,segStarts,segEnds,segNew,sizes in chains[chrom]:
+					# the inputs not yet lifted which overlap the chain, and the range of segments they overlap
+					cand = inputs[numpy.searchsorted(inputStarts, chainMin - span, 'left'):numpy.searchsorted(inputStarts, chainMax, 'right')]
+					cand = cand[(ends[cand] >= chainMin) & ~lifted[cand]]
+					if not len(cand):
+						continue
+					first = numpy.searchsorted(segEnds, starts[cand], 'left')
+					last = numpy.searchsorted(segStarts, ends[cand], 'right') - 1
+					some = (first <= last)
+					cand,first,last = cand[some],first[some],last[some]
+					start,end = starts[cand],ends[cand]
+					
+					# the same arithmetic as _liftOverRegionUsingChains()
+					frontDiff = numpy.maximum(0, numpy.minimum(start - segStarts[first], segEnds[first] - segStarts[first]))
+					endDiff = numpy.maximum(0, numpy.minimum(end - segStarts[last], segEnds[last] - segStarts[last]))
+					mappedSize = (sizes[last + 1] - sizes[first]) - frontDiff - (segEnds[last] - segStarts[last] + 1) + endDiff + 1
+					ok = (mappedSize / (end - start + 1).astype(numpy.float64) >= 0.95)
+					cand = cand[ok]
+					lifted[cand] = True
+					newChr[cand] = chainChr
+					if isFwd:
+						newMin[cand] = (segNew[first] + frontDiff)[ok]
+						newMax[cand] = (segNew[last] + endDiff)[ok]
+					else:
+						newMin[cand] = (segNew[last] - endDiff)[ok]
+						newMax[cand] = (segNew[first] - frontDiff)[ok]
+				#foreach chain
+			#foreach chromosome
+			point = (starts == ends)
+			newMax[point] = newMin[point]
+			
+			numLift += int(numpy.count_nonzero(lifted))
+			numNull += len(batch) - int(numpy.count_nonzero(lifted))
+			if errorCallback:
+				for i in numpy.flatnonzero(~lifted).tolist():
+					errorCallback(batch[i])
+			keep = numpy.flatnonzero(lifted)
+			labels = self._getObjectArray([ r[0] for r in batch ])[keep]
+			extras = self._getObjectArray([ r[4] for r in batch ])[keep]
+			if points:
+				yield [ labels, newChr[keep], newMin[keep], extras ]
+			else:
+				yield [ labels, newChr[keep], newMin[keep], newMax[keep], extras ]
+		#while regions
+		
+		if tally != None:
+			tally['null'] = numNull
+			tally['lift'] = numLift
+	#_generateLiftOverColumns()
+	
+	
+	##################################################
+	# table export
+	
+	
+	def _getExportColumns(self, table):
+		"""
+		Determines how to export the columns of a knowledge table.
+
+		Args:
+			table (str): The name of the table.
+
+		Returns:
+			list: A list of (name, dtype, expression) tuples, one per column, where the expression
+			selects the column with any NULL replaced by -1 for integers or '' for text.
+		"""
+		columns = list()
+		for row in self._db.cursor().execute("PRAGMA `db`.table_info(`%s`)" % (table,)):
+			name,decl = row[1],row[2].upper()
+			if 'TINYINT' in decl:
+				columns.append( (name, '<i1', "COALESCE(`%s`,-1)" % (name,)) )
+			elif 'SMALLINT' in decl:
+				columns.append( (name, '<i2', "COALESCE(`%s`,-1)" % (name,)) )
+			elif 'INT' in decl:
+				columns.append( (name, '<i8', "COALESCE(`%s`,-1)" % (name,)) )
+			elif ('REAL' in decl) or ('FLOA' in decl) or ('DOUB' in decl):
+				columns.append( (name, '<f8', "`%s`" % (name,)) )
+			else:
+				columns.append( (name, 'str', "COALESCE(CAST(`%s` AS TEXT),'')" % (name,)) )
+		return columns
+	#_getExportColumns()
+	
+	
+	def exportTable(self, table, path, chunkSize=2500000):
+		"""
+		Streams a knowledge table into a directory of memory-mappable column files.
+
+		Args:
+			table (str): The name of the table.
+			path (str): The output directory, which is replaced if it already exists.
+			chunkSize (int, optional): The number of rows read from the table at a time. Defaults to 2500000.
+
+		Returns:
+			Sidecar: The exported table, with one column per table column in table order.
+
+		Raises:
+			Exception: If no database file is loaded, or the table is not part of the knowledge schema.
+
+		The output is a sidecar (see loki_sidecar), whose manifest records the row count, the column
+		types and the database fingerprint.  Integer columns are exported at their declared width,
+		floating point columns as doubles, and everything else as strings; NULLs become -1, NaN or ''.
+		Rows are read in ranges of _ROWID_, so memory use is bounded regardless of the table size.
+		"""
+		if not self._dbFile:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		if table not in self._schema['db']:
+			raise Exception("ERROR: unknown knowledge table '%s'" % (table,))
+		columns = self._getExportColumns(table)
+		cursor = self._db.cursor()
+		
+		def generateRows():
+			# identify range of _ROWID_ in the table
+			# (two separate queries since a simple MIN() or MAX() only peeks at the index)
+			firstRowID = min(row[0] for row in cursor.execute("SELECT MIN(_ROWID_) FROM `db`.`%s`" % (table,)))
+			lastRowID = max(row[0] for row in cursor.execute("SELECT MAX(_ROWID_) FROM `db`.`%s`" % (table,)))
+			if firstRowID == None:
+				return
+			sql = "SELECT %s FROM `db`.`%s` WHERE _ROWID_ BETWEEN ? AND ? ORDER BY _ROWID_" % (','.join(c[2] for c in columns), table)
+			minRowID = firstRowID
+			while minRowID <= lastRowID:
+				for row in self._db.cursor().execute(sql, (minRowID, minRowID + chunkSize - 1)):
+					yield row
+				minRowID += chunkSize
+		#generateRows()
+		
+		with self._db:
+			fingerprint = self.getDatabaseFingerprint()
+			length = max(row[0] for row in cursor.execute("SELECT COUNT() FROM `db`.`%s`" % (table,)))
+			sidecar = loki_sidecar.Sidecar.write(
+				path,
+				[ (c[0],c[1]) for c in columns ],
+				length, generateRows(), fingerprint, chunkSize=min(chunkSize, 1000000)
+			)
+		return sidecar
+	#exportTable()
+	
+	
+	def exportTables(self, tables=None, directory=None, processes=1):
+		"""
+		Exports knowledge tables into directories of memory-mappable column files.
+
+		Args:
+			tables (list, optional): The names of the tables. Defaults to snp_locus, biopolymer_region,
+				group_biopolymer and biopolymer_name.
+			directory (str, optional): The output directory, which will contain one sidecar per table.
+				Defaults to the 'export' sidecar path beside the knowledge database file.
+			processes (int, optional): The number of tables to export at once in separate worker
+				processes. Defaults to 1, to export them one at a time in this process.
+
+		Returns:
+			dict: The exported row counts, as { table : count }.
+
+		Raises:
+			Exception: If no database file is loaded.
+
+		Worker processes open the knowledge database file read-only, so it must not be locked
+		against readers by an update in progress.
+		"""
+		import loki.loki_pool as loki_pool
+		
+		if not self._dbFile:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		tables = tables or ('snp_locus','biopolymer_region','group_biopolymer','biopolymer_name')
+		directory = directory or self.getSidecarPath('export')
+		for table in tables:
+			if table not in self._schema['db']:
+				raise Exception("ERROR: unknown knowledge table '%s'" % (table,))
+		if not os.path.isdir(directory):
+			os.makedirs(directory)
+		
+		self.logPush("exporting %d table(s) to '%s' ...\n" % (len(tables), directory))
+		counts = dict()
+		if (processes or 1) > 1 and len(tables) > 1:
+			import multiprocessing
+			pool = multiprocessing.Pool(min(processes, len(tables)), loki_pool._initShardWorker, (self._dbFile,))
+			try:
+				results = [ (table, pool.apply_async(loki_pool._runExport, (table, os.path.join(directory, table)))) for table in tables ]
+				for table,result in results:
+					counts[table] = result.get()
+					self.log("exported table '%s': %d rows\n" % (table, counts[table]))
+			finally:
+				pool.terminate()
+				pool.join()
+		else:
+			for table in tables:
+				self.log("exporting table '%s' ..." % (table,))
+				counts[table] = self.exportTable(table, os.path.join(directory, table)).getLength()
+				self.log(" OK: %d rows\n" % (counts[table],))
+		self.logPop("... OK\n")
+		return counts
+	#exportTables()
+	
+	
+	##################################################
+	# query cache
+	
+	
+	def enableQueryCache(self, path=None, maxSize=256*1024*1024, maxRows=100000):
+		"""
+		Enables a persistent cache of lookup results, shared by every Database using the same cache file.
+
+		Args:
+			path (str, optional): The cache file. Defaults to the 'cache' sidecar path beside the knowledge database file.
+			maxSize (int, optional): The maximum total size in bytes of the cached (compressed) results. Defaults to 256MiB.
+			maxRows (int, optional): The most inputs or results of a lookup which is cached. Defaults to 100000.
+
+		Raises:
+			Exception: If no path is given and no database file is loaded.
+
+		While enabled, the SNP, identifier and region lookups store their complete results (and any
+		tally counts and errors) keyed by their normalized inputs and the database fingerprint, so
+		repeating a lookup against an unchanged database is answered from the cache.  Any update
+		of the database changes its fingerprint, which invalidates all earlier entries.  Larger lookups
+		stream through uncached, so caching never holds more than maxRows inputs or results in memory.
+		"""
+		path = path or self.getSidecarPath('cache')
+		if not path:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		self.disableQueryCache()
+		self._queryCache = loki_cache.QueryCache(path, maxSize)
+		self._queryCacheRows = max(1, int(maxRows))
+	#enableQueryCache()
+	
+	
+	def disableQueryCache(self):
+		"""
+		Disables the query cache, if enabled, leaving the cache file in place.
+		"""
+		if self._queryCache != None:
+			self._queryCache.close()
+			self._queryCache = None
+	#disableQueryCache()
+	
+	
+	def _generateCachedRows(self, method, args, kwargs):
+		"""
+		Runs a lookup through the query cache.
+
+		Args:
+			method (function): The unwrapped generator method.
+			args (tuple): The method's positional arguments.
+			kwargs (dict): The method's keyword arguments.
+
+		Yields:
+			The method's results; stored tally counts and errors are replayed before the first result.
+
+		Arguments which are not strings or numbers are taken to be sequences of input tuples.
+		Inputs which cannot be pickled, or which hold more than the cache's row limit, bypass the
+		cache; so do lookups which yield more results than that, or which are not run to the end.
+		"""
+		import inspect
+		
+		arguments = inspect.signature(method).bind(self, *args, **kwargs).arguments
+		del arguments['self']
+		tally = arguments.pop('tally', None)
+		errorCallback = arguments.pop('errorCallback', None)
+		
+		# read up to one input past the limit; longer inputs are passed on unread
+		key = None
+		cacheable = True
+		for name,value in arguments.items():
+			if not isinstance(value, (str,int,float,type(None))):
+				value = iter(value)
+				head = tuple(tuple(i) for i in itertools.islice(value, self._queryCacheRows + 1))
+				if len(head) > self._queryCacheRows:
+					arguments[name] = itertools.chain(head, value)
+					cacheable = False
+				else:
+					arguments[name] = head
+		if cacheable:
+			try:
+				key = hashlib.sha256(pickle.dumps((method.__name__, sorted(arguments.items()), bool(errorCallback)), protocol=4)).digest()
+			except (pickle.PicklingError, TypeError, AttributeError):
+				key = None
+		fingerprint = self.getDatabaseFingerprint()
+		
+		entry = self._queryCache.get(key, fingerprint) if key else None
+		if entry != None:
+			rows,counts,errors = entry
+			if tally != None:
+				tally.update(counts)
+			if errorCallback:
+				for err in errors:
+					errorCallback(*err)
+			for row in rows:
+				yield row
+			return
+		
+		# stream the lookup, collecting its tally whether or not the caller asked,
+		# and its errors only if the caller did (which is part of the key)
+		counts = dict()
+		errors = list()
+		rows = list()
+		if 'tally' in inspect.signature(method).parameters:
+			arguments['tally'] = counts
+		if errorCallback:
+			def _errorCallback(*err):
+				errors.append(err)
+				errorCallback(*err)
+			arguments['errorCallback'] = _errorCallback
+		for row in method(self, **arguments):
+			if key:
+				if len(rows) < self._queryCacheRows:
+					rows.append(row)
+				else:
+					key = rows = None
+			yield row
+		if tally != None:
+			tally.update(counts)
+		if key:
+			self._queryCache.put(key, fingerprint, (rows, counts, errors))
+	#_generateCachedRows()
+	
+	
+	##################################################
+	# sidecar indexes
+	
+	
+	def getDatabaseFingerprint(self):
+		"""
+		Computes a fingerprint of the knowledge database's update state.
+
+		Returns:
+			str: A hex digest over the source versions and update timestamps and the database settings,
+			or None if no database file is loaded.
+
+		Any update of the database changes the fingerprint, so it can be used to detect derived data
+		which is out of date.  The 'optimized' and 'schema_fingerprint' settings are excluded since
+		neither reflects a change of the stored data.
+
+		The fingerprint is computed once per attached file and kept until the file is updated
+		or a setting is changed.
+		"""
+		if not self._dbFile:
+			return None
+		if self._fingerprint != None:
+			return self._fingerprint
+		md5 = hashlib.md5()
+		cursor = self._db.cursor()
+		for row in cursor.execute("SELECT source_id, source, updated, version, grch, ucschg, current_ucschg FROM `db`.`source` ORDER BY source_id"):
+			md5.update(repr(row).encode())
+		for row in cursor.execute("SELECT setting, value FROM `db`.`setting` WHERE setting NOT IN ('optimized','schema_fingerprint') ORDER BY setting"):
+			md5.update(repr(row).encode())
+		self._fingerprint = md5.hexdigest()
+		return self._fingerprint
+	#getDatabaseFingerprint()
+	
+	
+	def getSidecarPath(self, name):
+		"""
+		Returns the path of a sidecar stored beside the knowledge database file.
+
+		Args:
+			name (str): The name of the sidecar.
+
+		Returns:
+			str: The sidecar directory, or None if no database file is loaded.
+		"""
+		if not self._dbFile:
+			return None
+		return "%s.%s" % (os.path.abspath(self._dbFile), name)
+	#getSidecarPath()
+	
+	
+	def _getSidecar(self, name):
+		"""
+		Loads a sidecar if it exists and matches the current database fingerprint.
+
+		Args:
+			name (str): The name of the sidecar.
+
+		Returns:
+			Sidecar: The loaded sidecar, or None if it is missing, stale or numpy is not available.
+		"""
+		if name not in self._sidecars:
+			sidecar = None
+			path = self.getSidecarPath(name)
+			if path and loki_sidecar.Sidecar.exists(path):
+				try:
+					import numpy
+				except ImportError:
+					pass
+				else:
+					sidecar = loki_sidecar.Sidecar(path)
+					if sidecar.getFingerprint() != self.getDatabaseFingerprint():
+						sidecar = None
+			self._sidecars[name] = sidecar
+		return self._sidecars[name]
+	#_getSidecar()
+	
+	
+	def buildSNPLocusIndex(self):
+		"""
+		Exports the SNP loci into a memory-mapped sidecar index sorted by RS number.
+
+		Returns:
+			Sidecar: The new index, with 'rs', 'chr', 'pos' and 'validated' columns.
+
+		Raises:
+			Exception: If no database file is loaded.
+		"""
+		if not self._dbFile:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		self.log("building SNP locus index ...")
+		with self._db:
+			fingerprint = self.getDatabaseFingerprint()
+			length = max(row[0] for row in self._db.cursor().execute("SELECT COUNT() FROM `db`.`snp_locus`"))
+			rows = self._db.cursor().execute("SELECT rs, chr, pos, validated FROM `db`.`snp_locus` ORDER BY rs, chr, pos")
+			sidecar = loki_sidecar.Sidecar.write(
+				self.getSidecarPath('snp_locus'),
+				(('rs','<i8'), ('chr','<i1'), ('pos','<i8'), ('validated','<i1')),
+				length, rows, fingerprint
+			)
+		self._sidecars['snp_locus'] = sidecar
+		self.log(" OK: %d loci\n" % (length,))
+		return sidecar
+	#buildSNPLocusIndex()
+	
+	
+	def getSNPLocusIndex(self, rebuild=False):
+		"""
+		Retrieves the SNP locus sidecar index, if it is available and up to date.
+
+		Args:
+			rebuild (bool, optional): If True, (re)builds the index when it is missing or stale. Defaults to False.
+
+		Returns:
+			Sidecar: The index, or None if it is not available.
+		"""
+		sidecar = self._getSidecar('snp_locus')
+		if rebuild and not sidecar:
+			sidecar = self.buildSNPLocusIndex()
+		return sidecar
+	#getSNPLocusIndex()
+	
+	
+	def buildSNPMergeIndex(self):
+		"""
+		Exports the SNP merge records into a memory-mapped sidecar index sorted by merged RS number.
+
+		Returns:
+			Sidecar: The new index, with 'rsMerged' and 'rsCurrent' columns.
+
+		Raises:
+			Exception: If no database file is loaded.
+		"""
+		if not self._dbFile:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		self.log("building SNP merge index ...")
+		with self._db:
+			fingerprint = self.getDatabaseFingerprint()
+			length = max(row[0] for row in self._db.cursor().execute("SELECT COUNT() FROM `db`.`snp_merge`"))
+			rows = self._db.cursor().execute("SELECT rsMerged, rsCurrent FROM `db`.`snp_merge` ORDER BY rsMerged, rsCurrent")
+			sidecar = loki_sidecar.Sidecar.write(
+				self.getSidecarPath('snp_merge'),
+				(('rsMerged','<i8'), ('rsCurrent','<i8')),
+				length, rows, fingerprint
+			)
+		self._sidecars['snp_merge'] = sidecar
+		self.log(" OK: %d merges\n" % (length,))
+		return sidecar
+	#buildSNPMergeIndex()
+	
+	
+	def getSNPMergeIndex(self, rebuild=False):
+		"""
+		Retrieves the SNP merge sidecar index, if it is available and up to date.
+
+		Args:
+			rebuild (bool, optional): If True, (re)builds the index when it is missing or stale. Defaults to False.
+
+		Returns:
+			Sidecar: The index, or None if it is not available.
+		"""
+		sidecar = self._getSidecar('snp_merge')
+		if rebuild and not sidecar:
+			sidecar = self.buildSNPMergeIndex()
+		return sidecar
+	#getSNPMergeIndex()
+	
+	
+	def _generateSNPMergeIndexRows(self, index, rses):
+		"""
+		Folds merged RS IDs into current ones through the sidecar index, one batch of inputs at a time.
+
+		Args:
+			index (Sidecar): The SNP merge index.
+			rses (list): A list of tuples, where each tuple contains (rs, extra).
+
+		Yields:
+			tuple: A tuple containing (rsMerged, extra, rsCurrent) for each input, with rsCurrent
+			set to the input RS if it was not merged; the same rows as the equivalent database query.
+		"""
+		import numpy
+		
+		mergedIndex = index.getColumn('rsMerged')
+		currentIndex = index.getColumn('rsCurrent')
+		rses = iter(rses)
+		while True:
+			batch = list(itertools.islice(rses, self._batchSize))
+			if not batch:
+				break
+			keys = numpy.array([ self._getRSIndexKey(rs) for rs,extra in batch ], dtype=numpy.int64)
+			lo,hi = self._searchFilteredColumn('snp_merge', mergedIndex, keys)
+			# nearly every RS has at most one merge, so fetch those all at once
+			current = currentIndex[numpy.minimum(lo, max(len(currentIndex) - 1, 0))].tolist() if len(currentIndex) else [None] * len(batch)
+			count = (hi - lo).tolist()
+			lo = lo.tolist()
+			for i in range(len(batch)):
+				rs,extra = batch[i]
+				if count[i] == 0:
+					yield (rs, extra, rs)
+				elif count[i] == 1:
+					yield (rs, extra, current[i])
+				else:
+					for c in currentIndex[lo[i]:lo[i]+count[i]].tolist():
+						yield (rs, extra, c)
+			#foreach input
+		#while rses
+	#_generateSNPMergeIndexRows()
+	
+	
+	def _getNameHash(self, name):
+		"""
+		Computes the stable 64-bit hash by which name indexes are sorted.
+
+		Args:
+			name (str): The name to hash.
+
+		Returns:
+			int: The signed 64-bit hash of the name's UTF-8 encoding.
+		"""
+		return int.from_bytes(hashlib.blake2b(name.encode('utf-8'), digest_size=8).digest(), 'little', signed=True)
+	#_getNameHash()
+	
+	
+	def _buildNameIndex(self, table):
+		"""
+		Exports the names of all biopolymers or groups into a memory-mapped sidecar index.
+
+		Args:
+			table (str): The object table, either 'biopolymer' or 'group'.
+
+		Returns:
+			Sidecar: The new index, with 'hash', 'name', 'namespace_id', 'id' and 'type_id' columns.
+
+		Raises:
+			Exception: If no database file is loaded.
+
+		Besides every row of the object's name table, the index holds each object's label under
+		namespace_id 0 and its ID under namespace_id -1, so that all identifier lookups can be
+		answered from it.  Rows are sorted by the hash of the name.
+		"""
+		if not self._dbFile:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		self.log("building %s name index ..." % (table,))
+		sql = """
+SELECT loki_name_hash(n.name) AS hash, n.name, n.namespace_id, n.id, n.type_id
+FROM (
+  SELECT tn.name, tn.namespace_id, t.{0}_id AS id, t.type_id
+  FROM `db`.`{0}_name` AS tn
+  JOIN `db`.`{0}` AS t USING ({0}_id)
+  UNION ALL
+  SELECT t.label, 0, t.{0}_id, t.type_id
+  FROM `db`.`{0}` AS t
+  UNION ALL
+  SELECT CAST(t.{0}_id AS TEXT), -1, t.{0}_id, t.type_id
+  FROM `db`.`{0}` AS t
+) AS n
+ORDER BY hash, n.namespace_id, n.id
+""".format(table)
+		self._db.createscalarfunction('loki_name_hash', self._getNameHash, 1)
+		with self._db:
+			fingerprint = self.getDatabaseFingerprint()
+			length = max(row[0] for row in self._db.cursor().execute("SELECT (SELECT COUNT() FROM `db`.`{0}_name` JOIN `db`.`{0}` USING ({0}_id)) + 2 * (SELECT COUNT() FROM `db`.`{0}`)".format(table)))
+			sidecar = loki_sidecar.Sidecar.write(
+				self.getSidecarPath(table + '_name'),
+				(('hash','<i8'), ('name','str'), ('namespace_id','<i4'), ('id','<i8'), ('type_id','<i2')),
+				length, self._db.cursor().execute(sql), fingerprint
+			)
+		self._sidecars[table + '_name'] = sidecar
+		self.log(" OK: %d names\n" % (length,))
+		return sidecar
+	#_buildNameIndex()
+	
+	
+	def buildBiopolymerNameIndex(self):
+		"""
+		Exports the biopolymer names, labels and IDs into a memory-mapped sidecar index.
+
+		Returns:
+			Sidecar: The new index.
+		"""
+		return self._buildNameIndex('biopolymer')
+	#buildBiopolymerNameIndex()
+	
+	
+	def getBiopolymerNameIndex(self, rebuild=False):
+		"""
+		Retrieves the biopolymer name sidecar index, if it is available and up to date.
+
+		Args:
+			rebuild (bool, optional): If True, (re)builds the index when it is missing or stale. Defaults to False.
+
+		Returns:
+			Sidecar: The index, or None if it is not available.
+		"""
+		sidecar = self._getSidecar('biopolymer_name')
+		if rebuild and not sidecar:
+			sidecar = self.buildBiopolymerNameIndex()
+		return sidecar
+	#getBiopolymerNameIndex()
+	
+	
+	def buildGroupNameIndex(self):
+		"""
+		Exports the group names, labels and IDs into a memory-mapped sidecar index.
+
+		Returns:
+			Sidecar: The new index.
+		"""
+		return self._buildNameIndex('group')
+	#buildGroupNameIndex()
+	
+	
+	def getGroupNameIndex(self, rebuild=False):
+		"""
+		Retrieves the group name sidecar index, if it is available and up to date.
+
+		Args:
+			rebuild (bool, optional): If True, (re)builds the index when it is missing or stale. Defaults to False.
+
+		Returns:
+			Sidecar: The index, or None if it is not available.
+		"""
+		sidecar = self._getSidecar('group_name')
+		if rebuild and not sidecar:
+			sidecar = self.buildGroupNameIndex()
+		return sidecar
+	#getGroupNameIndex()
+	
+	
+	def _buildPrefixIndex(self, table):
+		"""
+		Exports the names and labels of all biopolymers or groups into a sidecar index sorted for prefix search.
+
+		Args:
+			table (str): The object table, either 'biopolymer' or 'group'.
+
+		Returns:
+			Sidecar: The new index, with 'key', 'name', 'namespace_id', 'id' and 'type_id' columns.
+
+		Raises:
+			Exception: If no database file is loaded.
+
+		Labels are stored under namespace_id 0.  Rows are sorted by the lowercased name ('key'),
+		using SQLite's LOWER() so that the order matches the equivalent LIKE query.
+		"""
+		if not self._dbFile:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		self.log("building %s prefix index ..." % (table,))
+		sql = """
+SELECT LOWER(n.name) AS key, n.name, n.namespace_id, n.id, n.type_id
+FROM (
+  SELECT tn.name, tn.namespace_id, t.{0}_id AS id, t.type_id
+  FROM `db`.`{0}_name` AS tn
+  JOIN `db`.`{0}` AS t USING ({0}_id)
+  UNION ALL
+  SELECT t.label, 0, t.{0}_id, t.type_id
+  FROM `db`.`{0}` AS t
+) AS n
+ORDER BY key, n.namespace_id, n.id
+""".format(table)
+		with self._db:
+			fingerprint = self.getDatabaseFingerprint()
+			length = max(row[0] for row in self._db.cursor().execute("SELECT (SELECT COUNT() FROM `db`.`{0}_name` JOIN `db`.`{0}` USING ({0}_id)) + (SELECT COUNT() FROM `db`.`{0}`)".format(table)))
+			sidecar = loki_sidecar.Sidecar.write(
+				self.getSidecarPath(table + '_prefix'),
+				(('key','str'), ('name','str'), ('namespace_id','<i4'), ('id','<i8'), ('type_id','<i2')),
+				length, self._db.cursor().execute(sql), fingerprint
+			)
+		self._sidecars[table + '_prefix'] = sidecar
+		self.log(" OK: %d names\n" % (length,))
+		return sidecar
+	#_buildPrefixIndex()
+	
+	
+	def buildPrefixIndexes(self):
+		"""
+		Exports the biopolymer and group names and labels into sidecar indexes for prefix search.
+		"""
+		self._buildPrefixIndex('biopolymer')
+		self._buildPrefixIndex('group')
+	#buildPrefixIndexes()
+	
+	
+	def _generateIDsByPrefix(self, table, typeID, prefix, namespace, limit):
+		"""
+		Finds the names and labels of biopolymers or groups which start with a prefix, ignoring case.
+
+		Args:
+			table (str): The object table, either 'biopolymer' or 'group'.
+			typeID (int or Falseish): Type ID of the matched objects, or Falseish for any type.
+			prefix (str): The prefix to complete.
+			namespace (str or None): The namespace to search, '-' for labels only, '' or '*' for
+				any namespace but not labels, or None for all names and labels.
+			limit (int or Falseish): The maximum number of results, or Falseish for no limit.
+
+		Yields:
+			tuple: A tuple containing (namespace, name, id) for each match, with namespace '-' for labels,
+			ordered by lowercased name, namespace and ID.
+
+		The prefix sidecar index is used when it is available and up to date, which needs only a
+		binary search.  Otherwise each case variant of the prefix is looked up as a range of the
+		name and label indexes, which are case-sensitive.
+		"""
+		# yields (namespace,name,id)
+		if not self._dbFile:
+			return
+		
+		# namespaceID=None for all, -1 for any real namespace, 0 for labels
+		if namespace == None:
+			namespaceID = None
+		elif namespace == '-':
+			namespaceID = 0
+		elif namespace.strip(' ') in ('','*'):
+			namespaceID = -1
+		else:
+			namespaceID = self.getNamespaceID(namespace.strip(' '))
+			if not namespaceID:
+				return
+		typeID = int(typeID) if typeID else None
+		limit = int(limit) if limit else None
+		
+		catalog = self._catalog if (self._catalog != None) else self.loadMetadataCatalog()
+		namespaces = { row[1]:row[0] for row in catalog['namespace'].values() }
+		namespaces[0] = '-'
+		
+		index = self._getSidecar(table + '_prefix')
+		if index:
+			key = ''.join((c.lower() if c < '\x80' else c) for c in prefix)
+			data = key.encode('utf-8')
+			pool,offsets = index.getStrings('key')
+			namespaceIDs = index.getColumn('namespace_id')
+			ids = index.getColumn('id')
+			typeIDs = index.getColumn('type_id')
+			n = 0
+			for r in range(index.bisectString('key', key), index.getLength()):
+				if not pool[offsets[r]:offsets[r+1]].tobytes().startswith(data):
+					break
+				if namespaceID == -1:
+					if namespaceIDs[r] <= 0:
+						continue
+				elif (namespaceID != None) and (namespaceIDs[r] != namespaceID):
+					continue
+				if (typeID != None) and (typeIDs[r] != typeID):
+					continue
+				yield (namespaces.get(int(namespaceIDs[r])), index.getString('name', r), int(ids[r]))
+				n += 1
+				if limit and n >= limit:
+					break
+			#foreach candidate
+			return
+		#if index
+		
+		# the indexes sort names case-sensitively, so each combination of letter cases within the
+		# prefix's stem is its own range; the stem stops before the 7th letter to limit the ranges,
+		# and the LIKE filter (which ignores ASCII case) checks whatever follows it
+		stem = ""
+		letters = 0
+		for c in prefix:
+			if c.isascii() and c.isalpha():
+				if letters >= 6:
+					break
+				letters += 1
+			stem += c
+		while stem.endswith('\U0010ffff'):
+			stem = stem[:-1]
+		ranges = list()
+		if stem:
+			variants = [""]
+			for c in stem:
+				if c.isascii() and c.isalpha():
+					variants = [ v + x for v in variants for x in (c.upper(), c.lower()) ]
+				else:
+					variants = [ v + c for v in variants ]
+			for v in sorted(variants):
+				ranges.append( (v, v[:-1] + chr(ord(v[-1]) + 1)) )
+		#if stem
+		
+		if ranges:
+			sql = """
+WITH r (lo, hi) AS (VALUES %s)
+SELECT n.namespace_id, n.name, n.id
+FROM (
+  SELECT tn.name, tn.namespace_id, t.{0}_id AS id, t.type_id
+  FROM r
+  JOIN `db`.`{0}_name` AS tn
+    ON tn.name >= r.lo AND tn.name < r.hi
+  JOIN `db`.`{0}` AS t
+    ON t.{0}_id = tn.{0}_id
+  UNION ALL
+  SELECT t.label, 0, t.{0}_id, t.type_id
+  FROM r
+  JOIN `db`.`{0}` AS t
+    ON t.label >= r.lo AND t.label < r.hi
+) AS n
+WHERE n.name LIKE ?1 ESCAPE '\\'
+""".format(table) % (",".join("(?%d,?%d)" % (2*i+2,2*i+3) for i in range(len(ranges))),)
+		else:
+			sql = """
+SELECT n.namespace_id, n.name, n.id
+FROM (
+  SELECT tn.name, tn.namespace_id, t.{0}_id AS id, t.type_id
+  FROM `db`.`{0}_name` AS tn
+  JOIN `db`.`{0}` AS t USING ({0}_id)
+  UNION ALL
+  SELECT t.label, 0, t.{0}_id, t.type_id
+  FROM `db`.`{0}` AS t
+) AS n
+WHERE n.name LIKE ?1 ESCAPE '\\'
+""".format(table)
+		
+		if namespaceID == -1:
+			sql += """
+  AND n.namespace_id > 0
+"""
+		elif namespaceID != None:
+			sql += """
+  AND n.namespace_id = %d
+""" % namespaceID
+		#if namespaceID
+		
+		if typeID:
+			sql += """
+  AND n.type_id = %d
+""" % typeID
+		#if typeID
+		
+		sql += """
+ORDER BY LOWER(n.name), n.namespace_id, n.id
+"""
+		if limit:
+			sql += "LIMIT %d\n" % limit
+		
+		pattern = prefix.replace('\\','\\\\').replace('%','\\%').replace('_','\\_') + '%'
+		args = (pattern,) + tuple(itertools.chain.from_iterable(ranges))
+		with self._db:
+			for row in self._db.cursor().execute(sql, args):
+				yield (namespaces.get(row[0]),) + row[1:]
+	#_generateIDsByPrefix()
+	
+	
+	def _getSQLText(self, value):
+		"""
+		Converts an identifier to text the way SQLite does when comparing it to a text column.
+
+		Args:
+			value: The identifier.
+
+		Returns:
+			str: The text the identifier is compared as, or None if it can't equal any text value.
+		"""
+		if isinstance(value, str):
+			return value
+		if (value == None) or isinstance(value, (bytes, bytearray, memoryview)):
+			return None
+		if isinstance(value, int):
+			return str(int(value))
+		return max(row[0] for row in self._db.cursor().execute("SELECT CAST(? AS TEXT)", (value,)))
+	#_getSQLText()
+	
+	
+	def _getSQLIDText(self, value):
+		"""
+		Converts an identifier to the text of the ID it matches the way the SQL lookup does, as 1*identifier.
+
+		Args:
+			value: The identifier.
+
+		Returns:
+			str: The decimal text of the ID, or None if the identifier can't equal any integer ID.
+		"""
+		if isinstance(value, int):
+			return str(int(value))
+		if value == None:
+			return None
+		num = max(row[0] for row in self._db.cursor().execute("SELECT 1*?", (value,)))
+		if isinstance(num, float):
+			return str(int(num)) if num.is_integer() else None
+		return str(num) if isinstance(num, int) else None
+	#_getSQLIDText()
+	
+	
+	def _generateNameIndexRows(self, table, index, typeID, identifiers):
+		"""
+		Matches identifiers against a name sidecar index without querying the database.
+
+		Args:
+			table (str): The object table, either 'biopolymer' or 'group'.
+			index (Sidecar): The biopolymer or group name index.
+			typeID (int or Falseish): Type ID of the matched objects, or Falseish for any type.
+			identifiers (list): A list of tuples, where each tuple contains (namespace, name, extra).
+
+		Yields:
+			tuple: A tuple containing (idx, namespace, name, extra, id) for each match, or with id None
+			for identifiers with no match, in input order; the same rows as the SQL lookup, including
+			the 1-based input position idx.
+		"""
+		import numpy
+		
+		# identifiers=[ (namespace,name,extra), ... ]
+		#   namespace='' or '*' for any, '-' for labels, '=' for id
+		# yields (idx,namespace,name,extra,id)
+		hashes = index.getColumn('hash')
+		pool,offsets = index.getStrings('name')
+		namespaceIDs = index.getColumn('namespace_id')
+		ids = index.getColumn('id')
+		typeIDs = index.getColumn('type_id')
+		typeID = int(typeID) if typeID else None
+		
+		# nsIDs={ namespace : namespace_id or None for any or -2 for unknown }
+		nsIDs = { '=':-1, '-':0 }
+		idx = 1
+		identifiers = iter(identifiers)
+		while True:
+			batch = list(itertools.islice(identifiers, self._batchSize))
+			if not batch:
+				break
+			
+			# keys=[ (namespace_id or None for any,name), ... ] with name None for no possible match
+			keys = list()
+			for namespace,name,extra in batch:
+				if (namespace == None) or (name == None):
+					keys.append((None,None))
+					continue
+				if namespace not in nsIDs:
+					ns = namespace.strip(' ').lower()
+					if ns in ('','*'):
+						nsIDs[namespace] = None
+					else:
+						nsIDs[namespace] = self.getNamespaceID(ns) or -2
+				nsID = nsIDs[namespace]
+				if nsID == -2:
+					keys.append((None,None))
+					continue
+				if nsID == -1:
+					name = self._getSQLIDText(name)
+				else:
+					name = self._getSQLText(name)
+				if name == None:
+					keys.append((None,None))
+					continue
+				keys.append((nsID, name.encode('utf-8')))
+			#foreach identifier
+			
+			# only names can be ruled out by the filter, not labels or IDs
+			h = numpy.array([ (self._getNameHash(k[1].decode('utf-8')) if k[1] != None else 0) for k in keys ], dtype='<i8')
+			names = numpy.array([ (k[0] == None or k[0] > 0) for k in keys ], dtype=bool)
+			lo,hi = self._searchFilteredColumn(table + '_name', hashes, h, names)
+			for i in range(len(batch)):
+				namespace,name,extra = batch[i]
+				nsID,data = keys[i]
+				matched = False
+				if data != None:
+					for r in range(lo[i], hi[i]):
+						if nsID == None:
+							if namespaceIDs[r] <= 0:
+								continue
+						elif namespaceIDs[r] != nsID:
+							continue
+						if (typeID != None) and (typeIDs[r] != typeID):
+							continue
+						if pool[offsets[r]:offsets[r+1]].tobytes() != data:
+							continue
+						matched = True
+						yield (idx, namespace, name, extra, int(ids[r]))
+					#foreach candidate
+				if not matched:
+					yield (idx, namespace, name, extra, None)
+				idx += 1
+			#foreach identifier
+		#while batches
+	#_generateNameIndexRows()
+	
+	
+	##################################################
+	# existence filters
+	
+	
+	def _buildExistenceFilter(self, name, sql, hashNames=False):
+		"""
+		Builds a Bloom filter over the values of one column and stores it beside the database file.
+
+		Args:
+			name (str): The name of the filter's sidecar.
+			sql (str): A query returning the values to add, in its only column; its row count sizes the filter.
+			hashNames (bool, optional): If True, the values are names, which are added by their name hash. Defaults to False.
+
+		Returns:
+			BloomFilter: The new filter.
+
+		Raises:
+			Exception: If no database file is loaded.
+		"""
+		if not self._dbFile:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		self.log("building %s filter ..." % (name,))
+		with self._db:
+			fingerprint = self.getDatabaseFingerprint()
+			length = max(row[0] for row in self._db.cursor().execute("SELECT COUNT() FROM (%s)" % (sql,)))
+			if hashNames:
+				keys = (self._getNameHash(row[0]) for row in self._db.cursor().execute(sql))
+			else:
+				keys = (row[0] for row in self._db.cursor().execute(sql))
+			bloom = loki_filter.BloomFilter.build(keys, length)
+		self._sidecars[name + '_filter'] = loki_sidecar.Sidecar.writeArrays(self.getSidecarPath(name + '_filter'), (('bits', bloom.getBits()),), fingerprint)
+		self.log(" OK: %d keys\n" % (length,))
+		return bloom
+	#_buildExistenceFilter()
+	
+	
+	def buildExistenceFilters(self):
+		"""
+		Builds the Bloom filters over SNP RS numbers, merged RS numbers and biopolymer and group names.
+
+		The filters let lookups skip the database query or sidecar index search for inputs which
+		certainly have no match.
+		"""
+		self._buildExistenceFilter('snp_locus', "SELECT rs FROM `db`.`snp_locus`")
+		self._buildExistenceFilter('snp_merge', "SELECT rsMerged FROM `db`.`snp_merge`")
+		self._buildExistenceFilter('biopolymer_name', "SELECT name FROM `db`.`biopolymer_name`", True)
+		self._buildExistenceFilter('group_name', "SELECT name FROM `db`.`group_name`", True)
+	#buildExistenceFilters()
+	
+	
+	def _getExistenceFilter(self, name):
+		"""
+		Retrieves a Bloom filter, if it is available and up to date.
+
+		Args:
+			name (str): The name of the filter, such as 'snp_locus'.
+
+		Returns:
+			BloomFilter: The filter, or None if it is not available.
+		"""
+		sidecar = self._getSidecar(name + '_filter')
+		return loki_filter.BloomFilter(sidecar.getColumn('bits')) if sidecar else None
+	#_getExistenceFilter()
+	
+	
+	def _generateProbedInputs(self, name, inputs, field, getKey):
+		"""
+		Appends a probe value to each input tuple, which is None if the input certainly has no match.
+
+		Args:
+			name (str): The name of the Bloom filter to consult.
+			inputs (iterable): The input tuples.
+			field (int): The position of the value to probe within each input tuple.
+			getKey (callable): A function mapping an input tuple to its integer filter key, or to None
+				if the input can't be ruled out by the filter.
+
+		Yields:
+			tuple: Each input tuple, extended with its value at the given field or None.
+
+		If the filter is not available, every input is probed.  Queries join on the probe value
+		instead of the input value, so inputs which the filter rules out are still reported
+		(as unmatched) but are never looked up.
+		"""
+		bloom = self._getExistenceFilter(name)
+		if not bloom:
+			for row in inputs:
+				row = tuple(row)
+				yield row + (row[field],)
+			return
+		
+		import numpy
+		
+		inputs = iter(inputs)
+		while True:
+			batch = [ tuple(row) for row in itertools.islice(inputs, self._batchSize) ]
+			if not batch:
+				break
+			keys = [ getKey(row) for row in batch ]
+			found = bloom.contains(numpy.array([ (k if k != None else 0) for k in keys ], dtype='<i8')).tolist()
+			for row,key,maybe in zip(batch, keys, found):
+				yield row + ((row[field] if (maybe or key == None) else None),)
+		#while batches
+	#_generateProbedInputs()
+	
+	
+	def _searchFilteredColumn(self, name, column, keys, mask=None):
+		"""
+		Finds the rows of a sorted sidecar column equal to each key, skipping the binary search
+		for keys which a Bloom filter rules out.
+
+		Args:
+			name (str): The name of the Bloom filter to consult.
+			column (numpy.ndarray): The sorted column.
+			keys (numpy.ndarray): The signed 64-bit keys.
+			mask (numpy.ndarray, optional): Which keys the filter applies to. Defaults to None, for all keys.
+
+		Returns:
+			tuple: Arrays (lo, hi) bounding the rows equal to each key; lo == hi if there are none.
+		"""
+		import numpy
+		
+		bloom = self._getExistenceFilter(name)
+		if not bloom:
+			return (numpy.searchsorted(column, keys, 'left'), numpy.searchsorted(column, keys, 'right'))
+		probe = bloom.contains(keys)
+		if mask is not None:
+			probe |= ~mask
+		lo = numpy.zeros(len(keys), dtype=numpy.int64)
+		hi = numpy.zeros(len(keys), dtype=numpy.int64)
+		lo[probe] = numpy.searchsorted(column, keys[probe], 'left')
+		hi[probe] = numpy.searchsorted(column, keys[probe], 'right')
+		return (lo, hi)
+	#_searchFilteredColumn()
+	
+	
+	def _getRSFilterKey(self, row):
+		"""
+		Computes the Bloom filter key of an (rs, ...) input tuple.
+
+		Args:
+			row (tuple): The input tuple.
+
+		Returns:
+			int: The RS number, or None if it is not an integer in the signed 64-bit range.
+		"""
+		try:
+			rs = int(row[0])
+		except (TypeError, ValueError, OverflowError):
+			return None
+		return rs if (-2**63 <= rs < 2**63) else None
+	#_getRSFilterKey()
+	
+	
+	##################################################
+	# name statistics
+	
+	
+	def _buildNameStats(self, table):
+		"""
+		(Re)computes the materialized name statistics for biopolymers or groups.
+
+		Args:
+			table (str): The object table, either 'biopolymer' or 'group'.
+		"""
+		cursor = self._db.cursor()
+		cursor.execute("DELETE FROM `db`.`{0}_name_stats`".format(table))
+		cursor.execute("""
+INSERT INTO `db`.`{0}_name_stats` (namespace_id, type_id, names, `unique`, ambiguous)
+SELECT namespace_id, 0, COUNT(), SUM(matches = 1), SUM(matches > 1)
+FROM (
+  SELECT tn.namespace_id, tn.name, COUNT(DISTINCT tn.{0}_id) AS matches
+  FROM `db`.`{0}_name` AS tn
+  GROUP BY tn.namespace_id, tn.name
+)
+GROUP BY namespace_id
+""".format(table))
+		cursor.execute("""
+INSERT INTO `db`.`{0}_name_stats` (namespace_id, type_id, names, `unique`, ambiguous)
+SELECT namespace_id, type_id, COUNT(), SUM(matches = 1), SUM(matches > 1)
+FROM (
+  SELECT tn.namespace_id, t.type_id, tn.name, COUNT(DISTINCT tn.{0}_id) AS matches
+  FROM `db`.`{0}_name` AS tn
+  JOIN `db`.`{0}` AS t
+    ON t.{0}_id = tn.{0}_id
+  GROUP BY tn.namespace_id, t.type_id, tn.name
+)
+GROUP BY namespace_id, type_id
+""".format(table))
+	#_buildNameStats()
+	
+	
+	def buildNameStats(self):
+		"""
+		(Re)computes the materialized name statistics for biopolymers and groups, for every
+		combination of namespace and type.
+
+		Raises:
+			Exception: If no database file is loaded.
+		"""
+		if not self._dbFile:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		self.log("computing name statistics ...")
+		with self._db:
+			self._buildNameStats('biopolymer')
+			self._buildNameStats('group')
+		self.log(" OK\n")
+	#buildNameStats()
+	
+	
+	def _generateNameStatsRows(self, table, namespaceID, typeID):
+		"""
+		Summarizes the names of biopolymers or groups per namespace.
+
+		Args:
+			table (str): The object table, either 'biopolymer' or 'group'.
+			namespaceID (int or None): The namespace to summarize, or None for all namespaces.
+			typeID (int or None): The type of objects to count, or None for all types.
+
+		Yields:
+			tuple: A tuple containing (namespace, names, unique, ambiguous) for each namespace.
+
+		Finalized databases are answered from the statistics materialized by finalizeDatabase();
+		otherwise the names are aggregated on the fly.
+		"""
+		cursor = self._db.cursor()
+		if self.getDatabaseSetting('finalized', int) and self._hasDatabaseTable(table + '_name_stats') and any(cursor.execute("SELECT 1 FROM `db`.`{0}_name_stats` LIMIT 1".format(table))):
+			sql = """
+SELECT n.namespace, tns.names, tns.`unique`, tns.ambiguous
+FROM `db`.`{0}_name_stats` AS tns
+JOIN `db`.`namespace` AS n USING (namespace_id)
+WHERE tns.type_id = ?
+""".format(table)
+			if namespaceID:
+				sql += "  AND tns.namespace_id = %d\n" % namespaceID
+			sql += "ORDER BY tns.namespace_id\n"
+			for row in cursor.execute(sql, (typeID or 0,)):
+				yield row
+			return
+		
+		sql = """
+SELECT
+  `namespace`,
+  COUNT() AS `names`,
+  SUM(CASE WHEN matches = 1 THEN 1 ELSE 0 END) AS `unique`,
+  SUM(CASE WHEN matches > 1 THEN 1 ELSE 0 END) AS `ambiguous`
+FROM (
+  SELECT tn.namespace_id, tn.name, COUNT(DISTINCT tn.{0}_id) AS matches
+  FROM `db`.`{0}_name` AS tn
+""".format(table)
+		
+		if typeID:
+			sql += """
+  JOIN `db`.`{0}` AS t
+    ON t.{0}_id = tn.{0}_id AND t.type_id = {1:d}
+""".format(table, typeID)
+		
+		if namespaceID:
+			sql += """
+  WHERE tn.namespace_id = %d
+""" % namespaceID
+		
+		sql += """
+  GROUP BY tn.namespace_id, tn.name
+)
+JOIN `db`.`namespace` AS n USING (namespace_id)
+GROUP BY namespace_id
+"""
+		
+		for row in cursor.execute(sql):
+			yield row
+	#_generateNameStatsRows()
+	
+	
+	##################################################
+	# search indexes
+	
+	
+	def _buildSearchIndex(self, table):
+		"""
+		(Re)builds the full-text search table for biopolymers or groups.
+
+		Args:
+			table (str): The object table, either 'biopolymer' or 'group'.
+
+		Returns:
+			bool: True if the index was built, or False if this SQLite lacks the FTS5 trigram tokenizer.
+
+		The search table is an FTS5 table using the trigram tokenizer, with one row per object
+		holding its label, description and all of its names, keyed by the object's ID.
+		"""
+		cursor = self._db.cursor()
+		cursor.execute("DROP TABLE IF EXISTS `db`.`{0}_search`".format(table))
+		try:
+			cursor.execute("CREATE VIRTUAL TABLE `db`.`{0}_search` USING fts5(label, description, names, tokenize='trigram')".format(table))
+		except apsw.SQLError:
+			return False
+		cursor.execute("""
+INSERT INTO `db`.`{0}_search` (rowid, label, description, names)
+SELECT t.{0}_id, t.label, t.description, (SELECT GROUP_CONCAT(tn.name, CHAR(10)) FROM `db`.`{0}_name` AS tn WHERE tn.{0}_id = t.{0}_id)
+FROM `db`.`{0}` AS t
+""".format(table))
+		return True
+	#_buildSearchIndex()
+	
+	
+	def buildSearchIndexes(self):
+		"""
+		(Re)builds the full-text search tables used by the biopolymer and group search functions.
+
+		Raises:
+			Exception: If no database file is loaded.
+		"""
+		if not self._dbFile:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		self.log("building search indexes ...")
+		with self._db:
+			ok = self._buildSearchIndex('biopolymer') and self._buildSearchIndex('group')
+		if ok:
+			self.log(" OK\n")
+		else:
+			self.log(" WARNING: SQLite FTS5 trigram tokenizer is not available\n")
+	#buildSearchIndexes()
+	
+	
+	def _hasSearchIndex(self, table):
+		"""
+		Checks whether the full-text search table for biopolymers or groups exists.
+
+		Args:
+			table (str): The object table, either 'biopolymer' or 'group'.
+
+		Returns:
+			bool: True if the search table exists.
+		"""
+		if not self._dbFile:
+			return False
+		sql = "SELECT 1 FROM `db`.`sqlite_master` WHERE type = 'table' AND name = ?"
+		return any(self._db.cursor().execute(sql, (table + '_search',)))
+	#_hasSearchIndex()
+	
+	
+	def _generateSearchRows(self, table, typeID, texts, sql):
+		"""
+		Searches for objects through the full-text search table.
+
+		Args:
+			table (str): The object table, either 'biopolymer' or 'group'.
+			typeID (int or Falseish): Type ID of the matched objects, or Falseish for any type.
+			texts (list): A list of tuples, where each tuple contains (text, extra).
+			sql (str): The equivalent LIKE query, used for texts the index cannot answer.
+
+		Yields:
+			tuple: A tuple containing (extra, label, id) for each match, ordered by ID for each text.
+
+		The trigram index can only find substrings of at least three characters, so shorter texts,
+		texts containing LIKE wildcards and non-text values such as numbers fall back to the LIKE query.
+		"""
+		# texts=[ (text,extra), ... ]
+		# yields (extra,label,id)
+		
+		sqlMatch = """
+SELECT ?2 AS extra, t.label, t.{0}_id
+FROM `db`.`{0}_search` AS s
+JOIN `db`.`{0}` AS t
+  ON t.{0}_id = s.rowid
+WHERE s.`{0}_search` MATCH ?1
+""".format(table)
+		
+		if typeID:
+			sqlMatch += """
+  AND t.type_id = %d
+""" % typeID
+		#if typeID
+		
+		sqlMatch += """
+ORDER BY t.{0}_id
+""".format(table)
+		
+		cursor = self._db.cursor()
+		for text,extra in texts:
+			if isinstance(text, str) and (len(text) >= 3) and not any((c in text) for c in '%_\n'):
+				rows = cursor.execute(sqlMatch, ('"' + text.replace('"','""') + '"', extra))
+			else:
+				rows = cursor.execute(sql, (text, extra))
+			for row in rows:
+				yield row
+	#_generateSearchRows()
+	
+	
+	##################################################
+	# region tree
+	
+	
+	def _buildRegionTree(self):
+		"""
+		(Re)builds the R*Tree over biopolymer regions used by region overlap queries.
+
+		Returns:
+			bool: True if the tree was built, or False if this SQLite lacks the R*Tree module.
+
+		The tree has one entry per biopolymer_region row, keyed by its _ROWID_, with the LD
+		profile, chromosome and position range as its three (integer) dimensions, so one tree
+		serves every LD profile.
+		"""
+		cursor = self._db.cursor()
+		cursor.execute("DROP TABLE IF EXISTS `db`.`biopolymer_region_tree`")
+		try:
+			cursor.execute("CREATE VIRTUAL TABLE `db`.`biopolymer_region_tree` USING rtree_i32(id, ldprofileMin, ldprofileMax, chrMin, chrMax, posMin, posMax, +biopolymer_id)")
+		except apsw.SQLError:
+			return False
+		cursor.execute("""
+INSERT INTO `db`.`biopolymer_region_tree` (id, ldprofileMin, ldprofileMax, chrMin, chrMax, posMin, posMax, biopolymer_id)
+SELECT _ROWID_, ldprofile_id, ldprofile_id, chr, chr, MIN(posMin,posMax), MAX(posMin,posMax), biopolymer_id
+FROM `db`.`biopolymer_region`
+""")
+		return True
+	#_buildRegionTree()
+	
+	
+	def buildRegionTree(self):
+		"""
+		(Re)builds the R*Tree over biopolymer regions used by region overlap queries.
+
+		Raises:
+			Exception: If no database file is loaded.
+
+		The updater maintains the tree whenever biopolymer regions change, and finalizeDatabase()
+		adds it to a database built without it.
+		"""
+		if not self._dbFile:
+			raise Exception("ERROR: no knowledge database file is loaded")
+		self.log("building region tree ...")
+		with self._db:
+			ok = self._buildRegionTree()
+		if ok:
+			self.log(" OK\n")
+		else:
+			self.log(" WARNING: SQLite R*Tree module is not available\n")
+	#buildRegionTree()
+	
+	
+	def _hasRegionTree(self):
+		"""
+		Checks whether the R*Tree over biopolymer regions exists.
+
+		Returns:
+			bool: True if the tree exists.
+		"""
+		if not self._dbFile:
+			return False
+		sql = "SELECT 1 FROM `db`.`sqlite_master` WHERE type = 'table' AND name = 'biopolymer_region_tree'"
+		return any(self._db.cursor().execute(sql))
+	#_hasRegionTree()
+	
+	
+	##################################################
+	# metadata catalog
+	
+	
+	def loadMetadataCatalog(self):
+		"""
+		Loads the small metadata tables into memory so that ID lookups don't have to query the database.
+
+		Returns:
+			dict: The catalog, mapping each table name to a dictionary of normalized names and their rows.
+
+		The catalog covers the ldprofile, namespace, relationship, role, source, type and subtype tables.
+		It is loaded when a database file is attached, and reloaded on demand after it has been
+		invalidated by any change to those tables.
+		"""
+		catalog = dict()
+		if self._dbFile:
+			cursor = self._db.cursor()
+			catalog['ldprofile'] = { self._getCatalogKey(row[0], True):row for row in cursor.execute("SELECT ldprofile, ldprofile_id, description, metric, value FROM `db`.`ldprofile`") }
+			for table in ('namespace','relationship','role','source','type','subtype'):
+				sql = "SELECT `{0}`, `{0}_id` FROM `db`.`{0}`".format(table)
+				catalog[table] = { row[0]:row for row in cursor.execute(sql) }
+		self._catalog = catalog
+		return catalog
+	#loadMetadataCatalog()
+	
+	
+	def invalidateMetadataCatalog(self):
+		"""
+		Discards the metadata catalog, so it is reloaded by the next ID lookup.
+
+		This must be called after any change to the tables covered by the catalog.
+		"""
+		self._catalog = None
+	#invalidateMetadataCatalog()
+	
+	
+	def _getCatalogKey(self, name, trim=False):
+		"""
+		Normalizes a metadata name the same way the original SQL lookups did.
+
+		Args:
+			name (str): The name to normalize.
+			trim (bool, optional): If True, also strips surrounding spaces. Defaults to False.
+
+		Returns:
+			str: The lowercased name, or None if the name is None.
+		"""
+		if name == None:
+			return None
+		name = str(name)
+		return (name.strip(' ') if trim else name).lower()
+	#_getCatalogKey()
+	
+	
+	def _getCatalogRows(self, table, names, trim=False):
+		"""
+		Looks up names in one table of the metadata catalog.
+
+		Args:
+			table (str): The catalog table.
+			names (list): The names to look up.
+			trim (bool, optional): If True, surrounding spaces are ignored. Defaults to False.
+
+		Returns:
+			dict: A dictionary mapping each name to its catalog row, or None if not found.
+		"""
+		catalog = self._catalog if (self._catalog != None) else self.loadMetadataCatalog()
+		rows = catalog.get(table, {})
+		return { n:rows.get(self._getCatalogKey(n, trim)) for n in names }
+	#_getCatalogRows()
+	
+	
+	##################################################
+	# metadata retrieval
+	
+	
+	def generateGRChByUCSChg(self, ucschg):
+		"""
+		Generates GRCh values based on a given UCSC chain identifier.
+
+		Args:
+			ucschg (str): The UCSC chain identifier.
+
+		Returns:
+			generator: A generator yielding GRCh values corresponding to the given UCSC chain identifier.
+		"""
+		return (row[0] for row in self._db.cursor().execute("SELECT grch FROM grch_ucschg WHERE ucschg = ?", (ucschg,)))
+	#generateGRChByUCSChg()
+	
+	
+	def getUCSChgByGRCh(self, grch):
+		"""
+		Retrieves the UCSC chain identifier for a given GRCh value.
+
+		Args:
+			grch (str): The GRCh value.
+
+		Returns:
+			str: The UCSC chain identifier corresponding to the given GRCh value, or None if not found.
+		"""
+		ucschg = None
+		for row in self._db.cursor().execute("SELECT ucschg FROM grch_ucschg WHERE grch = ?", (grch,)):
+			ucschg = row[0]
+		return ucschg
+	#getUCSChgByGRCh()
+	
+	
+	def getLDProfileID(self, ldprofile):
+		"""
+		Retrieves the identifier for a given LD profile.
+
+		Args:
+			ldprofile (str): The LD profile name.
+
+		Returns:
+			int: The identifier of the LD profile, or None if not found.
+		"""
+		return self.getLDProfileIDs([ldprofile])[ldprofile]
+	#getLDProfileID()
+	
+	
+	def getLDProfileIDs(self, ldprofiles):
+		"""
+		Retrieves the identifiers for a list of LD profiles.
+
+		Args:
+			ldprofiles (list): A list of LD profile names.
+
+		Returns:
+			dict: A dictionary mapping LD profile names to their identifiers.
+		"""
+		if not self._dbFile:
+			return { l:None for l in ldprofiles }
+		return { l:(row[1] if row else None) for l,row in self._getCatalogRows('ldprofile', ldprofiles, True).items() }
+	#getLDProfileIDs()
+	
+	
+	def getLDProfiles(self, ldprofiles=None):
+		"""
+		Retrieves detailed information about LD profiles.
+
+		Args:
+			ldprofiles (list, optional): A list of LD profile names. Defaults to None, which retrieves information for all profiles.
+
+		Returns:
+			dict: A dictionary mapping LD profile names to a tuple containing their identifier, description, metric, and value.
+		"""
+		if not self._dbFile:
+			return { l:None for l in (ldprofiles or list()) }
+		if ldprofiles:
+			ret = { l:(row[1:] if row else (None,None,None,None)) for l,row in self._getCatalogRows('ldprofile', ldprofiles, True).items() }
+		else:
+			catalog = self._catalog if (self._catalog != None) else self.loadMetadataCatalog()
+			ret = { row[0]:row[1:] for row in catalog['ldprofile'].values() }
+		return ret
+	#getLDProfiles()
+	
+	
+	def getNamespaceID(self, namespace):
+		"""
+		Retrieves the identifier for a given namespace.
+
+		Args:
+			namespace (str): The namespace name.
+
+		Returns:
+			int: The identifier of the namespace, or None if not found.
+		"""
+		return self.getNamespaceIDs([namespace])[namespace]
+	#getNamespaceID()
+	
+	
+	def getNamespaceIDs(self, namespaces):
+		"""
+		Retrieves the identifiers for a list of namespaces.
+
+		Args:
+			namespaces (list): A list of namespace names.
+
+		Returns:
+			dict: A dictionary mapping namespace names to their identifiers.
+		"""
+		if not self._dbFile:
+			return { n:None for n in namespaces }
+		return { n:(row[1] if row else None) for n,row in self._getCatalogRows('namespace', namespaces).items() }
+	#getNamespaceIDs()
+	
+	
+	def getRelationshipID(self, relationship):
+		"""
+		Retrieves the identifier for a given relationship.
+
+		Args:
+			relationship (str): The relationship name.
+
+		Returns:
+			int: The identifier of the relationship, or None if not found.
 		"""
 		return self.getRelationshipIDs([relationship])[relationship]
 	#getRelationshipID()
@@ -1701,10 +4576,7 @@ class Database(object):
 		"""
 		if not self._dbFile:
 			return { r:None for r in relationships }
-		sql = "SELECT i.relationship, r.relationship_id FROM (SELECT ? AS relationship) AS i LEFT JOIN `db`.`relationship` AS r ON r.relationship = LOWER(i.relationship)"
-		with self._db:
-			ret = { row[0]:row[1] for row in self._db.cursor().executemany(sql, zip(relationships)) }
-		return ret
+		return { r:(row[1] if row else None) for r,row in self._getCatalogRows('relationship', relationships).items() }
 	#getRelationshipIDs()
 	
 	
@@ -1734,10 +4606,7 @@ class Database(object):
 		"""
 		if not self._dbFile:
 			return { r:None for r in roles }
-		sql = "SELECT i.role, role_id FROM (SELECT ? AS role) AS i LEFT JOIN `db`.`role` AS r ON r.role = LOWER(i.role)"
-		with self._db:
-			ret = { row[0]:row[1] for row in self._db.cursor().executemany(sql, zip(roles)) }
-		return ret
+		return { r:(row[1] if row else None) for r,row in self._getCatalogRows('role', roles).items() }
 	#getRoleIDs()
 	
 	
@@ -1768,13 +4637,10 @@ class Database(object):
 		if not self._dbFile:
 			return { s:None for s in (sources or list()) }
 		if sources:
-			sql = "SELECT i.source, s.source_id FROM (SELECT ? AS source) AS i LEFT JOIN `db`.`source` AS s ON s.source = LOWER(i.source)"
-			with self._db:
-				ret = { row[0]:row[1] for row in self._db.cursor().executemany(sql, zip(sources)) }
+			ret = { s:(row[1] if row else None) for s,row in self._getCatalogRows('source', sources).items() }
 		else:
-			sql = "SELECT source, source_id FROM `db`.`source`"
-			with self._db:
-				ret = { row[0]:row[1] for row in self._db.cursor().execute(sql) }
+			catalog = self._catalog if (self._catalog != None) else self.loadMetadataCatalog()
+			ret = { row[0]:row[1] for row in catalog['source'].values() }
 		return ret
 	#getSourceIDs()
 	
@@ -1858,10 +4724,7 @@ class Database(object):
 		"""
 		if not self._dbFile:
 			return { t:None for t in types }
-		sql = "SELECT i.type, t.type_id FROM (SELECT ? AS type) AS i LEFT JOIN `db`.`type` AS t ON t.type = LOWER(i.type)"
-		with self._db:
-			ret = { row[0]:row[1] for row in self._db.cursor().executemany(sql, zip(types)) }
-		return ret
+		return { t:(row[1] if row else None) for t,row in self._getCatalogRows('type', types).items() }
 	#getTypeIDs()
 	
 	def getSubtypeID(self, subtype):
@@ -1891,16 +4754,34 @@ class Database(object):
 		"""
 		if not self._dbFile:
 			return { t:None for t in subtypes }
-		sql = "SELECT i.subtype, t.subtype_id FROM (SELECT ? AS subtype) AS i LEFT JOIN `db`.`subtype` AS t ON t.subtype = LOWER(i.subtype)"
-		with self._db:
-			ret = { row[0]:row[1] for row in self._db.cursor().executemany(sql, zip(subtypes)) }
-		return ret
+		return { t:(row[1] if row else None) for t,row in self._getCatalogRows('subtype', subtypes).items() }
 	#getSubtypeIDs()
 	
 	##################################################
 	# snp data retrieval
 	
 	
+	def _getChrNum(self, chm):
+		"""
+		Normalizes a chromosome input to the number under which the database stores it.
+
+		Args:
+			chm (int or str): A chromosome number or name, such as 7, '7', 'X' or 'chrX'.
+
+		Returns:
+			int: The chromosome number, or the input unchanged if it is not a known chromosome.
+		"""
+		num = self.chr_num.get(chm)
+		if (num == None) and isinstance(chm, str):
+			name = chm.strip().upper()
+			if name.startswith('CHR'):
+				name = name[3:]
+			num = self.chr_num.get(name)
+		return num if (num != None) else chm
+	#_getChrNum()
+	
+	
+	@_cachedQuery
 	def generateCurrentRSesByRSes(self, rses, tally=None):
 		"""
 		Generates current RS IDs by merging RS IDs from the database.
@@ -1911,19 +4792,31 @@ class Database(object):
 
 		Yields:
 			tuple: A tuple containing (rsMerged, extra, rsCurrent).
+
+		If the SNP merge sidecar index is up to date, merges are folded through it rather than the database.
 		"""
 		# rses=[ (rsInput,extra), ... ]
 		# tally=dict()
 		# yield:[ (rsInput,extra,rsCurrent), ... ]
 		sql = """
 SELECT i.rsMerged, i.extra, COALESCE(sm.rsCurrent, i.rsMerged) AS rsCurrent
-FROM (SELECT ? AS rsMerged, ? AS extra) AS i
-LEFT JOIN `db`.`snp_merge` AS sm USING (rsMerged)
+FROM {batch} AS i
+LEFT JOIN `db`.`snp_merge` AS sm
+  ON sm.rsMerged = i.probe
+ORDER BY i.idx
 """
+		# use the sidecar index instead of the database, if it's up to date
+		index = self.getSNPMergeIndex()
+		
 		with self._db:
+			if index:
+				rows = self._generateSNPMergeIndexRows(index, rses)
+			else:
+				rses = self._generateProbedInputs('snp_merge', rses, 0, self._getRSFilterKey)
+				rows = self._generateBatchQueryRows(sql, ('rsMerged','extra','probe'), rses)
 			if tally != None:
 				numMerge = numMatch = 0
-				for row in self._db.cursor().executemany(sql, rses):
+				for row in rows:
 					if row[2] != row[0]:
 						numMerge += 1
 					else:
@@ -1932,12 +4825,13 @@ LEFT JOIN `db`.`snp_merge` AS sm USING (rsMerged)
 				tally['merge'] = numMerge
 				tally['match'] = numMatch
 			else:
-				for row in self._db.cursor().executemany(sql, rses):
+				for row in rows:
 					yield row
 	#generateCurrentRSesByRSes()
 	
 	
-	def generateSNPLociByRSes(self, rses, minMatch=1, maxMatch=1, validated=None, tally=None, errorCallback=None):
+	@_cachedQuery
+	def generateSNPLociByRSes(self, rses, minMatch=1, maxMatch=1, validated=None, tally=None, errorCallback=None, currentRS=False):
 		"""
 		Generates SNP loci by RS IDs from the database.
 
@@ -1948,30 +4842,55 @@ LEFT JOIN `db`.`snp_merge` AS sm USING (rsMerged)
 			validated (bool, optional): Flag to filter validated SNP loci. Defaults to None.
 			tally (dict, optional): A dictionary to store tally counts for 'zero', 'one', and 'many'. Defaults to None.
 			errorCallback (callable, optional): A callable function for error handling. Defaults to None.
+			currentRS (bool, optional): If True, merged RS IDs are first folded into their current RS IDs
+				(see generateCurrentRSesByRSes), which are then looked up and returned instead. Defaults to False.
 
 		Yields:
 			tuple: A tuple containing (rs, extra, chr, pos) for each SNP locus.
+
+		Input positions in error messages ("at index N") refer to the given inputs, even when
+		currentRS folds one input into several current RS IDs.
 		"""
 		# rses=[ (rs,extra), ... ]
 		# tally=dict()
 		# yield:[ (rs,extra,chr,pos), ... ]
 		sql = """
-SELECT i.rs, i.extra, sl.chr, sl.pos
-FROM (SELECT ? AS rs, ? AS extra) AS i
+SELECT i.idx, i.rs, i.extra, sl.chr, sl.pos
+FROM {{batch}} AS i
 LEFT JOIN `db`.`snp_locus` AS sl
-  ON sl.rs = i.rs
-ORDER BY sl.chr, sl.pos
-"""
-		if validated != None:
-			sql += "  AND sl.validated = %d" % (1 if validated else 0)
+  ON sl.rs = i.probe
+  {0}
+ORDER BY i.idx, sl.chr, sl.pos
+""".format("" if (validated == None) else ("AND sl.validated = %d" % (1 if validated else 0)))
+		
+		# use the sidecar index instead of the database, if it's up to date
+		index = self.getSNPLocusIndex()
+		
+		# with currentRS, each input's position stands in for its extra through the merge
+		# expansion, and the extras wait here until their results come back in order
+		extras = None
+		if currentRS:
+			extras = collections.deque()
+			def _inputs(rses):
+				for n,(rs,extra) in enumerate(rses, 1):
+					extras.append( (n,extra) )
+					yield (rs, n)
+			#_inputs()
+			rses = ((row[2],row[1]) for row in self.generateCurrentRSesByRSes(_inputs(rses)))
 		
 		minMatch = int(minMatch) if (minMatch != None) else 0
 		maxMatch = int(maxMatch) if (maxMatch != None) else None
-		tag = matches = None
-		n = numZero = numOne = numMany = 0
+		idx = tag = matches = None
+		numZero = numOne = numMany = 0
 		with self._db:
-			for row in itertools.chain(self._db.cursor().executemany(sql, rses), [(None,None,None,None)]):
-				if tag != row[0:2]:
+			if index:
+				rows = self._generateSNPLocusIndexRows(index, rses, validated)
+			else:
+				rses = self._generateProbedInputs('snp_locus', rses, 0, self._getRSFilterKey)
+				rows = self._generateBatchQueryRows(sql, ('rs','extra','probe'), rses)
+			inputIdx = None
+			for row in itertools.chain(rows, [(None,None,None,None,None)]):
+				if idx != row[0]:
 					if tag:
 						if not matches:
 							numZero += 1
@@ -1984,12 +4903,16 @@ ORDER BY sl.chr, sl.pos
 							for match in (matches or [tag+(None,None)]):
 								yield match
 						elif errorCallback:
-							errorCallback("\t".join((t or "") for t in tag), "%s match%s at index %d" % ((len(matches) or "no"),("" if len(matches) == 1 else "es"),n))
-					tag = row[0:2]
+							errorCallback("\t".join(str(t or "") for t in tag), "%s match%s at index %d" % ((len(matches) or "no"),("" if len(matches) == 1 else "es"),self._getInputIndex(inputIdx)))
+					idx = inputIdx = row[0]
+					if extras != None and idx != None:
+						inputIdx = row[2]
+						while extras[0][0] < inputIdx:
+							extras.popleft()
+					tag = row[1:3] if (extras == None) else (row[1], extras[0][1])
 					matches = list()
-					n += 1
-				if row[2] and row[3]:
-					matches.append(row)
+				if row[3] and row[4]:
+					matches.append(tag + row[3:5])
 			#foreach row
 		if tally != None:
 			tally['zero'] = numZero
@@ -1998,6 +4921,272 @@ ORDER BY sl.chr, sl.pos
 	#generateSNPLociByRSes()
 	
 	
+	def _getRSIndexKey(self, rs):
+		"""
+		Converts an input RS ID to the integer it matches in SQL, for searching a sidecar index.
+
+		Args:
+			rs (int, float or str): The input RS ID.
+
+		Returns:
+			int: The RS number, or -1 if the input cannot equal any RS number, such as 11.5 or 'rs11'.
+		"""
+		# SQLite compares numeric text as a number, but anything else only by exact value
+		try:
+			if isinstance(rs, str):
+				if '_' in rs:
+					return -1
+				try:
+					key = int(rs)
+				except ValueError:
+					key = float(rs)
+					key = int(key) if key.is_integer() else -1
+			else:
+				key = int(rs)
+				if key != rs:
+					return -1
+		except (TypeError, ValueError, OverflowError):
+			return -1
+		return key if (-2**63 <= key < 2**63) else -1
+	#_getRSIndexKey()
+	
+	
+	def _generateSNPLocusIndexRows(self, index, rses, validated):
+		"""
+		Looks up SNP loci by RS IDs in the sidecar index, one batch of inputs at a time.
+
+		Args:
+			index (Sidecar): The SNP locus index.
+			rses (list): A list of tuples, where each tuple contains (rs, extra).
+			validated (bool or None): Flag to filter validated SNP loci.
+
+		Yields:
+			tuple: A tuple containing (index, rs, extra, chr, pos) for each match, or with chr and pos
+			set to None for inputs with no matches, in the same order as the equivalent database query.
+		"""
+		import numpy
+		
+		rsIndex = index.getColumn('rs')
+		chrIndex = index.getColumn('chr')
+		posIndex = index.getColumn('pos')
+		validIndex = index.getColumn('validated')
+		rses = iter(rses)
+		n = 0
+		while True:
+			batch = list(itertools.islice(rses, self._batchSize))
+			if not batch:
+				break
+			keys = numpy.array([ self._getRSIndexKey(rs) for rs,extra in batch ], dtype=numpy.int64)
+			lo,hi = self._searchFilteredColumn('snp_locus', rsIndex, keys)
+			lo = lo.tolist()
+			hi = hi.tolist()
+			for i in range(len(batch)):
+				rs,extra = batch[i]
+				found = False
+				if lo[i] < hi[i]:
+					for c,p,v in zip(chrIndex[lo[i]:hi[i]].tolist(), posIndex[lo[i]:hi[i]].tolist(), validIndex[lo[i]:hi[i]].tolist()):
+						if (validated == None) or (bool(v) == bool(validated)):
+							found = True
+							yield (n+i+1, rs, extra, c, p)
+				if not found:
+					yield (n+i+1, rs, extra, None, None)
+			#foreach input
+			n += len(batch)
+		#while rses
+	#_generateSNPLocusIndexRows()
+	
+	
+	def getSNPLociArraysByRSes(self, rses, validated=None):
+		"""
+		Looks up SNP loci for an array of RS IDs using the sidecar index.
+
+		Args:
+			rses (array-like): The RS IDs to look up.
+			validated (bool, optional): Flag to filter validated SNP loci. Defaults to None.
+
+		Returns:
+			dict: NumPy arrays 'index', 'rs', 'chr' and 'pos' with one entry per match, where 'index' is the
+			position of the matched RS ID in the input; matches are ordered by input position, then chr and pos.
+
+		Raises:
+			Exception: If the index cannot be built.
+
+		The index is (re)built first if it is missing or out of date.  Unlike generateSNPLociByRSes(),
+		inputs with no matches are simply absent from the output rather than reported.
+		"""
+		import numpy
+		
+		index = self.getSNPLocusIndex(rebuild=True)
+		rsIndex = index.getColumn('rs')
+		keys = numpy.asarray(rses, dtype=numpy.int64)
+		lo,hi = self._searchFilteredColumn('snp_locus', rsIndex, keys)
+		counts = hi - lo
+		
+		# expand each input's [lo,hi) range of index rows
+		inputs = numpy.repeat(numpy.arange(len(keys)), counts)
+		starts = numpy.cumsum(counts) - counts
+		rows = numpy.arange(counts.sum()) - numpy.repeat(starts - lo, counts)
+		if validated != None:
+			keep = (index.getColumn('validated')[rows] != 0) == bool(validated)
+			inputs = inputs[keep]
+			rows = rows[keep]
+		return {
+			'index': inputs,
+			'rs': keys[inputs],
+			'chr': numpy.asarray(index.getColumn('chr')[rows]),
+			'pos': numpy.asarray(index.getColumn('pos')[rows]),
+		}
+	#getSNPLociArraysByRSes()
+	
+	
+	@_cachedQuery
+	def generateSNPsByRegions(self, regions, validated=None, padding=0):
+		"""
+		Generates the SNP loci which fall within each of the given regions.
+
+		Args:
+			regions (list): A list of tuples, where each tuple contains (label, chr, posMin, posMax, extra);
+				chr may be a number or a name such as 'X' or 'chrX'.
+			validated (bool, optional): Flag to filter validated SNP loci. Defaults to None.
+			padding (int, optional): Distance to extend each input region on both ends. Defaults to 0.
+
+		Yields:
+			tuple: A tuple containing (label, extra, rs, chr, pos) for each SNP locus,
+			in input order and then by position.
+		"""
+		# regions=[ (label,chr,posMin,posMax,extra), ... ]
+		# yield:[ (label,extra,rs,chr,pos), ... ]
+		sql,columns,inputs = self._prepareSNPRegionQuery("i.label, i.extra, sl.rs, sl.chr, sl.pos", regions, validated, padding)
+		with self._db:
+			for row in self._generateBatchQueryRows(sql, columns, inputs):
+				yield row
+	#generateSNPsByRegions()
+	
+	
+	def _prepareSNPRegionQuery(self, select, regions, validated, padding):
+		"""
+		Prepares the query which matches regions to the SNP loci within them.
+
+		Args:
+			select (str): The result columns of the query.
+			regions (iterable): Tuples of (label, chr, posMin, posMax, extra).
+			validated (bool or None): Flag to filter validated SNP loci.
+			padding (int): Distance to extend each input region on both ends.
+
+		Returns:
+			tuple: The query, with '{batch}' in place of the batch table name, the batch columns,
+			and a generator of the input tuples for them.
+		"""
+		sql = """
+SELECT %s
+FROM {batch} AS i
+JOIN `db`.`snp_locus` AS sl
+  ON sl.chr = i.chr
+  AND sl.pos BETWEEN i.posMin AND i.posMax
+""" % (select,)
+		if validated != None:
+			sql += "  AND sl.validated = %d\n" % (1 if validated else 0)
+		sql += "ORDER BY i.idx, sl.pos, sl.rs\n"
+		
+		def _inputs():
+			for label,chm,posMin,posMax,extra in regions:
+				if posMin > posMax:
+					posMin,posMax = posMax,posMin
+				yield (label, self._getChrNum(chm), posMin - padding, posMax + padding, extra)
+		#_inputs()
+		
+		return (sql, ('label','chr','posMin','posMax','extra'), _inputs())
+	#_prepareSNPRegionQuery()
+	
+	
+	@_cachedQuery
+	def generateRSesByLoci(self, loci, minMatch=1, maxMatch=1, validated=None, tally=None, errorCallback=None):
+		"""
+		Generates RS IDs by SNP loci from the database.
+
+		Args:
+			loci (list): A list of tuples, where each tuple contains (chr, pos, extra);
+				chr may be a number or a name such as 'X' or 'chrX'.
+			minMatch (int, optional): Minimum number of matches required. Defaults to 1.
+			maxMatch (int, optional): Maximum number of matches allowed. Defaults to 1.
+			validated (bool, optional): Flag to filter validated SNP loci. Defaults to None.
+			tally (dict, optional): A dictionary to store tally counts for 'zero', 'one', and 'many'. Defaults to None.
+			errorCallback (callable, optional): A callable function for error handling. Defaults to None.
+
+		Yields:
+			tuple: A tuple containing (chr, pos, extra, rs) for each SNP locus, in input order.
+
+		Each batch of inputs is indexed and then read in (chr,pos) order, so the snp_locus__chr_pos_rs
+		index is walked sequentially rather than randomly; results are then restored to input order.
+		"""
+		# loci=[ (chr,pos,extra), ... ]
+		# tally=dict()
+		# yield:[ (chr,pos,extra,rs), ... ]
+		sql = """
+SELECT i.idx, i.chr, i.pos, i.extra, sl.rs
+FROM {batch} AS i
+LEFT JOIN `db`.`snp_locus` AS sl
+  ON sl.chr = i.chrNum
+  AND sl.pos = i.pos
+"""
+		if validated != None:
+			sql += "  AND sl.validated = %d\n" % (1 if validated else 0)
+		sql += "ORDER BY i.chrNum, i.pos, i.idx, sl.rs\n"
+		
+		def _inputs():
+			for chm,pos,extra in loci:
+				yield (chm, self._getChrNum(chm), pos, extra)
+		#_inputs()
+		
+		def _rows():
+			# collect each batch in index order, then restore input order;
+			# the sort is stable, so each input's matches stay ordered by rs
+			cursor = self._db.cursor()
+			batches = self._generateInputBatches(('chr','chrNum','pos','extra'), _inputs(), ('chrNum','pos','idx'))
+			try:
+				for batch in batches:
+					rows = list(cursor.execute(sql.format(batch=batch)))
+					rows.sort(key=lambda r: r[0])
+					for row in rows:
+						yield row
+			finally:
+				cursor.close()
+				batches.close()
+		#_rows()
+		
+		minMatch = int(minMatch) if (minMatch != None) else 0
+		maxMatch = int(maxMatch) if (maxMatch != None) else None
+		idx = tag = matches = None
+		numZero = numOne = numMany = 0
+		with self._db:
+			for row in itertools.chain(_rows(), [(None,None,None,None,None)]):
+				if idx != row[0]:
+					if tag:
+						if not matches:
+							numZero += 1
+						elif len(matches) == 1:
+							numOne += 1
+						else:
+							numMany += 1
+						
+						if minMatch <= len(matches) <= (maxMatch if (maxMatch != None) else len(matches)):
+							for match in (matches or [tag+(None,)]):
+								yield match
+						elif errorCallback:
+							errorCallback("\t".join(str(t or "") for t in tag), "%s match%s at index %d" % ((len(matches) or "no"),("" if len(matches) == 1 else "es"),self._getInputIndex(idx)))
+					idx = row[0]
+					tag = row[1:4]
+					matches = list()
+				if row[4]:
+					matches.append(row[1:])
+			#foreach row
+		if tally != None:
+			tally['zero'] = numZero
+			tally['one']  = numOne
+			tally['many'] = numMany
+	#generateRSesByLoci()
+	
+	
 	##################################################
 	# biopolymer data retrieval
 	
@@ -2014,8 +5203,16 @@ ORDER BY sl.chr, sl.pos
 		"""
 		# ids=[ (id,extra), ... ]
 		# yield:[ (id,extra,type_id,label,description), ... ]
-		sql = "SELECT biopolymer_id, ?2 AS extra, type_id, label, description FROM `db`.`biopolymer` WHERE biopolymer_id = ?1"
-		return self._db.cursor().executemany(sql, ids)
+		sql = """
+SELECT b.biopolymer_id, i.extra, b.type_id, b.label, b.description
+FROM {batch} AS i
+JOIN `db`.`biopolymer` AS b
+  ON b.biopolymer_id = i.id
+ORDER BY i.idx
+"""
+		with self._db:
+			for row in self._generateBatchQueryRows(sql, ('id','extra'), ids):
+				yield row
 	#generateBiopolymersByIDs()
 	
 	
@@ -2043,37 +5240,18 @@ ORDER BY sl.chr, sl.pos
 		# errorCallback=callable(position,input,error)
 		# yields (namespace,name,extra,id)
 		
-		sql = """
-SELECT i.namespace, i.identifier, i.extra, COALESCE(bID.biopolymer_id,bLabel.biopolymer_id,bName.biopolymer_id) AS biopolymer_id
-FROM (SELECT ?1 AS namespace, ?2 AS identifier, ?3 AS extra) AS i
-LEFT JOIN `db`.`biopolymer` AS bID
-  ON i.namespace = '='
-  AND bID.biopolymer_id = 1*i.identifier
-  AND ( ({0} IS NULL) OR (bID.type_id = {0}) )
-LEFT JOIN `db`.`biopolymer` AS bLabel
-  ON i.namespace = '-'
-  AND bLabel.label = i.identifier
-  AND ( ({0} IS NULL) OR (bLabel.type_id = {0}) )
-LEFT JOIN `db`.`namespace` AS n
-  ON i.namespace NOT IN ('=','-')
-  AND n.namespace = COALESCE(NULLIF(NULLIF(LOWER(TRIM(i.namespace)),''),'*'),n.namespace)
-LEFT JOIN `db`.`biopolymer_name` AS bn
-  ON i.namespace NOT IN ('=','-')
-  AND bn.name = i.identifier
-  AND bn.namespace_id = n.namespace_id
-LEFT JOIN `db`.`biopolymer` AS bName
-  ON i.namespace NOT IN ('=','-')
-  AND bName.biopolymer_id = bn.biopolymer_id
-  AND ( ({0} IS NULL) OR (bName.type_id = {0}) )
-""".format(int(typeID) if typeID else "NULL")
-		
 		minMatch = int(minMatch) if (minMatch != None) else 0
 		maxMatch = int(maxMatch) if (maxMatch != None) else None
-		tag = matches = None
-		n = numZero = numOne = numMany = 0
+		idx = tag = matches = None
+		numZero = numOne = numMany = 0
+		index = self.getBiopolymerNameIndex()
 		with self._db:
-			for row in itertools.chain(self._db.cursor().executemany(sql, identifiers), [(None,None,None,None)]):
-				if tag != row[0:3]:
+			if index:
+				rows = self._generateNameIndexRows('biopolymer', index, typeID, identifiers)
+			else:
+				rows = self._generateIdentifierQueryRows('biopolymer', typeID, identifiers)
+			for row in itertools.chain(rows, [(None,None,None,None,None)]):
+				if idx != row[0]:
 					if tag:
 						if not matches:
 							numZero += 1
@@ -2086,12 +5264,12 @@ LEFT JOIN `db`.`biopolymer` AS bName
 							for match in (matches or [tag+(None,)]):
 								yield match
 						elif errorCallback:
-							errorCallback("\t".join((t or "") for t in tag), "%s match%s at index %d" % ((len(matches) or "no"),("" if len(matches) == 1 else "es"),n))
-					tag = row[0:3]
+							errorCallback("\t".join((t or "") for t in tag), "%s match%s at index %d" % ((len(matches) or "no"),("" if len(matches) == 1 else "es"),self._getInputIndex(idx)))
+					idx = row[0]
+					tag = row[1:4]
 					matches = set()
-					n += 1
-				if row[3]:
-					matches.add(row)
+				if row[4]:
+					matches.add(row[1:])
 			#foreach row
 		if tally != None:
 			tally['zero'] = numZero
@@ -2100,6 +5278,7 @@ LEFT JOIN `db`.`biopolymer` AS bName
 	#_lookupBiopolymerIDs()
 	
 	
+	@_cachedQuery
 	def generateBiopolymerIDsByIdentifiers(self, identifiers, minMatch=1, maxMatch=1, tally=None, errorCallback=None):
 		"""
 		Retrieve biopolymer IDs based on identifiers such as namespace and name.
@@ -2126,6 +5305,7 @@ LEFT JOIN `db`.`biopolymer` AS bName
 	#generateBiopolymerIDsByIdentifiers()
 	
 	
+	@_cachedQuery
 	def generateTypedBiopolymerIDsByIdentifiers(self, typeID, identifiers, minMatch=1, maxMatch=1, tally=None, errorCallback=None):
 		"""
 		Retrieve biopolymer IDs based on identifiers with a specific type.
@@ -2194,6 +5374,8 @@ WHERE
 GROUP BY b.biopolymer_id
 """
 		
+		if self._hasSearchIndex('biopolymer'):
+			return self._generateSearchRows('biopolymer', typeID, texts, sql)
 		return self._db.cursor().executemany(sql, texts)
 	#_searchBiopolymerIDs()
 	
@@ -2236,6 +5418,52 @@ GROUP BY b.biopolymer_id
 	#generateTypedBiopolymerIDsBySearch()
 	
 	
+	def generateBiopolymerIDsByPrefix(self, prefix, namespace=None, limit=10):
+		"""
+		Retrieve biopolymer names and labels starting with a prefix, for autocompletion.
+
+		Parameters:
+		-----------
+		prefix : str
+			The prefix to complete, matched case-insensitively.
+		namespace : str or None, optional
+			Namespace to search; '-' for labels only, '' or '*' for any namespace but not labels,
+			or None for all names and labels (default is None).
+		limit : int, optional
+			Maximum number of results, or None for no limit (default is 10).
+
+		Returns:
+		--------
+		Generator object yielding (namespace, name, id) tuples, with namespace '-' for labels.
+		"""
+		return self._generateIDsByPrefix('biopolymer', None, prefix, namespace, limit)
+	#generateBiopolymerIDsByPrefix()
+	
+	
+	def generateTypedBiopolymerIDsByPrefix(self, typeID, prefix, namespace=None, limit=10):
+		"""
+		Retrieve biopolymer names and labels starting with a prefix, for autocompletion, with a specific type.
+
+		Parameters:
+		-----------
+		typeID : int or None
+			Specific type ID for filtering.
+		prefix : str
+			The prefix to complete, matched case-insensitively.
+		namespace : str or None, optional
+			Namespace to search; '-' for labels only, '' or '*' for any namespace but not labels,
+			or None for all names and labels (default is None).
+		limit : int, optional
+			Maximum number of results, or None for no limit (default is 10).
+
+		Returns:
+		--------
+		Generator object yielding (namespace, name, id) tuples, with namespace '-' for labels.
+		"""
+		return self._generateIDsByPrefix('biopolymer', typeID, prefix, namespace, limit)
+	#generateTypedBiopolymerIDsByPrefix()
+	
+	
 	def generateBiopolymerNameStats(self, namespaceID=None, typeID=None):
 		"""
 		Generate statistics on biopolymer names, including counts of unique and ambiguous names.
@@ -2255,38 +5483,342 @@ GROUP BY b.biopolymer_id
 			- `unique`: Number of unique names.
 			- `ambiguous`: Number of ambiguous names.
 		"""
-		sql = """
-SELECT
-  `namespace`,
-  COUNT() AS `names`,
-  SUM(CASE WHEN matches = 1 THEN 1 ELSE 0 END) AS `unique`,
-  SUM(CASE WHEN matches > 1 THEN 1 ELSE 0 END) AS `ambiguous`
-FROM (
-  SELECT bn.namespace_id, bn.name, COUNT(DISTINCT bn.biopolymer_id) AS matches
-  FROM `db`.`biopolymer_name` AS bn
-"""
+		return self._generateNameStatsRows('biopolymer', namespaceID, typeID)
+	#generateBiopolymerNameStats()
+	
+	
+	@_cachedQuery
+	def generateBiopolymersByRegions(self, regions, ldprofile=None, typeID=None, padding=0):
+		"""
+		Generates the biopolymers whose regions overlap each of the given regions.
+
+		Args:
+			regions (list): A list of tuples, where each tuple contains (label, chr, posMin, posMax, extra);
+				chr may be a number or a name such as 'X' or 'chrX'.
+			ldprofile (str, optional): The LD profile of the biopolymer regions to match. Defaults to None,
+				which uses the default (no LD adjustment) profile.
+			typeID (int, optional): Type ID of the biopolymers to match. Defaults to None, for any type.
+			padding (int, optional): Distance to extend each input region on both ends. Defaults to 0.
+
+		Yields:
+			tuple: A tuple containing (label, extra, biopolymer_id) for each overlapping biopolymer,
+			in input order and then by biopolymer_id.
+
+		If the database has a region tree (see buildRegionTree), overlapping regions are found
+		directly through it.  Otherwise candidates are first pruned through the biopolymer_zone
+		index, then checked for exact overlap against biopolymer_region.  Either way, regions
+		are 1-based, closed intervals.
+		"""
+		# regions=[ (label,chr,posMin,posMax,extra), ... ]
+		# yield:[ (label,extra,biopolymer_id), ... ]
+		query = self._prepareBiopolymerRegionQuery("i.label, i.extra, br.biopolymer_id", regions, ldprofile, typeID, padding)
+		if not query:
+			return
+		sql,columns,inputs = query
+		with self._db:
+			for row in self._generateBatchQueryRows(sql, columns, inputs):
+				yield row
+	#generateBiopolymersByRegions()
+	
+	
+	def _prepareBiopolymerRegionQuery(self, select, regions, ldprofile, typeID, padding):
+		"""
+		Prepares the query which matches regions to the biopolymers which overlap them.
+
+		Args:
+			select (str): The result columns of the query.
+			regions (iterable): Tuples of (label, chr, posMin, posMax, extra).
+			ldprofile (str or None): The LD profile of the biopolymer regions to match.
+			typeID (int or None): Type ID of the biopolymers to match.
+			padding (int): Distance to extend each input region on both ends.
+
+		Returns:
+			tuple: The query, with '{batch}' in place of the batch table name, the batch columns,
+			and a generator of the input tuples for them; or None if the LD profile is not known.
+		"""
+		ldprofileID = self.getLDProfileID(ldprofile or '')
+		if ldprofileID == None:
+			return None
+		if self._hasRegionTree():
+			size = None
+			sql = """
+SELECT {1}
+FROM {{batch}} AS i
+JOIN `db`.`biopolymer_region_tree` AS br
+  ON br.ldprofileMin <= {0} AND br.ldprofileMax >= {0}
+  AND br.chrMin <= i.chr AND br.chrMax >= i.chr
+  AND br.posMin <= i.posMax
+  AND br.posMax >= i.posMin
+""".format(int(ldprofileID), select)
+		else:
+			size = self.getDatabaseSetting('zone_size',int)
+			if not size:
+				raise Exception("ERROR: could not determine database setting 'zone_size'")
+			sql = """
+SELECT {1}
+FROM {{batch}} AS i
+JOIN `db`.`biopolymer_zone` AS bz
+  ON bz.chr = i.chr
+  AND bz.zone BETWEEN i.zoneMin AND i.zoneMax
+JOIN `db`.`biopolymer_region` AS br
+  ON br.biopolymer_id = bz.biopolymer_id
+  AND br.ldprofile_id = {0}
+  AND br.chr = i.chr
+  AND br.posMin <= i.posMax
+  AND br.posMax >= i.posMin
+""".format(int(ldprofileID), select)
 		
 		if typeID:
 			sql += """
-  JOIN `db`.`biopolymer` AS b
-    ON b.biopolymer_id = bn.biopolymer_id AND b.type_id = %d
+JOIN `db`.`biopolymer` AS b
+  ON b.biopolymer_id = br.biopolymer_id
+  AND b.type_id = %d
 """ % typeID
 		
-		if namespaceID:
-			sql += """
-  WHERE bn.namespace_id = %d
-""" % namespaceID
-		
 		sql += """
-  GROUP BY bn.namespace_id, bn.name
-)
-JOIN `db`.`namespace` AS n USING (namespace_id)
-GROUP BY namespace_id
+GROUP BY i.idx, br.biopolymer_id
+ORDER BY i.idx, br.biopolymer_id
+"""
+		
+		def _inputs():
+			for label,chm,posMin,posMax,extra in regions:
+				if posMin > posMax:
+					posMin,posMax = posMax,posMin
+				posMin -= padding
+				posMax += padding
+				chm = self._getChrNum(chm)
+				if size:
+					yield (label, chm, posMin, posMax, extra, int(posMin/size), int(posMax/size))
+				else:
+					yield (label, chm, posMin, posMax, extra, None, None)
+		#_inputs()
+		
+		return (sql, ('label','chr','posMin','posMax','extra','zoneMin','zoneMax'), _inputs())
+	#_prepareBiopolymerRegionQuery()
+	
+	
+	def generateBiopolymersByPositions(self, positions, ldprofile=None, typeID=None, padding=0, errorCallback=None):
+		"""
+		Annotates a sorted stream of positions with the biopolymers whose regions contain them.
+
+		Args:
+			positions (iterable): Tuples of (label, chr, pos, extra), grouped by chromosome and sorted
+				by position within each chromosome.
+			ldprofile (str, optional): The LD profile of the biopolymer regions to match. Defaults to None,
+				which uses the default (no LD adjustment) profile.
+			typeID (int, optional): Type ID of the biopolymers to match. Defaults to None, for any type.
+			padding (int, optional): Distance to extend each biopolymer region on both ends. Defaults to 0.
+			errorCallback (function, optional): Callback function for positions on unknown chromosomes.
+
+		Yields:
+			tuple: A tuple containing (label, extra, biopolymer_id, distance) for each matching biopolymer,
+			in input order and then by biopolymer_id; distance is 0 if the position falls within one
+			of the biopolymer's regions, or else the distance to the nearest region edge.
+
+		Raises:
+			Exception: If the positions on a chromosome are not sorted, or a chromosome appears again
+				after the positions on another chromosome.
+
+		Chromosomes may be given by number or name, such as 7, '7', 'X' or 'chrX'; positions on
+		any other chromosome are reported to errorCallback and skipped.
+
+		This is a sweep-line join: the biopolymer regions of each chromosome are read once, in posMin
+		order through the biopolymer_region__ldprofile_chr_min index, while the positions advance
+		alongside them.  Only the regions spanning the current position are held in memory, so the
+		cost is linear in the number of positions, regions and results.
+		"""
+		import heapq
+		
+		# positions=[ (label,chr,pos,extra), ... ]
+		# yield:[ (label,extra,biopolymer_id,distance), ... ]
+		ldprofileID = self.getLDProfileID(ldprofile or '')
+		if ldprofileID == None:
+			return
+		sql = """
+SELECT br.posMin, br.posMax, br.biopolymer_id
+FROM `db`.`biopolymer_region` AS br INDEXED BY `biopolymer_region__ldprofile_chr_min`
+WHERE br.ldprofile_id = ? AND br.chr = ?
 """
+		if typeID:
+			sql += "  AND br.biopolymer_id IN (SELECT biopolymer_id FROM `db`.`biopolymer` WHERE type_id = %d)\n" % typeID
+		sql += "ORDER BY br.posMin\n"
+		
+		with self._db:
+			curChm = curPos = None
+			doneChms = set()
+			pending = iter(())
+			nextRegion = None
+			active = list() # heap of (posMax,posMin,biopolymer_id) for regions which began at or before the position
+			for idx,position in enumerate(positions):
+				label,chm,pos,extra = position
+				chm = self._getChrNum(chm)
+				if chm not in self.chr_num:
+					if errorCallback:
+						errorCallback("\t".join(str(t or "") for t in position), "unknown chromosome at index %d" % (self._getInputIndex(idx + 1),))
+					continue
+				
+				# start a new sweep at the beginning of each chromosome; the previous chromosome's
+				# regions are gone by then, so its positions can't resume later
+				if chm != curChm:
+					if chm in doneChms:
+						raise Exception("ERROR: positions on chromosome %s are not grouped together at index %d" % (chm,self._getInputIndex(idx + 1)))
+					doneChms.add(curChm)
+					curChm = chm
+					pending = self._db.cursor().execute(sql, (ldprofileID, chm))
+					nextRegion = next(pending, None)
+					active = list()
+				elif pos < curPos:
+					raise Exception("ERROR: positions on chromosome %s are not sorted at index %d" % (chm,self._getInputIndex(idx + 1)))
+				curPos = pos
+				
+				# admit regions which now begin at or before the position,
+				# then retire those which end before it
+				while nextRegion and nextRegion[0] - padding <= pos:
+					heapq.heappush(active, (nextRegion[1], nextRegion[0], nextRegion[2]))
+					nextRegion = next(pending, None)
+				while active and active[0][0] + padding < pos:
+					heapq.heappop(active)
+				
+				matches = dict()
+				for posMax,posMin,biopolymerID in active:
+					distance = max(posMin - pos, pos - posMax, 0)
+					if distance < matches.get(biopolymerID, distance + 1):
+						matches[biopolymerID] = distance
+				for biopolymerID in sorted(matches):
+					yield (label, extra, biopolymerID, matches[biopolymerID])
+			#foreach position
+	#generateBiopolymersByPositions()
+	
+	
+	def _hasSNPBiopolymerPositions(self):
+		"""
+		Checks whether the snp_biopolymer_position table is available and built.
+
+		Returns:
+			bool: True if buildSNPBiopolymerPositions() has filled the table for the current database file.
+		"""
+		# files finalized before the table was added have it missing, or empty after a schema update
+		return self._hasDatabaseTable('snp_biopolymer_position') and (self.getDatabaseSetting('position_flank') != None)
+	#_hasSNPBiopolymerPositions()
+	
+	
+	def _generateSNPBiopolymerPositionRows(self, column, related, ids, ldprofile, maxDistance):
+		"""
+		Helper method to fetch SNP positions relative to biopolymers in one direction.
+
+		Args:
+			column (str): The snp_biopolymer_position column to match input IDs against.
+			related (str): The snp_biopolymer_position column to return.
+			ids (list): A list of tuples, where each tuple contains (id, extra).
+			ldprofile (str or None): The LD profile of the biopolymer regions, or None for the default profile.
+			maxDistance (int or None): The largest distance to return, or None for any within the flank.
+
+		Yields:
+			tuple: A tuple containing (id, extra, related_id, distance).
+
+		If the positions have not been computed (see buildSNPBiopolymerPositions), they are found
+		by joining snp_locus to biopolymer_region directly, with no flank unless maxDistance is given.
+		"""
+		ldprofileID = self.getLDProfileID(ldprofile or '')
+		if ldprofileID == None:
+			return
+		if self._hasSNPBiopolymerPositions():
+			sql = """
+SELECT i.id, i.extra, sbp.{1}, sbp.distance
+FROM {{batch}} AS i
+JOIN `db`.`snp_biopolymer_position` AS sbp
+  ON sbp.{0} = i.id
+  AND sbp.ldprofile_id = {2}
+""".format(column, related, int(ldprofileID))
+			if maxDistance != None:
+				sql += "  AND sbp.distance <= %d\n" % (maxDistance,)
+			sql += "ORDER BY i.idx, sbp.distance, sbp.{0}\n".format(related)
+		else:
+			distance = max(0, int(maxDistance or 0))
+			if column == 'rs':
+				size = self.getDatabaseSetting('zone_size',int)
+				if not size:
+					raise Exception("ERROR: could not determine database setting 'zone_size'")
+				sql = """
+SELECT i.id, i.extra, br.biopolymer_id, MIN(MAX(br.posMin - sl.pos, sl.pos - br.posMax, 0)) AS distance
+FROM {{batch}} AS i
+JOIN `db`.`snp_locus` AS sl
+  ON sl.rs = i.id
+JOIN `db`.`biopolymer_zone` AS bz
+  ON bz.chr = sl.chr
+  AND bz.zone BETWEEN MAX(0, sl.pos - {1}) / {2} AND (sl.pos + {1}) / {2}
+JOIN `db`.`biopolymer_region` AS br
+  ON br.biopolymer_id = bz.biopolymer_id
+  AND br.ldprofile_id = {0}
+  AND br.chr = sl.chr
+  AND br.posMin <= sl.pos + {1}
+  AND br.posMax >= sl.pos - {1}
+GROUP BY i.idx, br.biopolymer_id
+ORDER BY i.idx, distance, br.biopolymer_id
+""".format(int(ldprofileID), distance, int(size))
+			else:
+				sql = """
+SELECT i.id, i.extra, sl.rs, MIN(MAX(br.posMin - sl.pos, sl.pos - br.posMax, 0)) AS distance
+FROM {{batch}} AS i
+JOIN `db`.`biopolymer_region` AS br
+  ON br.biopolymer_id = i.id
+  AND br.ldprofile_id = {0}
+JOIN `db`.`snp_locus` AS sl
+  ON sl.chr = br.chr
+  AND sl.pos BETWEEN br.posMin - {1} AND br.posMax + {1}
+GROUP BY i.idx, sl.rs
+ORDER BY i.idx, distance, sl.rs
+""".format(int(ldprofileID), distance)
+		#if positions
 		
-		for row in self._db.cursor().execute(sql):
-			yield row
-	#generateBiopolymerNameStats()
+		with self._db:
+			for row in self._generateBatchQueryRows(sql, ('id','extra'), ids):
+				yield row
+	#_generateSNPBiopolymerPositionRows()
+	
+	
+	@_cachedQuery
+	def generateBiopolymersByRSes(self, rses, ldprofile=None, maxDistance=None):
+		"""
+		Retrieves the biopolymers which each SNP falls in or near, from the positions computed at finalization if available.
+
+		Args:
+			rses (list): A list of tuples, where each tuple contains (rs, extra).
+			ldprofile (str, optional): The LD profile of the biopolymer regions. Defaults to None,
+				which uses the default (no LD adjustment) profile.
+			maxDistance (int, optional): The largest distance to return. Defaults to None, for any
+				within the flank the database was finalized with.
+
+		Yields:
+			tuple: A tuple containing (rs, extra, biopolymer_id, distance) for each nearby biopolymer,
+			in input order and then by distance; distance is 0 for SNPs inside the biopolymer.
+		"""
+		# rses=[ (rs,extra), ... ]
+		# yield:[ (rs,extra,biopolymer_id,distance), ... ]
+		return self._generateSNPBiopolymerPositionRows('rs', 'biopolymer_id', rses, ldprofile, maxDistance)
+	#generateBiopolymersByRSes()
+	
+	
+	@_cachedQuery
+	def generateRSesByBiopolymerIDs(self, ids, ldprofile=None, maxDistance=None):
+		"""
+		Retrieves the SNPs which fall in or near each biopolymer, from the positions computed at finalization if available.
+
+		Args:
+			ids (list): A list of tuples, where each tuple contains (biopolymer_id, extra).
+			ldprofile (str, optional): The LD profile of the biopolymer regions. Defaults to None,
+				which uses the default (no LD adjustment) profile.
+			maxDistance (int, optional): The largest distance to return. Defaults to None, for any
+				within the flank the database was finalized with.
+
+		Yields:
+			tuple: A tuple containing (biopolymer_id, extra, rs, distance) for each nearby SNP,
+			in input order and then by distance; distance is 0 for SNPs inside the biopolymer.
+		"""
+		# ids=[ (id,extra), ... ]
+		# yield:[ (id,extra,rs,distance), ... ]
+		return self._generateSNPBiopolymerPositionRows('biopolymer_id', 'rs', ids, ldprofile, maxDistance)
+	#generateRSesByBiopolymerIDs()
 	
 	
 	##################################################
@@ -2309,8 +5841,16 @@ GROUP BY namespace_id
 		"""
 		# ids=[ (id,extra), ... ]
 		# yield:[ (id,extra,type_id,subtype_id,label,description), ... ]
-		sql = "SELECT group_id, ?2 AS extra, type_id, subtype_id, label, description FROM `db`.`group` WHERE group_id = ?1"
-		return self._db.cursor().executemany(sql, ids)
+		sql = """
+SELECT g.group_id, i.extra, g.type_id, g.subtype_id, g.label, g.description
+FROM {batch} AS i
+JOIN `db`.`group` AS g
+  ON g.group_id = i.id
+ORDER BY i.idx
+"""
+		with self._db:
+			for row in self._generateBatchQueryRows(sql, ('id','extra'), ids):
+				yield row
 	#generateGroupsByIDs()
 	
 	
@@ -2346,37 +5886,18 @@ GROUP BY namespace_id
 		# errorCallback=callable(input,error)
 		# yields (namespace,name,extra,id)
 		
-		sql = """
-SELECT i.namespace, i.identifier, i.extra, COALESCE(gID.group_id,gLabel.group_id,gName.group_id) AS group_id
-FROM (SELECT ?1 AS namespace, ?2 AS identifier, ?3 AS extra) AS i
-LEFT JOIN `db`.`group` AS gID
-  ON i.namespace = '='
-  AND gID.group_id = 1*i.identifier
-  AND ( ({0} IS NULL) OR (gID.type_id = {0}) )
-LEFT JOIN `db`.`group` AS gLabel
-  ON i.namespace = '-'
-  AND gLabel.label = i.identifier
-  AND ( ({0} IS NULL) OR (gLabel.type_id = {0}) )
-LEFT JOIN `db`.`namespace` AS n
-  ON i.namespace NOT IN ('=','-')
-  AND n.namespace = COALESCE(NULLIF(NULLIF(LOWER(TRIM(i.namespace)),''),'*'),n.namespace)
-LEFT JOIN `db`.`group_name` AS gn
-  ON i.namespace NOT IN ('=','-')
-  AND gn.name = i.identifier
-  AND gn.namespace_id = n.namespace_id
-LEFT JOIN `db`.`group` AS gName
-  ON i.namespace NOT IN ('=','-')
-  AND gName.group_id = gn.group_id
-  AND ( ({0} IS NULL) OR (gName.type_id = {0}) )
-""".format(int(typeID) if typeID else "NULL")
-		
 		minMatch = int(minMatch) if (minMatch != None) else 0
 		maxMatch = int(maxMatch) if (maxMatch != None) else None
-		tag = matches = None
-		n = numZero = numOne = numMany = 0
+		idx = tag = matches = None
+		numZero = numOne = numMany = 0
+		index = self.getGroupNameIndex()
 		with self._db:
-			for row in itertools.chain(self._db.cursor().executemany(sql, identifiers), [(None,None,None,None)]):
-				if tag != row[0:3]:
+			if index:
+				rows = self._generateNameIndexRows('group', index, typeID, identifiers)
+			else:
+				rows = self._generateIdentifierQueryRows('group', typeID, identifiers)
+			for row in itertools.chain(rows, [(None,None,None,None,None)]):
+				if idx != row[0]:
 					if tag:
 						if not matches:
 							numZero += 1
@@ -2389,12 +5910,12 @@ LEFT JOIN `db`.`group` AS gName
 							for match in (matches or [tag+(None,)]):
 								yield match
 						elif errorCallback:
-							errorCallback("\t".join((t or "") for t in tag), "%s match%s at index %d" % ((len(matches) or "no"),("" if len(matches) == 1 else "es"),n))
-					tag = row[0:3]
+							errorCallback("\t".join((t or "") for t in tag), "%s match%s at index %d" % ((len(matches) or "no"),("" if len(matches) == 1 else "es"),self._getInputIndex(idx)))
+					idx = row[0]
+					tag = row[1:4]
 					matches = set()
-					n += 1
-				if row[3]:
-					matches.add(row)
+				if row[4]:
+					matches.add(row[1:])
 			#foreach row
 		if tally != None:
 			tally['zero'] = numZero
@@ -2403,6 +5924,7 @@ LEFT JOIN `db`.`group` AS gName
 	#_lookupGroupIDs()
 	
 	
+	@_cachedQuery
 	def generateGroupIDsByIdentifiers(self, identifiers, minMatch=1, maxMatch=1, tally=None, errorCallback=None):
 		"""
 		Generate group IDs based on identifiers such as namespace and name.
@@ -2429,6 +5951,7 @@ LEFT JOIN `db`.`group` AS gName
 	#generateGroupIDsByIdentifiers()
 	
 	
+	@_cachedQuery
 	def generateTypedGroupIDsByIdentifiers(self, typeID, identifiers, minMatch=1, maxMatch=1, tally=None, errorCallback=None):
 		"""
 		Generate group IDs based on identifiers with a specific type.
@@ -2498,6 +6021,8 @@ WHERE
 GROUP BY g.group_id
 """
 		
+		if self._hasSearchIndex('group'):
+			return self._generateSearchRows('group', typeID, texts, sql)
 		return self._db.cursor().executemany(sql, texts)
 	#_searchGroupIDs()
 	
@@ -2542,6 +6067,52 @@ GROUP BY g.group_id
 	#generateTypedGroupIDsBySearch()
 	
 	
+	def generateGroupIDsByPrefix(self, prefix, namespace=None, limit=10):
+		"""
+		Retrieve group names and labels starting with a prefix, for autocompletion.
+
+		Parameters:
+		-----------
+		prefix : str
+			The prefix to complete, matched case-insensitively.
+		namespace : str or None, optional
+			Namespace to search; '-' for labels only, '' or '*' for any namespace but not labels,
+			or None for all names and labels (default is None).
+		limit : int, optional
+			Maximum number of results, or None for no limit (default is 10).
+
+		Returns:
+		--------
+		Generator object yielding (namespace, name, id) tuples, with namespace '-' for labels.
+		"""
+		return self._generateIDsByPrefix('group', None, prefix, namespace, limit)
+	#generateGroupIDsByPrefix()
+	
+	
+	def generateTypedGroupIDsByPrefix(self, typeID, prefix, namespace=None, limit=10):
+		"""
+		Retrieve group names and labels starting with a prefix, for autocompletion, with a specific type.
+
+		Parameters:
+		-----------
+		typeID : int or None
+			Specific type ID for filtering.
+		prefix : str
+			The prefix to complete, matched case-insensitively.
+		namespace : str or None, optional
+			Namespace to search; '-' for labels only, '' or '*' for any namespace but not labels,
+			or None for all names and labels (default is None).
+		limit : int, optional
+			Maximum number of results, or None for no limit (default is 10).
+
+		Returns:
+		--------
+		Generator object yielding (namespace, name, id) tuples, with namespace '-' for labels.
+		"""
+		return self._generateIDsByPrefix('group', typeID, prefix, namespace, limit)
+	#generateTypedGroupIDsByPrefix()
+	
+	
 	def generateGroupNameStats(self, namespaceID=None, typeID=None):
 		"""
 		Generate statistics on group names.
@@ -2558,38 +6129,413 @@ GROUP BY g.group_id
 		Tuples containing statistics on group names:
 			(namespace, names, unique, ambiguous)
 		"""
+		return self._generateNameStatsRows('group', namespaceID, typeID)
+	#generateGroupNameStats()
+	
+	
+	def _getGroupContainmentEdges(self, ancestors=False):
+		"""
+		Helper method to load the group containment relationships.
+
+		Parameters:
+		-----------
+		ancestors : bool, optional
+			If True, map each group to the groups containing it instead (default is False).
+
+		Returns:
+		--------
+		A dictionary mapping each group_id to a list of (related_group_id, relationship_id) tuples.
+		"""
+		edges = collections.defaultdict(list)
+		for row in self._db.cursor().execute("SELECT group_id, related_group_id, relationship_id FROM `db`.`group_group` WHERE contains > 0"):
+			if ancestors:
+				edges[row[1]].append((row[0],row[2]))
+			else:
+				edges[row[0]].append((row[1],row[2]))
+		return edges
+	#_getGroupContainmentEdges()
+	
+	
+	def _generateGroupClosure(self, edges, groupIDs=None):
+		"""
+		Helper method to walk the group hierarchy breadth-first.
+
+		Parameters:
+		-----------
+		edges : dict
+			The containment relationships, as returned by _getGroupContainmentEdges().
+		groupIDs : iterable of int, optional
+			The groups to start from (default is None, for every group with relationships).
+
+		Yields:
+		-------
+		Tuples containing (group_id, descendant_id, relationship_id, depth), like rows of group_closure;
+		relationship_id is 0 for paths which mix relationships.
+		"""
+		for startID in (groupIDs if (groupIDs != None) else list(edges)):
+			seen = set()
+			depth = 0
+			frontier = [ (startID,None) ]
+			while frontier:
+				depth += 1
+				nextFrontier = list()
+				for groupID,pathRel in frontier:
+					for relatedID,rel in edges.get(groupID, ()):
+						rel = rel if (pathRel == None or pathRel == rel) else 0
+						if relatedID != startID and (relatedID,rel) not in seen:
+							seen.add((relatedID,rel))
+							nextFrontier.append((relatedID,rel))
+							yield (startID,relatedID,rel,depth)
+				frontier = nextFrontier
+	#_generateGroupClosure()
+	
+	
+	def _hasGroupClosure(self):
+		"""
+		Checks whether the group_closure table is available and built.
+
+		Returns:
+		--------
+		True if group_closure has rows or there are no containment relationships for it to hold.
+		"""
+		if not self._hasDatabaseTable('group_closure'): # databases from before the table was added
+			return False
+		cursor = self._db.cursor()
+		if max(row[0] for row in cursor.execute("SELECT EXISTS (SELECT 1 FROM `db`.`group_closure`)")):
+			return True
+		return not max(row[0] for row in cursor.execute("SELECT EXISTS (SELECT 1 FROM `db`.`group_group` WHERE contains > 0)"))
+	#_hasGroupClosure()
+	
+	
+	def _generateGroupClosureQueryRows(self, sql, ids, ancestors=False):
+		"""
+		Helper method to run a query against the group hierarchy closure once per batch of group IDs.
+
+		Parameters:
+		-----------
+		sql : str
+			The query, with '{batch}' in place of the batch table name and '{closure}' in place of the closure table name.
+		ids : list of tuples
+			Each tuple contains (group_id, extra).
+		ancestors : bool, optional
+			If True, the query looks up input IDs as descendants rather than as containing groups (default is False).
+
+		Yields:
+		-------
+		Each result row of the query, for each batch in turn.
+
+		If group_closure has not been built, as in databases which were finalized before it was
+		added, each batch's part of the closure is walked live from group_group into a temporary
+		table instead.
+		"""
+		if self._hasGroupClosure():
+			for row in self._generateBatchQueryRows(sql.format(batch='{batch}', closure='`db`.`group_closure`'), ('id','extra'), ids):
+				yield row
+			return
+		
+		edges = self._getGroupContainmentEdges()
+		parents = self._getGroupContainmentEdges(True) if ancestors else None
+		self._batchCount += 1
+		tblName = "_group_closure_%d" % self._batchCount
+		cursor = self._db.cursor()
+		with self._temporaryWrites():
+			cursor.execute("CREATE TEMP TABLE `temp`.`%s` (group_id INTEGER NOT NULL, descendant_id INTEGER NOT NULL, relationship_id INTEGER NOT NULL, depth INTEGER NOT NULL)" % (tblName,))
+			cursor.execute("CREATE INDEX `temp`.`%s__group` ON `%s` (group_id,descendant_id)" % (tblName,tblName))
+			cursor.execute("CREATE INDEX `temp`.`%s__descendant` ON `%s` (descendant_id,group_id)" % (tblName,tblName))
+		queryCursor = self._db.cursor()
+		batches = self._generateInputBatches(('id','extra'), ids)
+		try:
+			for batch in batches:
+				# match inputs to groups the same way the query does
+				groupIDs = set(row[0] for row in cursor.execute("SELECT DISTINCT g.group_id FROM %s AS i JOIN `db`.`group` AS g ON g.group_id = i.id" % (batch,)))
+				if ancestors:
+					# walk down from every ancestor, so paths are the same as in group_closure
+					ancestorIDs = set()
+					frontier = groupIDs
+					while frontier:
+						frontier = set(parentID for groupID in frontier for parentID,rel in parents.get(groupID, ())) - ancestorIDs
+						ancestorIDs |= frontier
+					rows = (row for row in self._generateGroupClosure(edges, ancestorIDs) if row[1] in groupIDs)
+				else:
+					rows = self._generateGroupClosure(edges, groupIDs)
+				with self._temporaryWrites():
+					cursor.execute("DELETE FROM `temp`.`%s`" % (tblName,))
+					cursor.executemany("INSERT INTO `temp`.`%s` VALUES (?,?,?,?)" % (tblName,), rows)
+				for row in queryCursor.execute(sql.format(batch=batch, closure="`temp`.`%s`" % (tblName,))):
+					yield row
+		finally:
+			queryCursor.close()
+			batches.close()
+			with self._temporaryWrites():
+				cursor.execute("DROP TABLE IF EXISTS `temp`.`%s`" % (tblName,))
+	#_generateGroupClosureQueryRows()
+	
+	
+	def _generateGroupClosureRows(self, column, related, ids, relationshipIDs, maxDepth):
+		"""
+		Helper method to walk the precomputed group hierarchy in one direction.
+
+		Parameters:
+		-----------
+		column : str
+			The group_closure column to match input IDs against.
+		related : str
+			The group_closure column to return.
+		ids : list of tuples
+			Each tuple contains (group_id, extra).
+		relationshipIDs : list of int or None
+			Relationship IDs whose paths to follow, or None for paths of any relationships.
+		maxDepth : int or None
+			Maximum path length, or None for no limit.
+
+		Yields:
+		-------
+		Tuples containing (group_id, extra, related_group_id, depth).
+		"""
 		sql = """
-SELECT
-  `namespace`,
-  COUNT() AS `names`,
-  SUM(CASE WHEN matches = 1 THEN 1 ELSE 0 END) AS `unique`,
-  SUM(CASE WHEN matches > 1 THEN 1 ELSE 0 END) AS `ambiguous`
-FROM (
-  SELECT gn.namespace_id, gn.name, COUNT(DISTINCT gn.group_id) AS matches
-  FROM `db`.`group_name` AS gn
-"""
+SELECT i.idx, i.id, i.extra, gc.{1}, MIN(gc.depth) AS depth
+FROM {{batch}} AS i
+JOIN {{closure}} AS gc
+  ON gc.{0} = i.id
+""".format(column, related)
 		
-		if typeID:
+		if relationshipIDs:
 			sql += """
-  JOIN `db`.`group` AS g
-    ON g.group_id = gn.group_id AND g.type_id = %d
-""" % typeID
+  AND gc.relationship_id IN (%s)
+""" % (",".join(str(int(r)) for r in relationshipIDs),)
+		#if relationshipIDs
 		
-		if namespaceID:
+		if maxDepth:
 			sql += """
-  WHERE gn.namespace_id = %d
-""" % namespaceID
+  AND gc.depth <= %d
+""" % (int(maxDepth),)
+		#if maxDepth
 		
 		sql += """
-  GROUP BY gn.namespace_id, gn.name
-)
-JOIN `db`.`namespace` AS n USING (namespace_id)
-GROUP BY namespace_id
-"""
+GROUP BY i.idx, gc.{0}
+ORDER BY i.idx, depth, gc.{0}
+""".format(related)
 		
-		for row in self._db.cursor().execute(sql):
-			yield row
-	#generateGroupNameStats()
+		with self._db:
+			for row in self._generateGroupClosureQueryRows(sql, ids, (column == 'descendant_id')):
+				yield row[1:]
+	#_generateGroupClosureRows()
+	
+	
+	def generateGroupDescendantsByIDs(self, ids, relationshipIDs=None, maxDepth=None):
+		"""
+		Retrieve all groups contained within the given groups, at any depth.
+
+		Parameters:
+		-----------
+		ids : list of tuples
+			Each tuple contains (group_id, extra).
+		relationshipIDs : list of int, optional
+			Relationship IDs whose paths to follow; 0 selects paths mixing relationships (default is None, for any).
+		maxDepth : int, optional
+			Maximum number of levels to descend (default is None, for no limit).
+
+		Yields:
+		-------
+		Tuples containing (group_id, extra, descendant_id, depth), ordered by depth for each input group.
+		"""
+		# ids=[ (id,extra), ... ]
+		# yield:[ (id,extra,descendant_id,depth), ... ]
+		return self._generateGroupClosureRows('group_id', 'descendant_id', ids, relationshipIDs, maxDepth)
+	#generateGroupDescendantsByIDs()
+	
+	
+	def generateGroupAncestorsByIDs(self, ids, relationshipIDs=None, maxDepth=None):
+		"""
+		Retrieve all groups which contain the given groups, at any depth.
+
+		Parameters:
+		-----------
+		ids : list of tuples
+			Each tuple contains (group_id, extra).
+		relationshipIDs : list of int, optional
+			Relationship IDs whose paths to follow; 0 selects paths mixing relationships (default is None, for any).
+		maxDepth : int, optional
+			Maximum number of levels to ascend (default is None, for no limit).
+
+		Yields:
+		-------
+		Tuples containing (group_id, extra, ancestor_id, depth), ordered by depth for each input group.
+		"""
+		# ids=[ (id,extra), ... ]
+		# yield:[ (id,extra,ancestor_id,depth), ... ]
+		return self._generateGroupClosureRows('descendant_id', 'group_id', ids, relationshipIDs, maxDepth)
+	#generateGroupAncestorsByIDs()
+	
+	
+	def generateInheritedBiopolymerIDsByGroupIDs(self, ids, relationshipIDs=None):
+		"""
+		Retrieve the biopolymers assigned to the given groups or to any group they contain.
+
+		Parameters:
+		-----------
+		ids : list of tuples
+			Each tuple contains (group_id, extra).
+		relationshipIDs : list of int, optional
+			Relationship IDs whose paths to follow; 0 selects paths mixing relationships (default is None, for any).
+
+		Yields:
+		-------
+		Tuples containing (group_id, extra, biopolymer_id), ordered by biopolymer_id for each input group.
+		"""
+		# ids=[ (id,extra), ... ]
+		# yield:[ (id,extra,biopolymer_id), ... ]
+		sql = """
+SELECT i.idx, i.id, i.extra, gb.biopolymer_id
+FROM {{batch}} AS i
+JOIN (
+  SELECT i.idx, i.id AS group_id
+  FROM {{batch}} AS i
+  UNION
+  SELECT i.idx, gc.descendant_id
+  FROM {{batch}} AS i
+  JOIN {{closure}} AS gc
+    ON gc.group_id = i.id{0}
+) AS m
+  ON m.idx = i.idx
+JOIN `db`.`group_biopolymer` AS gb
+  ON gb.group_id = m.group_id
+  AND gb.biopolymer_id > 0
+GROUP BY i.idx, gb.biopolymer_id
+ORDER BY i.idx, gb.biopolymer_id
+""".format(
+			("\n    AND gc.relationship_id IN (%s)" % (",".join(str(int(r)) for r in relationshipIDs),)) if relationshipIDs else ""
+		)
+		with self._db:
+			for row in self._generateGroupClosureQueryRows(sql, ids):
+				yield row[1:]
+	#generateInheritedBiopolymerIDsByGroupIDs()
+	
+	
+	def _generateGroupBiopolymerRows(self, column, related, ids, minSpecificity, minImplication, minQuality, filters, sourceIDs=None):
+		"""
+		Helper method to fetch scored group memberships in one direction.
+
+		Parameters:
+		-----------
+		column : str
+			The group_biopolymer column to match input IDs against.
+		related : str
+			The group_biopolymer column to return.
+		ids : list of tuples
+			Each tuple contains (id, extra).
+		minSpecificity, minImplication, minQuality : int or None
+			Minimum scores (0-100) which a single source record of each returned membership must all meet.
+		filters : str
+			Additional SQL conditions joining the related table as `r`, or an empty string.
+		sourceIDs : list of int, optional
+			Source IDs of the membership records to consider (default is None, for any).
+
+		Yields:
+		-------
+		Tuples containing (id, extra, related_id, specificity, implication, quality).
+		"""
+		sql = """
+SELECT i.idx, i.id, i.extra, gb.{1}, MAX(gb.specificity), MAX(gb.implication), MAX(gb.quality)
+FROM {{batch}} AS i
+JOIN `db`.`group_biopolymer` AS gb
+  ON gb.{0} = i.id
+  AND gb.biopolymer_id > 0
+  AND gb.specificity >= {2}
+  AND gb.implication >= {3}
+  AND gb.quality >= {4}
+""".format(column, related, int(minSpecificity or 0), int(minImplication or 0), int(minQuality or 0))
+		
+		if sourceIDs:
+			sql += "  AND gb.source_id IN (%s)\n" % (",".join(str(int(s)) for s in sourceIDs),)
+		if filters:
+			sql += filters
+		
+		sql += """
+GROUP BY i.idx, gb.{0}
+ORDER BY i.idx, gb.{0}
+""".format(related)
+		
+		with self._db:
+			for row in self._generateBatchQueryRows(sql, ('id','extra'), ids):
+				yield row[1:]
+	#_generateGroupBiopolymerRows()
+	
+	
+	def generateGroupsByBiopolymerIDs(self, ids, minSpecificity=0, minImplication=0, minQuality=0, typeIDs=None, sourceIDs=None):
+		"""
+		Retrieve the groups of many biopolymers at once, filtered by membership scores.
+
+		Parameters:
+		-----------
+		ids : list of tuples
+			Each tuple contains (biopolymer_id, extra).
+		minSpecificity : int, optional
+			Minimum specificity score, 0-100 (default is 0).
+		minImplication : int, optional
+			Minimum implication score, 0-100 (default is 0).
+		minQuality : int, optional
+			Minimum quality score, 0-100 (default is 0).
+		typeIDs : list of int, optional
+			Group type IDs to include (default is None, for any).
+		sourceIDs : list of int, optional
+			Source IDs of the membership records to consider (default is None, for any).
+
+		Yields:
+		-------
+		Tuples containing (biopolymer_id, extra, group_id, specificity, implication, quality),
+		ordered by group_id for each input biopolymer.
+		"""
+		# ids=[ (id,extra), ... ]
+		# yield:[ (id,extra,group_id,specificity,implication,quality), ... ]
+		filters = ""
+		if typeIDs:
+			filters = """
+JOIN `db`.`group` AS r
+  ON r.group_id = gb.group_id
+  AND r.type_id IN (%s)
+""" % (",".join(str(int(t)) for t in typeIDs),)
+		#if typeIDs
+		return self._generateGroupBiopolymerRows('biopolymer_id', 'group_id', ids, minSpecificity, minImplication, minQuality, filters, sourceIDs)
+	#generateGroupsByBiopolymerIDs()
+	
+	
+	def generateBiopolymersByGroupIDs(self, ids, minSpecificity=0, minImplication=0, minQuality=0, typeIDs=None, sourceIDs=None):
+		"""
+		Retrieve the member biopolymers of many groups at once, filtered by membership scores.
+
+		Parameters:
+		-----------
+		ids : list of tuples
+			Each tuple contains (group_id, extra).
+		minSpecificity : int, optional
+			Minimum specificity score, 0-100 (default is 0).
+		minImplication : int, optional
+			Minimum implication score, 0-100 (default is 0).
+		minQuality : int, optional
+			Minimum quality score, 0-100 (default is 0).
+		typeIDs : list of int, optional
+			Biopolymer type IDs to include (default is None, for any).
+		sourceIDs : list of int, optional
+			Source IDs of the membership records to consider (default is None, for any).
+
+		Yields:
+		-------
+		Tuples containing (group_id, extra, biopolymer_id, specificity, implication, quality),
+		ordered by biopolymer_id for each input group.
+		"""
+		# ids=[ (id,extra), ... ]
+		# yield:[ (id,extra,biopolymer_id,specificity,implication,quality), ... ]
+		filters = ""
+		if typeIDs:
+			filters = """
+JOIN `db`.`biopolymer` AS r
+  ON r.biopolymer_id = gb.biopolymer_id
+  AND r.type_id IN (%s)
+""" % (",".join(str(int(t)) for t in typeIDs),)
+		#if typeIDs
+		return self._generateGroupBiopolymerRows('group_id', 'biopolymer_id', ids, minSpecificity, minImplication, minQuality, filters, sourceIDs)
+	#generateBiopolymersByGroupIDs()
 	
 	
 	##################################################
@@ -2621,6 +6567,61 @@ GROUP BY namespace_id
 	#hasLiftOverChains()
 	
 	
+	def _getLiftOverChains(self, oldHG, newHG):
+		"""
+		Retrieve the liftOver chains between old and new genome assemblies, loading them on first use.
+
+		Parameters:
+		-----------
+		oldHG : int
+			Old genome assembly identifier.
+		newHG : int
+			New genome assembly identifier.
+
+		Returns:
+		--------
+		dict
+			{'data': {chr: {chain: [(old_start, old_end, new_start), ...]}}, 'keys': {chr: [chain, ...]}},
+			with each chromosome's chains ordered by descending score, where each chain is
+			(score, old_start, old_end, new_start, is_fwd, new_chr, chain_id).
+		"""
+		conv = (oldHG,newHG)
+		if conv in self._liftOverCache:
+			return self._liftOverCache[conv]
+		
+		chains = {'data':{}, 'keys':{}}
+		sql = """
+SELECT chain_id,
+  c.old_chr, c.score, c.old_start, c.old_end, c.new_start, c.is_fwd, c.new_chr,
+  cd.old_start, cd.old_end, cd.new_start
+FROM `db`.`chain` AS c
+JOIN `db`.`chain_data` AS cd USING (chain_id)
+WHERE c.old_ucschg=? AND c.new_ucschg=?
+ORDER BY c.old_chr, score DESC, cd.old_start
+"""
+		for row in self._db.cursor().execute(sql, conv):
+			chain = (row[2], row[3], row[4], row[5], row[6], row[7], row[0])
+			chr = row[1]
+			
+			if chr not in chains['data']:
+				chains['data'][chr] = {chain: []}
+				chains['keys'][chr] = [chain]
+			elif chain not in chains['data'][chr]:
+				chains['data'][chr][chain] = []
+				chains['keys'][chr].append(chain)
+			
+			chains['data'][chr][chain].append( (row[8],row[9],row[10]) )
+		#foreach row
+		
+		# Sort the chains by score
+		for k in chains['keys']:
+			chains['keys'][k].sort(reverse=True)
+		
+		self._liftOverCache[conv] = chains
+		return chains
+	#_getLiftOverChains()
+	
+	
 	def _generateApplicableLiftOverChains(self, oldHG, newHG, chrom, start, end):
 		"""
 		Generate applicable liftOver chains for a specific region.
@@ -2643,41 +6644,7 @@ GROUP BY namespace_id
 		Tuples containing liftOver chain information for the given region.
 			(chain_id, old_chr, score, old_start, old_end, new_start, is_fwd, new_chr, old_start, old_end, new_start)
 		"""
-		conv = (oldHG,newHG)
-		if conv in self._liftOverCache:
-			chains = self._liftOverCache[conv]
-		else:
-			chains = {'data':{}, 'keys':{}}
-			sql = """
-SELECT chain_id,
-  c.old_chr, c.score, c.old_start, c.old_end, c.new_start, c.is_fwd, c.new_chr,
-  cd.old_start, cd.old_end, cd.new_start
-FROM `db`.`chain` AS c
-JOIN `db`.`chain_data` AS cd USING (chain_id)
-WHERE c.old_ucschg=? AND c.new_ucschg=?
-ORDER BY c.old_chr, score DESC, cd.old_start
-"""
-			for row in self._db.cursor().execute(sql, conv):
-				chain = (row[2], row[3], row[4], row[5], row[6], row[7], row[0])
-				chr = row[1]
-				
-				if chr not in chains['data']:
-					chains['data'][chr] = {chain: []}
-					chains['keys'][chr] = [chain]
-				elif chain not in chains['data'][chr]:
-					chains['data'][chr][chain] = []
-					chains['keys'][chr].append(chain)
-				
-				chains['data'][chr][chain].append( (row[8],row[9],row[10]) )
-			#foreach row
-			
-			# Sort the chains by score
-			for k in chains['keys']:
-				chains['keys'][k].sort(reverse=True)
-			
-			self._liftOverCache[conv] = chains
-		#if chains are cached
-		
+		chains = self._getLiftOverChains(oldHG, newHG)
 		for c in chains['keys'].get(chrom, []):
 			# if the region overlaps the chain... (1-based, closed intervals)
 			if start <= c[2] and end >= c[1]:
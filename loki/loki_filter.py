@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+
+import itertools
+
+
+class BloomFilter(object):
+	"""
+	A Bloom filter over signed 64-bit integer keys, for ruling out lookups which cannot match.
+
+	The filter is a bit array in which every key sets a few bits chosen by hashing it.  A key
+	whose bits are not all set was certainly never added, while an absent key whose bits all
+	happen to be set is reported as possibly present; at the default density of 10 bits per
+	key that happens for about 1% of absent keys.
+
+	NumPy is required.
+	"""
+	
+	
+	##################################################
+	# private class data
+	
+	
+	_numHashes = 7
+	
+	
+	##################################################
+	# class interrogation
+	
+	
+	@classmethod
+	def build(cls, keys, length, bitsPerKey=10, chunkSize=1000000):
+		"""
+		Creates a filter holding the given keys.
+
+		Args:
+			keys (iterable): The integer keys.
+			length (int): The (approximate) number of keys, used to size the filter.
+			bitsPerKey (int, optional): The number of bits per key. Defaults to 10.
+			chunkSize (int, optional): The number of keys to hash at a time. Defaults to 1000000.
+
+		Returns:
+			BloomFilter: The new filter.
+		"""
+		import numpy
+		
+		numWords = max(1, (length * bitsPerKey + 63) // 64)
+		bloom = cls(numpy.zeros(numWords, dtype='<u8'))
+		keys = iter(keys)
+		while True:
+			chunk = numpy.fromiter(itertools.islice(keys, chunkSize), dtype='<i8')
+			if not len(chunk):
+				break
+			bloom.add(chunk)
+		return bloom
+	#build()
+	
+	
+	##################################################
+	# constructor
+	
+	
+	def __init__(self, bits):
+		"""
+		Wraps an existing bit array.
+
+		Args:
+			bits (numpy.ndarray): The filter bits, as unsigned 64-bit words; read-only unless keys will be added.
+		"""
+		self._bits = bits
+	#__init__()
+	
+	
+	##################################################
+	# filter data
+	
+	
+	def getBits(self):
+		"""
+		Returns:
+			numpy.ndarray: The filter bits, as unsigned 64-bit words.
+		"""
+		return self._bits
+	#getBits()
+	
+	
+	def _getPositions(self, keys):
+		"""
+		Hashes keys to the positions of their bits.
+
+		Args:
+			keys (numpy.ndarray): The signed 64-bit keys.
+
+		Returns:
+			list: One tuple of (word indexes, bit masks) per hash function.
+		"""
+		import numpy
+		
+		# splitmix64 finalizer, then double hashing to derive each position
+		z = numpy.asarray(keys, dtype='<i8').view('<u8') + numpy.uint64(0x9E3779B97F4A7C15)
+		z = (z ^ (z >> numpy.uint64(30))) * numpy.uint64(0xBF58476D1CE4E5B9)
+		z = (z ^ (z >> numpy.uint64(27))) * numpy.uint64(0x94D049BB133111EB)
+		z = z ^ (z >> numpy.uint64(31))
+		h1 = z & numpy.uint64(0xFFFFFFFF)
+		h2 = (z >> numpy.uint64(32)) | numpy.uint64(1)
+		numBits = numpy.uint64(len(self._bits) * 64)
+		positions = list()
+		for i in range(self._numHashes):
+			p = (h1 + numpy.uint64(i) * h2) % numBits
+			positions.append( (p >> numpy.uint64(6), numpy.uint64(1) << (p & numpy.uint64(63))) )
+		return positions
+	#_getPositions()
+	
+	
+	def add(self, keys):
+		"""
+		Adds keys to the filter.
+
+		Args:
+			keys (numpy.ndarray): The signed 64-bit keys.
+		"""
+		import numpy
+		
+		for words,masks in self._getPositions(keys):
+			numpy.bitwise_or.at(self._bits, words, masks)
+	#add()
+	
+	
+	def contains(self, keys):
+		"""
+		Tests keys for possible membership.
+
+		Args:
+			keys (numpy.ndarray): The signed 64-bit keys.
+
+		Returns:
+			numpy.ndarray: A boolean array which is False for every key that was certainly never added.
+		"""
+		import numpy
+		
+		found = numpy.ones(len(keys), dtype=bool)
+		for words,masks in self._getPositions(keys):
+			found &= (self._bits[words] & masks) != 0
+		return found
+	#contains()
+
+
+#BloomFilter
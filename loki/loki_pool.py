@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+
+import contextlib
+import os
+import queue
+import threading
+
+import loki.loki_db as loki_db
+
+
+##################################################
+# sharded execution workers
+
+
+_shardDatabase = None
+
+
+def _initShardWorker(dbFile):
+	"""
+	Opens the knowledge database file in a worker process of Database.generateSharded() or exportTables().
+
+	Args:
+		dbFile (str): The knowledge database file.
+	"""
+	global _shardDatabase
+	_shardDatabase = loki_db.Database(readonly=True)
+	_shardDatabase.setVerbose(False)
+	_shardDatabase.attachDatabaseFile(dbFile, quiet=True)
+	if not _shardDatabase._dbFile:
+		raise Exception("ERROR: could not load knowledge database file '%s'" % (dbFile,))
+#_initShardWorker()
+
+
+def _runShard(method, inputs, kwargs, indices):
+	"""
+	Runs one chunk of a sharded lookup in a worker process.
+
+	Args:
+		method (str): The name of the Database generator method.
+		inputs (list): The chunk of input tuples.
+		kwargs (dict): Keyword arguments for the method; 'tally' and 'errorCallback' are
+			replaced with local collectors if present.
+		indices (int or list): The number of inputs before the chunk in the whole input sequence,
+			if the chunk is a consecutive run of it, or else the 1-based position of each input.
+
+	Returns:
+		tuple: The list of result rows, the tally counts, and the list of (input, error) pairs.
+		If the positions are given as a list, each result row is returned as (position, row)
+		and each error as (position, input, error).
+	"""
+	kwargs = dict(kwargs)
+	counts = dict()
+	errors = list()
+	if kwargs.get('tally'):
+		kwargs['tally'] = counts
+	if kwargs.get('errorCallback'):
+		kwargs['errorCallback'] = lambda line, err: errors.append((line, err))
+	_shardDatabase._inputIndices = indices
+	try:
+		if isinstance(indices, int):
+			rows = list(getattr(_shardDatabase, method)(inputs, **kwargs))
+			return (rows, counts, errors)
+		
+		# each input's extra value is swapped for a marker, so results and errors can be traced
+		# back to their inputs and then given the original extra value again
+		markers = dict()
+		marked = list()
+		for n,row in enumerate(inputs):
+			marker = "\x1e%d\x1e" % (n,)
+			markers[marker] = (indices[n], row[-1])
+			marked.append(tuple(row[:-1]) + (marker,))
+		rows = list()
+		for row in getattr(_shardDatabase, method)(marked, **kwargs):
+			for col,value in enumerate(row):
+				if isinstance(value, str) and value in markers:
+					idx,extra = markers[value]
+					rows.append( (idx, row[:col] + (extra,) + row[col+1:]) )
+					break
+			else:
+				raise Exception("ERROR: results of '%s' can't be partitioned since they don't include the inputs' extra values" % (method,))
+		located = list()
+		for line,err in errors:
+			fields = line.split("\t")
+			for col,value in enumerate(fields):
+				if value in markers:
+					idx,extra = markers[value]
+					fields[col] = str(extra or "")
+					break
+			else:
+				idx = indices[0]
+			located.append( (idx, "\t".join(fields), err) )
+		return (rows, counts, located)
+	finally:
+		_shardDatabase._inputIndices = None
+#_runShard()
+
+
+def _runExport(table, path):
+	"""
+	Exports one knowledge table in a worker process of Database.exportTables().
+
+	Args:
+		table (str): The name of the table.
+		path (str): The output directory.
+
+	Returns:
+		int: The number of rows exported.
+	"""
+	return _shardDatabase.exportTable(table, path).getLength()
+#_runExport()
+
+
+class DatabasePool(object):
+	"""
+	A pool of independent connections to one knowledge database file, for concurrent readers.
+
+	Each pooled connection is a complete loki_db.Database with its own SQLite connection, so
+	lookups running in different threads neither serialize on one connection nor share
+	cursors.  Connections are opened read-only on demand, up to the pool size, and handed
+	out to one thread or task at a time.
+	"""
+	
+	
+	##################################################
+	# constructor
+	
+	
+	def __init__(self, dbFile, size=None, tempMem=False):
+		"""
+		Initializes a pool for the given knowledge database file.
+
+		Args:
+			dbFile (str): The knowledge database file.
+			size (int, optional): The maximum number of connections. Defaults to the number of CPUs.
+			tempMem (bool, optional): If True, each connection keeps its temporary storage in memory. Defaults to False.
+		"""
+		self._dbFile = dbFile
+		self._size = size or os.cpu_count() or 4
+		self._tempMem = tempMem
+		self._lock = threading.Lock()
+		self._idle = queue.LifoQueue() # most recently used first, to keep caches warm
+		self._numOpen = 0
+		self._closed = False
+	#__init__()
+	
+	
+	##################################################
+	# context manager
+	
+	
+	def __enter__(self):
+		return self
+	#__enter__()
+	
+	
+	def __exit__(self, excType, excVal, traceback):
+		self.close()
+		return False
+	#__exit__()
+	
+	
+	##################################################
+	# pool management
+	
+	
+	def getSize(self):
+		"""
+		Returns:
+			int: The maximum number of connections.
+		"""
+		return self._size
+	#getSize()
+	
+	
+	def _openDatabase(self):
+		"""
+		Opens a new connection to the knowledge database file.
+
+		Returns:
+			Database: The new connection.
+
+		Raises:
+			Exception: If the knowledge database file could not be loaded.
+		"""
+		db = loki_db.Database(tempMem=self._tempMem, readonly=True)
+		db.setVerbose(False)
+		db.attachDatabaseFile(self._dbFile, quiet=True)
+		if not db._dbFile:
+			raise Exception("ERROR: could not load knowledge database file '%s'" % (self._dbFile,))
+		return db
+	#_openDatabase()
+	
+	
+	def acquire(self, timeout=None):
+		"""
+		Takes a connection out of the pool, opening a new one if none is idle and the pool is not full.
+
+		Args:
+			timeout (float, optional): Seconds to wait for a connection to become idle. Defaults to None, to wait indefinitely.
+
+		Returns:
+			Database: A connection for the exclusive use of the caller until it is released.
+
+		Raises:
+			Exception: If the pool has been closed.
+			queue.Empty: If no connection became idle within the timeout.
+		"""
+		if self._closed:
+			raise Exception("ERROR: database pool is closed")
+		try:
+			return self._idle.get_nowait()
+		except queue.Empty:
+			pass
+		with self._lock:
+			if self._numOpen < self._size:
+				db = self._openDatabase()
+				self._numOpen += 1
+				return db
+		return self._idle.get(timeout=timeout)
+	#acquire()
+	
+	
+	def release(self, db):
+		"""
+		Returns a connection to the pool.
+
+		Args:
+			db (Database): A connection obtained from acquire().
+		"""
+		if self._closed:
+			db.close()
+		else:
+			self._idle.put(db)
+	#release()
+	
+	
+	@contextlib.contextmanager
+	def connection(self, timeout=None):
+		"""
+		Holds a pooled connection for the duration of a with-block.
+
+		Args:
+			timeout (float, optional): Seconds to wait for a connection to become idle. Defaults to None, to wait indefinitely.
+
+		Yields:
+			Database: The connection.
+		"""
+		db = self.acquire(timeout)
+		try:
+			yield db
+		finally:
+			self.release(db)
+	#connection()
+	
+	
+	def close(self):
+		"""
+		Closes the pool and all idle connections.
+
+		Connections still in use are closed when they are released.
+		"""
+		with self._lock:
+			self._closed = True
+			while True:
+				try:
+					db = self._idle.get_nowait()
+				except queue.Empty:
+					break
+				db.close()
+	#close()
+	
+	
+	##################################################
+	# pooled queries
+	
+	
+	def call(self, method, *args, **kwargs):
+		"""
+		Calls a Database method on a pooled connection.
+
+		Args:
+			method (str): The name of the Database method, such as 'getTypeID'.
+			*args, **kwargs: The method's arguments.
+
+		Returns:
+			The method's result.
+
+		Use generate() for methods which return generators or cursors, since the connection is
+		released as soon as the method returns.
+		"""
+		with self.connection() as db:
+			return getattr(db, method)(*args, **kwargs)
+	#call()
+	
+	
+	def generate(self, method, *args, **kwargs):
+		"""
+		Runs a Database generator method on a pooled connection.
+
+		Args:
+			method (str): The name of the Database method, such as 'generateSNPLociByRSes'.
+			*args, **kwargs: The method's arguments.
+
+		Yields:
+			The method's results.
+
+		The connection is taken when iteration starts and is held until the results are
+		exhausted or the generator is closed, so each generator is bound to its own connection.
+		"""
+		with self.connection() as db:
+			for row in getattr(db, method)(*args, **kwargs):
+				yield row
+	#generate()
+
+
+#DatabasePool
@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+
+import datetime
+import itertools
+import json
+import os
+import shutil
+
+
+class Sidecar(object):
+	"""
+	A set of equal-length column arrays stored in a directory beside a knowledge database file.
+
+	Each column is stored as a NumPy .npy file, together with a manifest recording the
+	column types, the row count and the fingerprint of the knowledge database the data
+	was exported from.  Columns are memory-mapped read-only when loaded, so all processes
+	reading the same sidecar share a single copy in the page cache.
+
+	Columns declared with the type 'str' are stored as a pool of UTF-8 bytes plus an
+	array of offsets into the pool, one more than the number of rows.
+
+	NumPy is only required when a sidecar is actually written or loaded.
+	"""
+	
+	
+	##################################################
+	# private class data
+	
+	
+	_manifestFile = 'manifest.json'
+	_formatVersion = 1
+	
+	
+	##################################################
+	# class interrogation
+	
+	
+	@classmethod
+	def exists(cls, path):
+		"""
+		Checks whether a sidecar has been written at the given path.
+
+		Args:
+			path (str): The sidecar directory.
+
+		Returns:
+			bool: True if the directory contains a sidecar manifest.
+		"""
+		return os.path.isfile(os.path.join(path, cls._manifestFile))
+	#exists()
+	
+	
+	@classmethod
+	def write(cls, path, columns, length, rows, fingerprint, chunkSize=1000000):
+		"""
+		Streams rows into a new sidecar, replacing any existing sidecar at the same path.
+
+		Args:
+			path (str): The sidecar directory.
+			columns (list): A list of (name, dtype) tuples, one per field of each row.
+			length (int): The exact number of rows that will be supplied.
+			rows (iterable): The row tuples.
+			fingerprint (str): The fingerprint of the source knowledge database.
+			chunkSize (int, optional): The number of rows to buffer at a time. Defaults to 1000000.
+
+		Returns:
+			Sidecar: The newly written sidecar, loaded for reading.
+
+		Raises:
+			Exception: If the number of rows does not match the declared length.
+
+		The data is written to a temporary directory which only replaces the target once
+		it is complete, so readers never see a partially written sidecar.
+		"""
+		import numpy
+		
+		# columns=[ (name,dtype), ... ]
+		# rows=[ (value,...), ... ]
+		tmpPath = path + '.tmp'
+		if os.path.exists(tmpPath):
+			shutil.rmtree(tmpPath)
+		os.makedirs(tmpPath)
+		pools = list()
+		try:
+			arrays = list()
+			for name,dtype in columns:
+				if dtype == 'str':
+					arrays.append(numpy.lib.format.open_memmap(os.path.join(tmpPath, name + '.npy'), mode='w+', dtype=numpy.dtype('<i8'), shape=(length+1,)))
+					arrays[-1][0] = 0
+					pools.append(open(os.path.join(tmpPath, name + '.pool'), 'wb'))
+				else:
+					arrays.append(numpy.lib.format.open_memmap(os.path.join(tmpPath, name + '.npy'), mode='w+', dtype=numpy.dtype(dtype), shape=(length,)))
+					pools.append(None)
+			
+			n = 0
+			rows = iter(rows)
+			while True:
+				chunk = list(itertools.islice(rows, chunkSize))
+				if not chunk:
+					break
+				if n + len(chunk) > length:
+					raise Exception("ERROR: more than %d rows supplied for sidecar '%s'" % (length,path))
+				for array,pool,values in zip(arrays, pools, zip(*chunk)):
+					if pool:
+						data = [ v.encode('utf-8') for v in values ]
+						pool.write(b''.join(data))
+						array[n+1:n+1+len(chunk)] = array[n] + numpy.cumsum([ len(d) for d in data ])
+					else:
+						array[n:n+len(chunk)] = values
+				n += len(chunk)
+			#while rows
+			if n != length:
+				raise Exception("ERROR: %d of %d rows supplied for sidecar '%s'" % (n,length,path))
+			
+			for array,pool in zip(arrays, pools):
+				array.flush()
+				if pool:
+					pool.close()
+			del arrays
+			
+			manifest = {
+				'format': cls._formatVersion,
+				'fingerprint': fingerprint,
+				'length': length,
+				'columns': [ [name, ('str' if dtype == 'str' else numpy.dtype(dtype).str)] for name,dtype in columns ],
+				'created': datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+			}
+			with open(os.path.join(tmpPath, cls._manifestFile), 'w') as f:
+				json.dump(manifest, f, indent=1)
+			
+			if os.path.exists(path):
+				shutil.rmtree(path)
+			os.rename(tmpPath, path)
+		except:
+			for pool in pools:
+				if pool:
+					pool.close()
+			shutil.rmtree(tmpPath, ignore_errors=True)
+			raise
+		return cls(path)
+	#write()
+	
+	
+	@classmethod
+	def writeArrays(cls, path, columns, fingerprint):
+		"""
+		Writes complete column arrays into a new sidecar, replacing any existing sidecar at the same path.
+
+		Args:
+			path (str): The sidecar directory.
+			columns (list): A list of (name, array) tuples; every array must have the same length.
+			fingerprint (str): The fingerprint of the source knowledge database.
+
+		Returns:
+			Sidecar: The newly written sidecar, loaded for reading.
+
+		Raises:
+			Exception: If the arrays differ in length.
+		"""
+		import numpy
+		
+		# columns=[ (name,array), ... ]
+		lengths = set(len(array) for name,array in columns)
+		if len(lengths) != 1:
+			raise Exception("ERROR: column arrays for sidecar '%s' differ in length" % (path,))
+		tmpPath = path + '.tmp'
+		if os.path.exists(tmpPath):
+			shutil.rmtree(tmpPath)
+		os.makedirs(tmpPath)
+		try:
+			for name,array in columns:
+				numpy.save(os.path.join(tmpPath, name + '.npy'), array)
+			manifest = {
+				'format': cls._formatVersion,
+				'fingerprint': fingerprint,
+				'length': lengths.pop(),
+				'columns': [ [name, array.dtype.str] for name,array in columns ],
+				'created': datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+			}
+			with open(os.path.join(tmpPath, cls._manifestFile), 'w') as f:
+				json.dump(manifest, f, indent=1)
+			
+			if os.path.exists(path):
+				shutil.rmtree(path)
+			os.rename(tmpPath, path)
+		except:
+			shutil.rmtree(tmpPath, ignore_errors=True)
+			raise
+		return cls(path)
+	#writeArrays()
+	
+	
+	##################################################
+	# constructor
+	
+	
+	def __init__(self, path):
+		"""
+		Loads the manifest of an existing sidecar; columns are mapped on first use.
+
+		Args:
+			path (str): The sidecar directory.
+
+		Raises:
+			Exception: If the sidecar was written in an unsupported format.
+		"""
+		self._path = path
+		with open(os.path.join(path, self._manifestFile)) as f:
+			self._manifest = json.load(f)
+		if self._manifest.get('format') != self._formatVersion:
+			raise Exception("ERROR: unsupported format for sidecar '%s'" % path)
+		self._columns = dict()
+		self._pools = dict()
+	#__init__()
+	
+	
+	##################################################
+	# sidecar data
+	
+	
+	def getPath(self):
+		"""
+		Returns:
+			str: The sidecar directory.
+		"""
+		return self._path
+	#getPath()
+	
+	
+	def getFingerprint(self):
+		"""
+		Returns:
+			str: The fingerprint of the knowledge database the sidecar was exported from.
+		"""
+		return self._manifest['fingerprint']
+	#getFingerprint()
+	
+	
+	def getLength(self):
+		"""
+		Returns:
+			int: The number of rows in every column.
+		"""
+		return self._manifest['length']
+	#getLength()
+	
+	
+	def getColumnNames(self):
+		"""
+		Returns:
+			list: The column names, in their original order.
+		"""
+		return [ c[0] for c in self._manifest['columns'] ]
+	#getColumnNames()
+	
+	
+	def getColumn(self, name):
+		"""
+		Retrieves a column, memory-mapping it read-only on first use.
+
+		Args:
+			name (str): The column name.
+
+		Returns:
+			numpy.ndarray: The column data.
+		"""
+		if name not in self._columns:
+			import numpy
+			self._columns[name] = numpy.load(os.path.join(self._path, name + '.npy'), mmap_mode='r')
+		return self._columns[name]
+	#getColumn()
+	
+	
+	def getStrings(self, name):
+		"""
+		Retrieves a string column, memory-mapping it read-only on first use.
+
+		Args:
+			name (str): The column name.
+
+		Returns:
+			tuple: The pool of UTF-8 bytes as a numpy.ndarray, and the array of offsets into it;
+			string i is stored at pool[offsets[i]:offsets[i+1]].
+		"""
+		if name not in self._pools:
+			import numpy
+			poolFile = os.path.join(self._path, name + '.pool')
+			if os.path.getsize(poolFile):
+				self._pools[name] = numpy.memmap(poolFile, dtype='u1', mode='r')
+			else:
+				self._pools[name] = numpy.zeros(0, dtype='u1')
+		return (self._pools[name], self.getColumn(name))
+	#getStrings()
+	
+	
+	def getString(self, name, i):
+		"""
+		Retrieves one value of a string column.
+
+		Args:
+			name (str): The column name.
+			i (int): The row number.
+
+		Returns:
+			str: The decoded value.
+		"""
+		pool,offsets = self.getStrings(name)
+		return pool[offsets[i]:offsets[i+1]].tobytes().decode('utf-8')
+	#getString()
+	
+	
+	def bisectString(self, name, value):
+		"""
+		Finds where a value would be inserted into a sorted string column.
+
+		Args:
+			name (str): The column name; its values must be sorted by their UTF-8 bytes.
+			value (str): The value to locate.
+
+		Returns:
+			int: The first row whose value is not less than the given value.
+		"""
+		pool,offsets = self.getStrings(name)
+		value = value.encode('utf-8')
+		lo,hi = 0,self.getLength()
+		while lo < hi:
+			mid = (lo + hi) // 2
+			if pool[offsets[mid]:offsets[mid+1]].tobytes() < value:
+				lo = mid + 1
+			else:
+				hi = mid
+		return lo
+	#bisectString()
+
+
+#Sidecar
@@ -150,6 +150,7 @@ class Source(object):
 				dbc.execute("SELECT ldprofile_id FROM `db`.`ldprofile` WHERE ldprofile = LOWER(?)", ld[0:1])
 			for row in dbc:
 				ret[ld[0]] = row[0]
+		self._loki.invalidateMetadataCatalog()
 		return ret
 	#addLDProfiles()
 	
@@ -172,6 +173,7 @@ class Source(object):
 				dbc.execute("SELECT namespace_id FROM `db`.`namespace` WHERE namespace = LOWER(?)", n[0:1])
 			for row in dbc:
 				ret[n[0]] = row[0]
+		self._loki.invalidateMetadataCatalog()
 		return ret
 	#addNamespaces()
 	
@@ -194,6 +196,7 @@ class Source(object):
 				dbc.execute("SELECT relationship_id FROM `db`.`relationship` WHERE relationship = LOWER(?)", r[0:1])
 			for row in dbc:
 				ret[r[0]] = row[0]
+		self._loki.invalidateMetadataCatalog()
 		return ret
 	#addRelationships()
 	
@@ -216,6 +219,7 @@ class Source(object):
 				dbc.execute("SELECT role_id FROM `db`.`role` WHERE role = LOWER(?)", r[0:1])
 			for row in dbc:
 				ret[r[0]] = row[0]
+		self._loki.invalidateMetadataCatalog()
 		return ret
 	#addRoles()
 	
@@ -238,6 +242,7 @@ class Source(object):
 				dbc.execute("SELECT source_id FROM `db`.`source` WHERE source = LOWER(?)", s[0:1])
 			for row in dbc:
 				ret[s[0]] = row[0]
+		self._loki.invalidateMetadataCatalog()
 		return ret
 	#addSources()
 	
@@ -260,6 +265,7 @@ class Source(object):
 				dbc.execute("SELECT type_id FROM `db`.`type` WHERE type = LOWER(?)", t[0:1])
 			for row in dbc:
 				ret[t[0]] = row[0]
+		self._loki.invalidateMetadataCatalog()
 		return ret
 	#addTypes()
 
@@ -276,6 +282,7 @@ class Source(object):
 				dbc.execute("SELECT subtype_id FROM `db`.`subtype` WHERE subtype = LOWER(?)", t[0:1])
 			for row in dbc:
 				ret[t[0]] = row[0]
+		self._loki.invalidateMetadataCatalog()
 		return ret
 	#addTypes()
 	
@@ -114,7 +114,8 @@ class Updater(object):
 					self.log("WARNING: unknown source '%s'\n" % srcName)
 					continue
 				#if module not available
-				srcModule = importlib.import_module('%s.loki_source_%s' % (loaders.__name__, srcName))
+				srcPackage = ('%s.test' % loaders.__name__) if self._is_test else loaders.__name__
+				srcModule = importlib.import_module('%s.loki_source_%s' % (srcPackage, srcName))
 				srcClass = getattr(srcModule, 'Source_%s' % srcName)
 				if not issubclass(srcClass, loki_source.Source):
 					self.log("WARNING: invalid module for source '%s'\n" % srcName)
@@ -315,6 +316,7 @@ class Updater(object):
 					cursor.execute("ROLLBACK TRANSACTION TO SAVEPOINT 'updateDatabase_%s'" % (srcName,))
 				finally:
 					cursor.execute("RELEASE SAVEPOINT 'updateDatabase_%s'" % (srcName,))
+					self._loki.invalidateMetadataCatalog()
 				#try/except/finally
 
 				# remove subdirectory to free up some space
@@ -443,6 +445,11 @@ class Updater(object):
 			if 'biopolymer_region' in self._tablesUpdated:
 				self.updateBiopolymerZones()
 				#self.log("MEMORY: %d bytes (%d peak)\n" % self._loki.getDatabaseMemoryUsage()) #DEBUG
+				self.updateBiopolymerRegionTree()
+				#self.log("MEMORY: %d bytes (%d peak)\n" % self._loki.getDatabaseMemoryUsage()) #DEBUG
+			if 'group_group' in self._tablesUpdated:
+				self.updateGroupClosure()
+				#self.log("MEMORY: %d bytes (%d peak)\n" % self._loki.getDatabaseMemoryUsage()) #DEBUG
 			
 			# reindex all remaining tables
 			if self._tablesDeindexed:
@@ -464,6 +471,7 @@ class Updater(object):
 			cursor.execute("ROLLBACK TRANSACTION TO SAVEPOINT 'updateDatabase'")
 		finally:
 			cursor.execute("RELEASE SAVEPOINT 'updateDatabase'")
+			self._loki.invalidateMetadataCatalog()
 			self._updating = False
 			self._tablesUpdated = set()
 			self._tablesDeindexed = set()
@@ -1114,4 +1122,50 @@ FROM `db`.`group_biopolymer`
 	#updateBiopolymerZones()
 	
 	
+	def updateBiopolymerRegionTree(self):
+		"""
+		Rebuilds the R*Tree over biopolymer regions after the regions have changed.
+
+		The tree is skipped, with a log message, if this SQLite lacks the R*Tree module; region
+		overlap queries then fall back to the biopolymer_zone table.
+		"""
+		self.log("calculating region tree ...")
+		self.prepareTableForQuery('biopolymer_region')
+		if self._loki._buildRegionTree():
+			for row in self._db.cursor().execute("SELECT COUNT() FROM `db`.`biopolymer_region_tree`"):
+				numTotal = row[0]
+			self.log("calculating region tree completed: %d regions\n" % (numTotal,))
+		else:
+			self.log("calculating region tree skipped: SQLite R*Tree module is not available\n")
+	#updateBiopolymerRegionTree()
+	
+	
+	def updateGroupClosure(self):
+		"""
+		Rebuilds the group_closure table after the group hierarchy has changed.
+
+		Every group is recorded with each group it contains at any depth, as computed by
+		Database._generateGroupClosure() from the group_group containment relationships.
+		"""
+		self.log("calculating group hierarchy closure ...")
+		dbc = self._db.cursor()
+		
+		# feed all groups through the closure generator
+		self.prepareTableForQuery('group_group')
+		self.prepareTableForUpdate('group_closure')
+		dbc.execute("DELETE FROM `db`.`group_closure`")
+		dbc.executemany(
+			"INSERT OR IGNORE INTO `db`.`group_closure` (group_id,descendant_id,relationship_id,depth) VALUES (?,?,?,?)",
+			self._loki._generateGroupClosure(self._loki._getGroupContainmentEdges())
+		)
+		
+		# clean up
+		self.prepareTableForQuery('group_closure')
+		for row in dbc.execute("SELECT COUNT(), COUNT(DISTINCT group_id) FROM `db`.`group_closure`"):
+			numTotal = row[0]
+			numGroups = row[1]
+		self.log("calculating group hierarchy closure completed: %d records (%d groups)\n" % (numTotal,numGroups))
+	#updateGroupClosure()
+
+
 #Updater
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+
+from loki import loki_db
+
+
+FIXTURE_SOURCES = ('genes','light','paint','snps','spectrum')
+
+
+def buildTestDatabase(dbFile):
+	"""
+	Builds and finalizes a knowledge database from the loaders/test sources.
+
+	Args:
+		dbFile (str): The database file to create; the sources' working directories are made beside it.
+
+	Returns:
+		Database: The finalized database, with its sidecar indexes built.
+	"""
+	path = os.path.dirname(os.path.abspath(dbFile))
+	iwd = os.getcwd()
+	os.chdir(path)
+	try:
+		for srcName in FIXTURE_SOURCES:
+			os.makedirs(os.path.join(path, srcName), exist_ok=True)
+		db = loki_db.Database(dbFile, testing=True, updating=True)
+		db.setVerbose(False)
+		db.updateDatabase(FIXTURE_SOURCES, None, True, False)
+		db.finalizeDatabase()
+	finally:
+		os.chdir(iwd)
+	return db
+#buildTestDatabase()
+
+
+def copyTestDatabase(srcFile, dbFile):
+	"""
+	Copies a fixture database file alone, without any of its sidecars, and opens the copy.
+
+	Args:
+		srcFile (str): The fixture database file.
+		dbFile (str): The file to copy it to.
+
+	Returns:
+		Database: The copy.
+	"""
+	shutil.copyfile(srcFile, dbFile)
+	copy = loki_db.Database(dbFile, testing=True)
+	copy.setVerbose(False)
+	return copy
+#copyTestDatabase()
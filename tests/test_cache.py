@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+from fixtures import buildTestDatabase, copyTestDatabase
+
+
+class _ClosedConnection(object):
+	"""
+	Stands in for a knowledge database connection which must not be used.
+	"""
+	
+	def __getattr__(self, name):
+		raise AssertionError("knowledge database used for a cached lookup")
+	#__getattr__()
+	
+	def __enter__(self):
+		raise AssertionError("knowledge database used for a cached lookup")
+	#__enter__()
+	
+	def __exit__(self, excType, excVal, traceback):
+		return False
+	#__exit__()
+
+#_ClosedConnection
+
+
+class QueryCacheTest(unittest.TestCase):
+	"""
+	Checks that repeated lookups are answered from the query cache, and only while the database is unchanged.
+	"""
+	
+	@classmethod
+	def setUpClass(cls):
+		cls.path = tempfile.mkdtemp()
+		cls.dbFile = os.path.join(cls.path, 'test.db')
+		buildTestDatabase(cls.dbFile)._db.close()
+	#setUpClass()
+	
+	
+	@classmethod
+	def tearDownClass(cls):
+		shutil.rmtree(cls.path)
+	#tearDownClass()
+	
+	
+	def setUp(self):
+		self.db = copyTestDatabase(self.dbFile, os.path.join(self.path, 'cached.db'))
+		self.db.enableQueryCache(os.path.join(self.path, 'cache'))
+	#setUp()
+	
+	
+	def tearDown(self):
+		self.db.disableQueryCache()
+		self.db._db.close()
+		os.remove(os.path.join(self.path, 'cache'))
+	#tearDown()
+	
+	
+	def lookup(self, db, method, *args):
+		tally = dict()
+		errors = list()
+		rows = list(getattr(db, method)(*args, tally=tally, errorCallback=lambda line,err: errors.append((line,err))))
+		return (rows, tally, errors)
+	#lookup()
+	
+	
+	def cachedLookup(self, db, method, *args):
+		with unittest.mock.patch.object(db, '_db', _ClosedConnection()):
+			return self.lookup(db, method, *args)
+	#cachedLookup()
+	
+	
+	def test_hit(self):
+		rses = [ (rs,"e%d" % rs) for rs in range(9,40,2) ] + [ (15,'again'), (99,None) ]
+		identifiers = [ ('',name,name) for name in ('A','DE','EF','pqr','Z') ]
+		for method,args in (('generateSNPLociByRSes',(rses,0,1)), ('generateBiopolymerIDsByIdentifiers',(identifiers,)), ('generateRSesByLoci',([ (1,pos,None) for pos in range(10,40,5) ],))):
+			result = self.lookup(self.db, method, *args)
+			self.assertTrue(result[0] and result[1] and result[2], method)
+			self.assertEqual(self.cachedLookup(self.db, method, *args), result)
+			
+			# the cache file is shared by any database with the same fingerprint
+			other = copyTestDatabase(self.dbFile, os.path.join(self.path, 'other.db'))
+			other.enableQueryCache(os.path.join(self.path, 'cache'))
+			other.getDatabaseFingerprint()
+			self.assertEqual(self.cachedLookup(other, method, *args), result)
+			other.disableQueryCache()
+			other._db.close()
+	#test_hit()
+	
+	
+	def test_miss(self):
+		rses = [ (rs,None) for rs in range(9,40) ]
+		result = self.lookup(self.db, 'generateSNPLociByRSes', rses)
+		
+		# different arguments
+		with self.assertRaises(AssertionError):
+			self.cachedLookup(self.db, 'generateSNPLociByRSes', rses, 0, None)
+		
+		# lookups which are not run to the end
+		rows = self.db.generateRSesByLoci([ (1,pos,None) for pos in range(10,40,5) ])
+		next(rows)
+		rows.close()
+		with self.assertRaises(AssertionError):
+			self.cachedLookup(self.db, 'generateRSesByLoci', [ (1,pos,None) for pos in range(10,40,5) ])
+		
+		# any change of the database
+		self.db.setDatabaseSetting('testing_cache', 1)
+		with self.assertRaises(AssertionError):
+			self.cachedLookup(self.db, 'generateSNPLociByRSes', rses)
+		self.assertEqual(self.lookup(self.db, 'generateSNPLociByRSes', rses), result)
+		self.assertEqual(self.cachedLookup(self.db, 'generateSNPLociByRSes', rses), result)
+	#test_miss()
+
+
+#QueryCacheTest
+
+
+if __name__ == "__main__":
+	unittest.main()
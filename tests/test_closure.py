@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from fixtures import buildTestDatabase, copyTestDatabase
+
+
+class GroupClosureTest(unittest.TestCase):
+	"""
+	Checks that hierarchy lookups through group_closure match a live walk of group_group.
+	"""
+	
+	@classmethod
+	def setUpClass(cls):
+		cls.path = tempfile.mkdtemp()
+		dbFile = os.path.join(cls.path, 'test.db')
+		db = buildTestDatabase(dbFile)
+		
+		# deepen the fixture hierarchy with a second relationship: orange > gray > {red,green,blue}
+		# and red > cyan by both relationships, so paths of several depths mix relationships
+		# (light and paint both have a 'gray' group; keep light's, which contains red)
+		groupID = dict((row[1],row[0]) for row in db._db.cursor().execute("SELECT group_id, label FROM `db`.`group` ORDER BY group_id DESC"))
+		relID = db.getRelationshipID('shade_of')
+		sql = "INSERT INTO `db`.`group_group` (group_id, related_group_id, relationship_id, direction, contains, source_id) VALUES (?,?,?,?,?,0)"
+		with db._db:
+			db._db.cursor().execute("INSERT INTO `db`.`relationship` (relationship) VALUES ('part_of')")
+			extraID = db._db.last_insert_rowid()
+			for parent,child,rel in ((groupID['orange'],groupID['gray'],extraID), (groupID['red'],groupID['cyan'],relID), (groupID['red'],groupID['cyan'],extraID)):
+				db._db.cursor().execute(sql, (parent,child,rel,1,1))
+				db._db.cursor().execute(sql, (child,parent,rel,-1,-1))
+		db.buildGroupClosure()
+		db._db.close()
+		
+		cls.closureDB = copyTestDatabase(dbFile, os.path.join(cls.path, 'closure.db'))
+		cls.walkDB = copyTestDatabase(dbFile, os.path.join(cls.path, 'walk.db'))
+		with cls.walkDB._db:
+			cls.walkDB._db.cursor().execute("DELETE FROM `db`.`group_closure`")
+		cls.groupIDs = sorted(groupID.values())
+		cls.relationshipIDs = (None, [relID], [extraID], [0], [relID,0])
+	#setUpClass()
+	
+	
+	@classmethod
+	def tearDownClass(cls):
+		cls.closureDB._db.close()
+		cls.walkDB._db.close()
+		shutil.rmtree(cls.path)
+	#tearDownClass()
+	
+	
+	def assertParity(self, method, *args):
+		self.assertTrue(self.closureDB._hasGroupClosure())
+		self.assertFalse(self.walkDB._hasGroupClosure())
+		rows = list(getattr(self.closureDB, method)(*args))
+		self.assertEqual(rows, list(getattr(self.walkDB, method)(*args)))
+		return rows
+	#assertParity()
+	
+	
+	def test_descendants(self):
+		ids = [ (groupID,"g%d" % groupID) for groupID in self.groupIDs + [999] ]
+		for relationshipIDs in self.relationshipIDs:
+			for maxDepth in (None,1,2):
+				self.assertParity('generateGroupDescendantsByIDs', ids, relationshipIDs, maxDepth)
+		self.assertTrue(any(row[3] == 3 for row in self.assertParity('generateGroupDescendantsByIDs', ids)))
+	#test_descendants()
+	
+	
+	def test_ancestors(self):
+		ids = [ (groupID,None) for groupID in reversed(self.groupIDs) ]
+		for relationshipIDs in self.relationshipIDs:
+			for maxDepth in (None,1,2):
+				self.assertParity('generateGroupAncestorsByIDs', ids, relationshipIDs, maxDepth)
+	#test_ancestors()
+	
+	
+	def test_inherited_biopolymers(self):
+		ids = [ (groupID,None) for groupID in self.groupIDs ]
+		for relationshipIDs in self.relationshipIDs:
+			self.assertParity('generateInheritedBiopolymerIDsByGroupIDs', ids, relationshipIDs)
+	#test_inherited_biopolymers()
+
+
+#GroupClosureTest
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from fixtures import buildTestDatabase, copyTestDatabase
+
+
+class SidecarParityTest(unittest.TestCase):
+	"""
+	Checks that lookups answered from the sidecar indexes match the same lookups answered by SQL.
+	"""
+	
+	@classmethod
+	def setUpClass(cls):
+		cls.path = tempfile.mkdtemp()
+		dbFile = os.path.join(cls.path, 'test.db')
+		cls.sidecarDB = buildTestDatabase(dbFile)
+		cls.sqlDB = copyTestDatabase(dbFile, os.path.join(cls.path, 'sql.db'))
+		
+		# the SQL lookups consult the existence filters by themselves, too
+		filterFile = os.path.join(cls.path, 'filter.db')
+		for name in ('snp_locus','snp_merge','biopolymer_name','group_name'):
+			shutil.copytree("%s.%s_filter" % (dbFile,name), "%s.%s_filter" % (filterFile,name))
+		cls.filterDB = copyTestDatabase(dbFile, filterFile)
+	#setUpClass()
+	
+	
+	@classmethod
+	def tearDownClass(cls):
+		cls.sidecarDB._db.close()
+		cls.sqlDB._db.close()
+		cls.filterDB._db.close()
+		shutil.rmtree(cls.path)
+	#tearDownClass()
+	
+	
+	def assertParity(self, sidecars, method, *args, **kwargs):
+		"""
+		Runs a lookup against each database and compares the results, tally counts and errors.
+
+		Args:
+			sidecars (tuple): The sidecars which the lookup may be answered from.
+			method (str): The name of the Database generator method.
+			*args: Its positional arguments.
+			**kwargs: Its keyword arguments.
+		"""
+		for name in sidecars:
+			self.assertIsNotNone(self.sidecarDB._getSidecar(name), name)
+			self.assertIsNone(self.sqlDB._getSidecar(name), name)
+			self.assertIsNone(self.filterDB._getSidecar(name), name)
+		self.assertIsNotNone(self.filterDB._getExistenceFilter('snp_locus'))
+		
+		results = list()
+		for db in (self.sidecarDB, self.sqlDB, self.filterDB):
+			tally = dict()
+			errors = list()
+			options = dict(kwargs)
+			if 'tally' in options:
+				options['tally'] = tally
+			if 'errorCallback' in options:
+				options['errorCallback'] = lambda line,err: errors.append((line,err))
+			rows = list(getattr(db, method)(*args, **options))
+			results.append((rows, tally, errors))
+		self.assertEqual(results[0], results[1])
+		self.assertEqual(results[0], results[2])
+		return results[0]
+	#assertParity()
+	
+	
+	def test_snp_loci(self):
+		rses = [ (rs,"e%d" % rs) for rs in range(8,40) ] + [ ('15',None), (12,'dupe'), (99,None) ]
+		for validated in (None,True,False):
+			for minMatch,maxMatch in ((1,1),(0,1),(0,None),(2,None)):
+				self.assertParity(('snp_locus',), 'generateSNPLociByRSes', rses, minMatch, maxMatch, validated, tally=True, errorCallback=True)
+		self.assertIn((15,'e15',1,50), self.sidecarDB.generateSNPLociByRSes(rses, 0, None))
+	#test_snp_loci()
+	
+	
+	def test_current_rses(self):
+		rses = [ (rs,None) for rs in (9,19,11,99) ] + [ ('9','str'), (9,'dupe') ]
+		rows,tally,errors = self.assertParity(('snp_merge',), 'generateCurrentRSesByRSes', rses, tally=True)
+		self.assertEqual(rows[0], (9,None,19))
+		self.assertParity(('snp_locus','snp_merge'), 'generateSNPLociByRSes', rses, 0, None, currentRS=True, tally=True, errorCallback=True)
+	#test_current_rses()
+	
+	
+	def test_rses_by_loci(self):
+		loci = [ (chm,pos,None) for chm in (1,2,3,'X') for pos in range(10,80,5) ] + [ ('chr1',35,'name'), ('3','70','str') ]
+		for validated in (None,True,False):
+			for minMatch,maxMatch in ((1,1),(0,None),(2,None)):
+				self.assertParity(('snp_locus',), 'generateRSesByLoci', loci, minMatch, maxMatch, validated, tally=True, errorCallback=True)
+	#test_rses_by_loci()
+	
+	
+	def test_biopolymer_identifiers(self):
+		names = ('A','a','A2','DE','EF','FG','pqr','qrs','Z','5','19','05',' A')
+		identifiers = [ (ns,name,"e%d" % i) for i,(ns,name) in enumerate((ns,name) for ns in (None,'','*','-','gene','entrez_gid','protein','nope') for name in names) ]
+		for minMatch,maxMatch in ((1,1),(0,None),(2,None),(0,0)):
+			self.assertParity(('biopolymer_name',), 'generateBiopolymerIDsByIdentifiers', identifiers, minMatch, maxMatch, tally=True, errorCallback=True)
+		typeID = self.sqlDB.getTypeID('gene')
+		self.assertParity(('biopolymer_name',), 'generateTypedBiopolymerIDsByIdentifiers', typeID, identifiers, 0, None, tally=True, errorCallback=True)
+	#test_biopolymer_identifiers()
+	
+	
+	def test_group_identifiers(self):
+		names = ('red','RED','white','gray','purple','orange','cyan','nope')
+		identifiers = [ (ns,name,None) for ns in (None,'','*','-','group','gene') for name in names ]
+		for minMatch,maxMatch in ((1,1),(0,None),(2,None)):
+			self.assertParity(('group_name',), 'generateGroupIDsByIdentifiers', identifiers, minMatch, maxMatch, tally=True, errorCallback=True)
+	#test_group_identifiers()
+	
+	
+	def test_prefixes(self):
+		for prefix in ('','a','D','e','Pq','gr','w','z','%','_'):
+			for namespace in (None,'','*','-','gene','protein','group'):
+				for limit in (None,1,3):
+					self.assertParity(('biopolymer_prefix',), 'generateBiopolymerIDsByPrefix', prefix, namespace, limit)
+					self.assertParity(('group_prefix',), 'generateGroupIDsByPrefix', prefix, namespace, limit)
+	#test_prefixes()
+
+
+#SidecarParityTest
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from fixtures import buildTestDatabase, copyTestDatabase
+
+
+class PositionSweepTest(unittest.TestCase):
+	"""
+	Checks that the sweep-line join of sorted positions matches the region overlap queries.
+	"""
+	
+	@classmethod
+	def setUpClass(cls):
+		cls.path = tempfile.mkdtemp()
+		dbFile = os.path.join(cls.path, 'test.db')
+		cls.treeDB = buildTestDatabase(dbFile)
+		cls.zoneDB = copyTestDatabase(dbFile, os.path.join(cls.path, 'zone.db'))
+		with cls.zoneDB._db:
+			cls.zoneDB._db.cursor().execute("DROP TABLE `db`.`biopolymer_region_tree`")
+		cls.positions = [ ("p%s:%d" % (chm,pos), chm, pos, str(pos)) for chm in ('chr1',2,'3','X','chrQ',4) for pos in range(0,106,3) ]
+	#setUpClass()
+	
+	
+	@classmethod
+	def tearDownClass(cls):
+		cls.treeDB._db.close()
+		cls.zoneDB._db.close()
+		shutil.rmtree(cls.path)
+	#tearDownClass()
+	
+	
+	def test_positions(self):
+		self.assertTrue(self.treeDB._hasRegionTree())
+		self.assertFalse(self.zoneDB._hasRegionTree())
+		typeID = self.treeDB.getTypeID('gene')
+		for ldprofile in (None,'','ld'):
+			for padding in (0,1,5):
+				for t in (None,typeID,typeID+100):
+					errors = list()
+					rows = list(self.treeDB.generateBiopolymersByPositions(self.positions, ldprofile, t, padding, lambda line,err: errors.append(line.split("\t")[0])))
+					self.assertEqual(errors, [ p[0] for p in self.positions if p[1] == 'chrQ' ])
+					if padding == 0:
+						self.assertTrue(all(row[3] == 0 for row in rows))
+					else:
+						self.assertTrue(all(0 <= row[3] <= padding for row in rows))
+					for db in (self.treeDB,self.zoneDB):
+						regions = ((p[0],p[1],p[2],p[2],p[3]) for p in self.positions)
+						self.assertEqual([ row[:3] for row in rows ], list(db.generateBiopolymersByRegions(regions, ldprofile, t, padding)))
+		
+		# gene A spans 8-22 on chr1, and gene B starts at 28
+		geneA = max(row[0] for row in self.treeDB._db.cursor().execute("SELECT biopolymer_id FROM `db`.`biopolymer` WHERE label = 'A'"))
+		rows = list(self.treeDB.generateBiopolymersByPositions(self.positions, padding=2))
+		self.assertIn(('pchr1:21','21',geneA,0), rows)
+		self.assertIn(('pchr1:24','24',geneA,2), rows)
+		self.assertNotIn(geneA, [ row[2] for row in rows if row[0] == 'pchr1:27' ])
+	#test_positions()
+	
+	
+	def test_unsorted(self):
+		with self.assertRaises(Exception):
+			list(self.treeDB.generateBiopolymersByPositions([ ('a',1,20,None), ('b',1,10,None) ]))
+		with self.assertRaises(Exception):
+			list(self.treeDB.generateBiopolymersByPositions([ ('a',1,20,None), ('b',2,10,None), ('c',1,30,None) ]))
+	#test_unsorted()
+
+
+#PositionSweepTest
+
+
+if __name__ == "__main__":
+	unittest.main()